@@ -6,17 +6,7 @@ from pike import Engine, File
 
 def get_referenced_files(file: File) -> list[File]:
     """Get all files that reference the current one."""
-    data: list[File] = []
-    for f in file.engine.files:
-        if f == file:
-            continue
-
-        references = f.variables.get("references")
-        if references is not None:
-            if file.id in references:
-                data.append(f)
-
-    return data
+    return file.engine.get_referenced_by(file)
 
 
 def main():
@@ -1,11 +1,13 @@
 import json
 import shutil
+import tempfile
 from pathlib import Path
 from typing import Annotated
 
 import typer
 
 from pike import Engine
+from pike.bench import OUTPUT_TYPES, SyntheticReport, run_benchmark
 
 app = typer.Typer()
 
@@ -21,6 +23,24 @@ def run(
     load_default_plugins: Annotated[
         bool, typer.Argument(help="Whether or not to load default useful plugins")
     ] = True,
+    jobs: Annotated[
+        int, typer.Option(help="How many files to load from disk concurrently")
+    ] = 1,
+    render_jobs: Annotated[
+        int, typer.Option(help="How many processes to render files with")
+    ] = 1,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            help="Write how long each stage of the build took next to the outputs"
+        ),
+    ] = False,
+    trace: Annotated[
+        bool,
+        typer.Option(
+            help="Write a Chrome trace of plugins and custom commands next to the outputs"
+        ),
+    ] = False,
 ):
     """Given a folder, generate the report.
 
@@ -32,9 +52,24 @@ def run(
         The base directory of the report. Defaults to current directory.
     load_default_plugins: bool
         Whether to load default useful plugins
+    jobs: int
+        How many files to load from disk concurrently
+    render_jobs: int
+        How many processes to render files with
+    profile: bool
+        Whether to write how long each stage of the
+        build took next to the outputs as JSON
+    trace: bool
+        Whether to write a Chrome trace of plugins,
+        file plugins and custom commands next to the outputs
     """
     engine = Engine.load_from_directory(
-        report_directory, load_default_plugins=load_default_plugins
+        report_directory,
+        load_default_plugins=load_default_plugins,
+        jobs=jobs,
+        render_jobs=render_jobs,
+        profile=profile,
+        trace=trace,
     )
     engine.run()
 
@@ -87,5 +122,114 @@ def scaffold(
     )
 
 
+@app.command()
+def bench(
+    files: Annotated[int, typer.Option(help="How many content files to create")] = 50,
+    tables: Annotated[int, typer.Option(help="How many tables per file")] = 1,
+    rows: Annotated[int, typer.Option(help="How many rows per table")] = 20,
+    images: Annotated[int, typer.Option(help="How many images per file")] = 1,
+    list_depth: Annotated[
+        int, typer.Option(help="How deeply to nest the list in each file")
+    ] = 3,
+    code_blocks: Annotated[int, typer.Option(help="How many code blocks per file")] = 1,
+    commands: Annotated[
+        int, typer.Option(help="How many custom commands per paragraph")
+    ] = 2,
+    output: Annotated[
+        list[str],
+        typer.Option(
+            help="The output types to benchmark, markdown, docx or pdf. May be repeated"
+        ),
+    ] = None,
+    directory: Annotated[
+        Path,
+        typer.Option(
+            help="Where to generate the report, which must not exist or be empty. "
+            "Defaults to a temporary directory."
+        ),
+    ] = None,
+    render_jobs: Annotated[
+        int, typer.Option(help="How many processes to render files with")
+    ] = 1,
+    results: Annotated[
+        Path, typer.Option(help="Where to also write the results as JSON")
+    ] = None,
+):
+    """Generate a synthetic report and time building it.
+
+    The report is built once per output type,
+    reporting throughput and the time of each stage.
+
+    Parameters
+    ----------
+    files: int
+        How many content files to create
+    tables: int
+        How many tables per file
+    rows: int
+        How many rows per table
+    images: int
+        How many images per file
+    list_depth: int
+        How deeply to nest the list in each file
+    code_blocks: int
+        How many code blocks per file
+    commands: int
+        How many custom commands per paragraph
+    output: list[str]
+        The output types to benchmark. Defaults to markdown and docx.
+    directory: Path|None
+        Where to generate the report, which must not exist or be empty.
+        Defaults to a temporary directory.
+    render_jobs: int
+        How many processes to render files with
+    results: Path|None
+        Where to also write the results as JSON
+    """
+    output = output or ["markdown", "docx"]
+    # Checked before spending time generating the report
+    for output_type in output:
+        if output_type not in OUTPUT_TYPES:
+            raise typer.BadParameter(
+                f"{output_type!r} is not one of {', '.join(OUTPUT_TYPES)}",
+                param_hint="--output",
+            )
+
+    report = SyntheticReport(
+        files=files,
+        tables=tables,
+        rows=rows,
+        images=images,
+        list_depth=list_depth,
+        code_blocks=code_blocks,
+        commands=commands,
+    )
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        try:
+            report_directory = report.generate(
+                directory or Path(temporary_directory) / "report"
+            )
+        except FileExistsError as e:
+            raise typer.BadParameter(str(e), param_hint="--directory") from None
+
+        data = [
+            run_benchmark(report_directory, output=output_type, render_jobs=render_jobs)
+            for output_type in output
+        ]
+
+    typer.echo(repr(report))
+    for result in data:
+        typer.echo(
+            f"{result['output']}: {result['files']} files in {result['seconds']:.3f}s, "
+            f"{result['files_per_second']:.1f} files/s, "
+            f"{result['tokens_per_second']:.0f} tokens/s"
+        )
+        for stage, seconds in result["stages"].items():
+            typer.echo(f"\t{stage}: {seconds:.3f}s")
+
+    if results is not None:
+        results.write_text(json.dumps(data, indent=2))
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import importlib
+import typing
+
+
+def lazy_module(
+    module_globals: dict[str, typing.Any], attributes: dict[str, str]
+) -> tuple[typing.Callable[[str], typing.Any], typing.Callable[[], list[str]]]:
+    """Create the ``__getattr__`` and ``__dir__`` of a module
+    whose attributes are imported on first use.
+
+    .. code-block:: python
+
+        __getattr__, __dir__ = lazy_module(globals(), {"Docx": ".docx"})
+
+    Parameters
+    ----------
+    module_globals: dict[str, typing.Any]
+        The ``globals()`` of the module, imported attributes
+        are stored here so they are only looked up once.
+    attributes: dict[str, str]
+        Attribute names to the module they are imported from, where
+        relative names are relative to the module. An attribute named
+        after the module it is imported from is that module.
+
+    Returns
+    -------
+    tuple[typing.Callable[[str], typing.Any], typing.Callable[[], list[str]]]
+        The ``__getattr__`` and ``__dir__`` functions for the module
+    """
+    module_name: str = module_globals["__name__"]
+
+    def __getattr__(name: str) -> typing.Any:
+        if name not in attributes:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+        module = importlib.import_module(attributes[name], module_name)
+        value = (
+            module
+            if module.__name__.rpartition(".")[2] == name
+            else getattr(module, name)
+        )
+        module_globals[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(module_globals) | set(module_globals.get("__all__", ())))
+
+    return __getattr__, __dir__
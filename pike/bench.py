@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import json
+import random
+import struct
+import time
+import typing
+import zlib
+from pathlib import Path
+
+from pike import Engine, profiling, utils
+
+OUTPUT_TYPES: typing.Final[tuple[str, ...]] = ("markdown", "docx", "pdf")
+
+_WORDS: typing.Final[tuple[str, ...]] = (
+    "report",
+    "finding",
+    "engine",
+    "table",
+    "value",
+    "secure",
+    "network",
+    "service",
+    "impact",
+    "remediation",
+    "observed",
+    "server",
+    "request",
+    "response",
+    "version",
+)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def _create_png(path: Path, *, size: int = 16) -> None:
+    """Write a solid colour PNG without needing an imaging library"""
+    row = b"\x00" + b"\x33\x66\x99" * size
+    path.write_bytes(
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + _png_chunk(b"IDAT", zlib.compress(row * size))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+class SyntheticReport:
+    """Generates a report directory of a configurable size.
+
+    Every file contains paragraphs of text along with the
+    requested amount of tables, images, nested lists,
+    code blocks and custom commands.
+    """
+
+    def __init__(
+        self,
+        *,
+        files: int = 50,
+        tables: int = 1,
+        rows: int = 20,
+        images: int = 1,
+        list_depth: int = 3,
+        code_blocks: int = 1,
+        commands: int = 2,
+        seed: int = 0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        files: int
+            How many content files to create
+        tables: int
+            How many tables to put in each file
+        rows: int
+            How many rows each table has
+        images: int
+            How many images to put in each file
+        list_depth: int
+            How deeply to nest the list in each file, 0 for no list
+        code_blocks: int
+            How many code blocks to put in each file
+        commands: int
+            How many custom commands to use per paragraph
+        seed: int
+            Seed for the generated text, so reports are reproducible
+        """
+        self.files: int = files
+        self.tables: int = tables
+        self.rows: int = rows
+        self.images: int = images
+        self.list_depth: int = list_depth
+        self.code_blocks: int = code_blocks
+        self.commands: int = commands
+        self.seed: int = seed
+
+    def __repr__(self) -> str:
+        return (
+            f"SyntheticReport(files={self.files}, tables={self.tables}, "
+            f"rows={self.rows}, images={self.images}, "
+            f"list_depth={self.list_depth}, code_blocks={self.code_blocks}, "
+            f"commands={self.commands})"
+        )
+
+    def _sentence(self, rng: random.Random, words: int = 12) -> str:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(words))
+        return sentence.capitalize() + "."
+
+    def _paragraph(self, rng: random.Random) -> str:
+        parts: list[str] = [self._sentence(rng) for _ in range(3)]
+        for _ in range(self.commands):
+            parts.append(
+                f"{{{{ insert_text('{rng.choice(_WORDS)}', bold=True, italic=True) }}}}"
+            )
+
+        return " ".join(parts)
+
+    def _table(self, rng: random.Random) -> str:
+        lines: list[str] = ["| Name | Status | Notes |", "| --- | :---: | ---: |"]
+        for row in range(self.rows):
+            lines.append(
+                f"| {rng.choice(_WORDS)} {row} | **{rng.choice(_WORDS)}** "
+                f"| {self._sentence(rng, 4)} |"
+            )
+
+        return "\n".join(lines)
+
+    def _list(self, rng: random.Random) -> str:
+        lines: list[str] = []
+        for depth in range(self.list_depth):
+            indent = "  " * depth
+            lines.append(f"{indent}- {self._sentence(rng, 5)}")
+            lines.append(f"{indent}- {self._sentence(rng, 5)}")
+
+        return "\n".join(lines)
+
+    def _file(self, rng: random.Random, idx: int, image: Path) -> str:
+        sections: list[str] = [
+            f"---\nid: file_{idx}\nseverity: {rng.choice(['low', 'medium', 'high'])}\n---",
+            f"## {{{{ title }}}} {idx}",
+            self._paragraph(rng),
+        ]
+        for _ in range(self.tables):
+            sections.append(self._table(rng))
+
+        for _ in range(self.images):
+            sections.append(
+                f"{{{{ insert_image('{image.as_posix()}', width=2, height=2) }}}}"
+            )
+
+        if self.list_depth > 0:
+            sections.append(self._list(rng))
+
+        for _ in range(self.code_blocks):
+            sections.append(f"```python\nprint({self._sentence(rng, 4)!r})\n```")
+
+        sections.append(self._paragraph(rng))
+        return "\n\n".join(sections) + "\n"
+
+    def generate(self, directory: Path) -> Path:
+        """Write the report to disk.
+
+        Parameters
+        ----------
+        directory: Path
+            Where to write the report, this must not exist or be empty
+
+        Returns
+        -------
+        Path
+            The report directory
+
+        Raises
+        ------
+        FileExistsError
+            The directory already has something in it
+        """
+        if directory.exists() and any(directory.iterdir()):
+            raise FileExistsError(
+                f"Refusing to generate a report within {directory} "
+                f"as it is not empty"
+            )
+
+        config_dir = directory / "configuration"
+        content_dir = directory / "content"
+        config_dir.mkdir(parents=True, exist_ok=True)
+        content_dir.mkdir()
+
+        pike_path = Path(__file__).parent
+        config = json.loads((pike_path / "default_files" / "config.json").read_text())
+        # Code blocks and ordered lists need styles the default template lacks
+        config["styles"]["inline_code"] = ""
+        config["docx_create_styles"] = {
+            "ordered_lists": True,
+            "code_block": True,
+            "inline_code": True,
+        }
+        (config_dir / "config.json").write_text(json.dumps(config, indent=2))
+        (config_dir / "variables.json").write_text(json.dumps({"title": "Benchmark"}))
+        (config_dir / "layout.md").write_text(
+            "# {{ title }}\n\n"
+            "{% for file in get_folder('content') -%}\n"
+            "{{ file.content }}\n"
+            "{% endfor -%}\n"
+        )
+
+        image = (directory / "images" / "image.png").absolute()
+        image.parent.mkdir(exist_ok=True)
+        _create_png(image)
+
+        rng = random.Random(self.seed)
+        width = len(str(self.files))
+        for idx in range(self.files):
+            (content_dir / f"{idx:0{width}}.md").write_text(self._file(rng, idx, image))
+
+        return directory
+
+
+def run_benchmark(
+    directory: Path, *, output: str, **engine_kwargs: typing.Any
+) -> dict[str, typing.Any]:
+    """Build a report once, producing only the given output type.
+
+    Parameters
+    ----------
+    directory: Path
+        The report to build
+    output: str
+        One of ``markdown``, ``docx`` or ``pdf``
+    engine_kwargs
+        Passed through to :meth:`pike.Engine.load_from_directory`
+
+    Returns
+    -------
+    dict[str, typing.Any]
+        The results, including throughput and the time of each stage
+    """
+    if output not in OUTPUT_TYPES:
+        raise ValueError(f"Unknown output type {output!r}, expected {OUTPUT_TYPES}")
+
+    config_path = directory / "configuration" / "config.json"
+    config = json.loads(config_path.read_text())
+    config["output_files"] = {name: name == output for name in OUTPUT_TYPES}
+    config_path.write_text(json.dumps(config))
+
+    engine = Engine.load_from_directory(directory, **engine_kwargs)
+    # Memory tracing would skew the timings
+    engine.profiler = profiling.Profiler(trace_memory=False)
+    start = time.perf_counter()
+    engine.run()
+    elapsed = time.perf_counter() - start
+
+    tokens = len(
+        utils.flatten_ast(
+            utils.get_markdown_it().parse(engine._layout_file.content)  # noqa
+        )
+    )
+    return {
+        "output": output,
+        "files": len(engine.files),
+        "tokens": tokens,
+        "seconds": elapsed,
+        "files_per_second": len(engine.files) / elapsed,
+        "tokens_per_second": tokens / elapsed,
+        "stages": {
+            stage["name"]: stage["wall_time"]
+            for stage in engine.profiler.stages
+            if stage["parent"] in ("total", "docx")
+        },
+    }
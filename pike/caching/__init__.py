@@ -0,0 +1,4 @@
+from .build import BuildCache, callable_fingerprint
+from .templates import TemplateCache
+
+__all__ = ("BuildCache", "callable_fingerprint", "TemplateCache")
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sys
+import typing
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+
+from jinja2 import Environment, meta
+
+if typing.TYPE_CHECKING:
+    from pike import File
+    from pike.dependencies import Dependency
+
+log = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION: typing.Final[int] = 1
+"""Bump this whenever rendering changes in a way that invalidates old entries"""
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def _dump(value: typing.Any) -> str:
+    # repr as a fallback covers things like dates from frontmatter
+    return json.dumps(value, sort_keys=True, default=repr)
+
+
+def callable_fingerprint(callables: Iterable[Callable[..., typing.Any]]) -> str:
+    """Build a fingerprint identifying a set of plugins and their versions.
+
+    A plugin is identified by where it lives, along with the
+    ``__version__`` of its module when one is defined.
+    """
+    identities: list[str] = []
+    for func in callables:
+        module_name = getattr(func, "__module__", None) or ""
+        module = sys.modules.get(module_name)
+        identities.append(
+            f"{module_name}.{getattr(func, '__qualname__', repr(func))}"
+            f"@{getattr(module, '__version__', '')}"
+        )
+
+    return _hash(*sorted(identities))
+
+
+class BuildCache:
+    """An on disk cache of rendered file content.
+
+    Entries are keyed on the source of the file and its frontmatter.
+    Each entry also records which global variables the template
+    read while rendering, and is only reused when those globals
+    still hash to the same value. Reads of ``files``, ``folders``
+    and ``backlinks`` are tracked per entry.
+
+    Renders which call file plugins or ``insert_table_from_csv``
+    are never cached, as their output can depend on state outside
+    of the report sources.
+
+    A file may be rendered against more than one state of the
+    globals within a run, so a few variants are kept per source.
+    """
+
+    tracked_names: set[str] = {"files", "folders", "backlinks"}
+    """Globals whose reads are recorded as dependencies
+    rather than hashed as a whole"""
+
+    max_variants: int = 4
+    """How many renders to keep for a single source"""
+
+    def __init__(self, path: Path, *, fingerprint: str) -> None:
+        self.path: Path = path
+        self.fingerprint: str = fingerprint
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: dict[str, list[dict[str, typing.Any]]] = {}
+        self._used_entries: dict[str, list[dict[str, typing.Any]]] = {}
+        self._digests: dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return f"BuildCache({self.path=}, {self.hits=}, {self.misses=})"
+
+    @classmethod
+    def load(cls, path: Path, *, fingerprint: str) -> BuildCache:
+        """Load a cache from disk, starting fresh if it is missing or stale."""
+        cache = cls(path, fingerprint=fingerprint)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cache
+        except ValueError:
+            log.warning("Ignoring corrupt build cache\n\tFile: %s", path)
+            return cache
+
+        if (
+            data.get("version") == CACHE_FORMAT_VERSION
+            and data.get("fingerprint") == fingerprint
+        ):
+            cache._entries = data.get("entries", {})
+
+        return cache
+
+    def save(self) -> None:
+        """Write the cache to disk, dropping entries unused in this run."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(
+                {
+                    "version": CACHE_FORMAT_VERSION,
+                    "fingerprint": self.fingerprint,
+                    "entries": self._used_entries,
+                },
+                f,
+            )
+
+    def reset_digests(self) -> None:
+        """Forget hashed global values, call whenever globals change."""
+        self._digests = {}
+
+    def forget_digests(self, *names: str) -> None:
+        """Forget the hashed values of specific globals."""
+        for name in names:
+            self._digests.pop(name, None)
+
+    @classmethod
+    def source_key(cls, file: File) -> str:
+        return _hash(str(file.file), file.content, _dump(file.variables))
+
+    def _digest(self, name: str, variables: Mapping) -> str:
+        if name not in self._digests:
+            mapping_name, _, key = name.partition(":")
+            if key:
+                value = variables.get(mapping_name, {}).get(key)
+            else:
+                value = variables.get(mapping_name)
+
+            self._digests[name] = _hash(_dump(value))
+
+        return self._digests[name]
+
+    def globals_digest(self, names: Iterable[str], variables: Mapping) -> str:
+        """Hash the values of the given globals.
+
+        Names of the form ``files:<id>`` or ``folders:<name>``
+        hash a single entry of that global.
+        """
+        return _hash(*(f"{n}={self._digest(n, variables)}" for n in sorted(names)))
+
+    def get(
+        self, key: str, global_variables: Mapping
+    ) -> tuple[str, set[Dependency]] | None:
+        """Return a cached render if it is still valid.
+
+        Parameters
+        ----------
+        key: str
+            The files :meth:`source_key`
+        global_variables: Mapping
+            The global variables the file is being rendered with
+
+        Returns
+        -------
+        tuple[str, set[Dependency]] | None
+            The rendered content and the dependencies
+            recorded when it was rendered.
+        """
+        for entry in self._entries.get(key, []):
+            if entry["digest"] == self.globals_digest(entry["names"], global_variables):
+                self.hits += 1
+                self._mark_used(key, entry)
+                return entry["content"], {
+                    (name, dependency_key)
+                    for name, dependency_key in entry["dependencies"]
+                }
+
+        self.misses += 1
+        return None
+
+    def _mark_used(self, key: str, entry: dict[str, typing.Any]) -> None:
+        used = self._used_entries.setdefault(key, [])
+        if entry not in used:
+            used.append(entry)
+
+    def set(
+        self,
+        key: str,
+        *,
+        sources: list[str],
+        rendered: str,
+        environment: Environment,
+        global_variables: Mapping,
+        dependencies: set[Dependency],
+    ) -> None:
+        """Store the render of a file.
+
+        Parameters
+        ----------
+        key: str
+            The files :meth:`source_key` prior to rendering
+        sources: list[str]
+            Every template rendered to reach the final output
+        rendered: str
+            The final output
+        environment: Environment
+            The environment used to parse the templates
+        global_variables: Mapping
+            The global variables the file was rendered with
+        dependencies: set[Dependency]
+            The reads of tracked globals made while rendering
+        """
+        if any(name == "volatile" for name, _ in dependencies):
+            return
+
+        names: set[str] = set()
+        for source in sources:
+            for name in meta.find_undeclared_variables(environment.parse(source)):
+                if name in global_variables and name not in self.tracked_names:
+                    names.add(name)
+
+        for name, dependency_key in dependencies:
+            names.add(name if dependency_key is None else f"{name}:{dependency_key}")
+
+        entry = {
+            "names": sorted(names),
+            "digest": self.globals_digest(names, global_variables),
+            "content": rendered,
+            "dependencies": sorted(dependencies, key=repr),
+        }
+        variants = [
+            variant
+            for variant in self._entries.get(key, [])
+            if variant["digest"] != entry["digest"]
+        ]
+        self._entries[key] = [entry, *variants][: self.max_variants]
+        self._mark_used(key, entry)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import typing
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from jinja2 import Environment, Template
+
+
+class TemplateCache:
+    """A least recently used cache of compiled Jinja templates.
+
+    Compiling a template means lexing, parsing and generating
+    Python code for it, which is wasted work when the same
+    source is rendered again. Templates are keyed on a hash
+    of their source and the identity of their globals.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """
+        Parameters
+        ----------
+        maxsize: int
+            How many compiled templates to keep.
+            Setting this to 0 disables caching.
+        """
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._templates: OrderedDict[tuple[str, int], Template] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return (
+            f"TemplateCache({self.maxsize=}, {self.hits=}, "
+            f"{self.misses=}, currsize={len(self)})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def clear(self) -> None:
+        """Remove all cached templates, leaving the counters alone."""
+        self._templates.clear()
+
+    def get_template(
+        self,
+        environment: Environment,
+        source: str,
+        globals: MutableMapping[str, typing.Any] | None = None,
+    ) -> Template:
+        """Return a compiled template for the given source.
+
+        Parameters
+        ----------
+        environment: Environment
+            The environment to compile the template with
+        source: str
+            The template source
+        globals: MutableMapping[str, typing.Any] | None
+            Globals to make available to the template.
+
+            These are referenced rather than copied, so
+            later changes to them are seen by cached templates.
+        """
+        # The cached template holds a reference to its globals
+        # so their id cannot be reused while the entry exists
+        key = (hashlib.sha1(source.encode("utf-8")).hexdigest(), id(globals))
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return template
+
+        self.misses += 1
+        if environment.bytecode_cache is None:
+            template = environment.from_string(source, globals=globals)
+        else:
+            template = self._load_with_bytecode_cache(
+                environment, source, globals, source_hash=key[0]
+            )
+
+        if self.maxsize > 0:
+            self._templates[key] = template
+            if len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+
+        return template
+
+    @classmethod
+    def bytecode_cache_name(
+        cls,
+        environment: Environment,
+        globals: MutableMapping[str, typing.Any] | None,
+        *,
+        source_hash: str,
+    ) -> str:
+        """The name a template is stored under within a bytecode cache.
+
+        This includes the environment type, such as whether it is
+        sandboxed, its syntax options and the names of the provided
+        globals so that changing any of them never reuses old bytecode.
+        """
+        options = (
+            environment.block_start_string,
+            environment.variable_start_string,
+            environment.comment_start_string,
+            environment.trim_blocks,
+            environment.lstrip_blocks,
+            environment.keep_trailing_newline,
+            environment.autoescape,
+        )
+        global_names = ",".join(sorted(globals or ()))
+        return (
+            f"{type(environment).__module__}.{type(environment).__qualname__}"
+            f"|{options!r}|{global_names}|{source_hash}"
+        )
+
+    def _load_with_bytecode_cache(
+        self,
+        environment: Environment,
+        source: str,
+        globals: MutableMapping[str, typing.Any] | None,
+        *,
+        source_hash: str,
+    ) -> Template:
+        # Templates from strings skip the bytecode cache in Jinja,
+        # so this mirrors what jinja2.loaders.BaseLoader.load does
+        bytecode_cache = environment.bytecode_cache
+        bucket = bytecode_cache.get_bucket(
+            environment,
+            self.bytecode_cache_name(environment, globals, source_hash=source_hash),
+            None,
+            source,
+        )
+        code = bucket.code
+        if code is None:
+            code = environment.compile(source)
+            bucket.code = code
+            bytecode_cache.set_bucket(bucket)
+
+        return environment.template_class.from_code(
+            environment, code, environment.make_globals(globals)
+        )
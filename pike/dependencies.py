@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import contextlib
+import heapq
+import typing
+from collections.abc import Callable, Iterator
+
+if typing.TYPE_CHECKING:
+    from pike import File
+
+Dependency = tuple[str, str | None]
+"""A global mapping name and the key read from it.
+
+A key of None means the entire mapping was read,
+for example by iterating over it.
+"""
+
+
+class DependencyRecorder:
+    """Records which tracked global variables templates read."""
+
+    def __init__(self) -> None:
+        self._stack: list[set[Dependency]] = []
+
+    @contextlib.contextmanager
+    def record(self) -> Iterator[set[Dependency]]:
+        """Record all reads made within this context.
+
+        Nested recordings only record into the innermost context.
+        """
+        dependencies: set[Dependency] = set()
+        self._stack.append(dependencies)
+        try:
+            yield dependencies
+        finally:
+            self._stack.pop()
+
+    def add(self, name: str, key: str | None = None) -> None:
+        if self._stack:
+            self._stack[-1].add((name, key))
+
+
+class TrackedDict(dict):
+    """A dict which reports reads of it to a DependencyRecorder.
+
+    Looking up a single key records just that key,
+    anything which observes the whole dict records all of it.
+    """
+
+    def __init__(
+        self,
+        recorder: DependencyRecorder,
+        name: str,
+        *,
+        default_factory: Callable[[], typing.Any] | None = None,
+    ) -> None:
+        super().__init__()
+        self._recorder: DependencyRecorder = recorder
+        self._name: str = name
+        self._default_factory: Callable[[], typing.Any] | None = default_factory
+
+    def __reduce__(self):
+        # Pickle as a plain dict, the recorder is process local
+        return dict, (dict(self),)
+
+    def __missing__(self, key):
+        if self._default_factory is None:
+            raise KeyError(key)
+
+        value = self[key] = self._default_factory()
+        return value
+
+    def __getitem__(self, key):
+        self._recorder.add(self._name, key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._recorder.add(self._name, key)
+        return super().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        self._recorder.add(self._name, key)
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self._recorder.add(self._name)
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._recorder.add(self._name)
+        return super().__len__()
+
+    def keys(self):
+        self._recorder.add(self._name)
+        return super().keys()
+
+    def values(self):
+        self._recorder.add(self._name)
+        return super().values()
+
+    def items(self):
+        self._recorder.add(self._name)
+        return super().items()
+
+
+class DependencyGraph:
+    """Which files read which other files while rendering."""
+
+    def __init__(self, files: list[File]) -> None:
+        """
+        Parameters
+        ----------
+        files: list[File]
+            The files to build the graph from,
+            their dependencies must already be recorded.
+        """
+        self.files: list[File] = files
+        by_id: dict[str, int] = {}
+        by_folder: dict[str, set[int]] = {}
+        for idx, file in enumerate(files):
+            # Later files win on duplicate ids, same as the globals
+            by_id[file.id] = idx
+            by_folder.setdefault(file.folder.name, set()).add(idx)
+
+        every_file: set[int] = set(range(len(files)))
+        self.dependencies: list[set[int]] = []
+        self.dependents: list[set[int]] = [set() for _ in files]
+        for idx, file in enumerate(files):
+            reads: set[int] = set()
+            for name, key in file.dependencies:
+                if key is None:
+                    reads |= every_file
+                elif name == "files" and key in by_id:
+                    reads.add(by_id[key])
+                elif name == "folders":
+                    reads |= by_folder.get(key, set())
+
+            # Files reading themselves see their own
+            # source, re-rendering them won't change that
+            reads.discard(idx)
+            self.dependencies.append(reads)
+            for dependency in reads:
+                self.dependents[dependency].add(idx)
+
+    def topological_order(self) -> list[int]:
+        """Return file indexes with dependencies before their dependents.
+
+        Files within a dependency cycle keep their original order.
+        """
+        remaining: list[int] = [len(deps) for deps in self.dependencies]
+        # A heap so the lowest index goes first, keeping
+        # the result as close to the original order as possible
+        ready: list[int] = [idx for idx, count in enumerate(remaining) if count == 0]
+        heapq.heapify(ready)
+        order: list[int] = []
+        seen: set[int] = set()
+        while True:
+            while ready:
+                idx = heapq.heappop(ready)
+                order.append(idx)
+                seen.add(idx)
+                for dependent in self.dependents[idx]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(ready, dependent)
+
+            if len(order) == len(self.dependencies):
+                return order
+
+            # Break a cycle by releasing the first file left
+            idx = next(i for i in range(len(remaining)) if i not in seen)
+            remaining[idx] = 0
+            heapq.heappush(ready, idx)
@@ -1,6 +1,22 @@
+from __future__ import annotations
+
+import typing
+
+from pike._lazy import lazy_module
 from .ast_util import check_has_next, get_up_to_token
 from .structs import CurrentRun, Variables, List, CurrentListNesting, TableContext
-from .docx import Docx
+
+if typing.TYPE_CHECKING:
+    from . import commands, walker
+    from .docx import Docx
+
+# Loaded on first use so markdown only builds
+# never have to import python-docx and lxml
+_lazy_attributes: dict[str, str] = {
+    "Docx": ".docx",
+    "commands": ".commands",
+    "walker": ".walker",
+}
 
 __all__ = (
     "check_has_next",
@@ -12,4 +28,8 @@ __all__ = (
     "CurrentListNesting",
     "TableContext",
     "commands",
+    "walker",
 )
+
+
+__getattr__, __dir__ = lazy_module(globals(), _lazy_attributes)
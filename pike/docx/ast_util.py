@@ -1,4 +1,10 @@
-from markdown_it.token import Token
+from __future__ import annotations
+
+import itertools
+import typing
+
+if typing.TYPE_CHECKING:
+    from markdown_it.token import Token
 
 
 def check_has_next(ast: list[Token], next_idx: int) -> bool:
@@ -35,12 +41,8 @@ def get_up_to_token(
         The new smaller list.
     """
     data: list[Token] = []
-    current_token_index = current_idx
-    while check_has_next(ast, current_token_index):
-        current_token: Token = ast[current_token_index]
+    for current_token in itertools.islice(ast, current_idx, None):
         data.append(current_token)
-        current_token_index += 1
-
         if current_token.type == end_token_type:
             break
 
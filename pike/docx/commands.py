@@ -1,37 +1,424 @@
 from __future__ import annotations
 
+import contextlib
+import functools
+import inspect
+import json
 import logging
 import re
+import types
 import typing
 from base64 import b64decode, b64encode
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
 from io import StringIO
 from pathlib import Path
-from typing import Final, Any
-from unittest.mock import Mock
-
-import commons
-from skelmis.docx.enum.text import WD_TAB_LEADER
-from skelmis.docx.oxml import OxmlElement
-from skelmis.docx.shared import Length
-from skelmis.docx.text.paragraph import Paragraph
-from skelmis.docx.text.run import Run
-from pydantic import BaseModel
+from typing import Final, Any, Iterator
 
 from pike import structs
 from pike.docx import CurrentRun
 
 if typing.TYPE_CHECKING:
+    from skelmis.docx.text.paragraph import Paragraph
+
     from pike.docx import Docx
 
 log = logging.getLogger(__name__)
 MARKER: Final[str] = "MARK-807e2383866d289f54e35bb8b2f2918c"
 COMMAND_REGEX: Final[re.Pattern] = re.compile(rf"(<{MARKER}.*?>)")
+HANDLE_REGEX: Final[re.Pattern] = re.compile(rf"<{MARKER} REF(\d+)>")
+# How often split_str_into_command_blocks takes each path,
+# since the last call to reset_split_statistics
+_split_counts: Counter[str] = Counter()
+
+
+class Command:
+    """A custom command parsed out of a document"""
+
+    def __init__(
+        self,
+        *,
+        command: str,
+        arguments: list[str],
+        keyword_arguments: dict[str, str],
+    ):
+        self.command: str = command
+        self.arguments: list[str] = arguments
+        self.keyword_arguments: dict[str, str] = keyword_arguments
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+
+    def __repr__(self):
+        return f"Command({self.command=},{self.arguments=},{self.keyword_arguments=})"
+
+
+def _to_bool(value: str | bool) -> bool:
+    # Imported when first converting, as importing commons is slow
+    import commons
+
+    return commons.value_to_bool(value)
+
+
+def _to_list(value: str | list) -> list:
+    value = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(value, list):
+        raise ValueError(f"Expected a JSON list, not {repr(value)}")
+
+    return value
+
+
+def _to_dict(value: str | dict) -> dict:
+    value = json.loads(value) if isinstance(value, str) else value
+    if not isinstance(value, dict):
+        raise ValueError(f"Expected a JSON object, not {repr(value)}")
+
+    return value
+
+
+def _to_optional(converter: Callable[[str], Any], value: str) -> Any:
+    # Templates send None as "None"
+    return None if value in ("", "None") else converter(value)
+
+
+_CONVERTERS: Final[dict[type, Callable[[str], Any]]] = {
+    bool: _to_bool,
+    int: int,
+    float: float,
+    list: _to_list,
+    dict: _to_dict,
+}
+
+
+def _type_hints(command_callable: Callable[..., Any]) -> dict[str, Any]:
+    """The resolved annotations of a command, leaving out those which can't be."""
+    try:
+        return typing.get_type_hints(command_callable)
+    except Exception:
+        pass
+
+    # Such as a name only imported when type checking, so
+    # resolve the others one at a time to still convert them
+    hints: dict[str, Any] = {}
+    global_namespace = getattr(command_callable, "__globals__", {})
+    for name, annotation in getattr(command_callable, "__annotations__", {}).items():
+        with contextlib.suppress(Exception):
+            hints.update(
+                typing.get_type_hints(
+                    types.SimpleNamespace(__annotations__={name: annotation}),
+                    globalns=global_namespace,
+                )
+            )
+
+    return hints
+
+
+def _argument_converter(annotation: Any) -> Callable[[str], Any] | None:
+    """The converter for a parameters annotation, None meaning leave it as is"""
+    if isinstance(annotation, str):
+        # An annotation which could not be resolved
+        return None
+
+    optional: bool = False
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        members = [
+            member for member in typing.get_args(annotation) if member is not type(None)
+        ]
+        if len(members) != 1:
+            return None
+
+        optional = True
+        annotation = members[0]
+
+    converter = _CONVERTERS.get(typing.get_origin(annotation) or annotation)
+    if converter is None or not optional:
+        return converter
+
+    # Empty strings are how templates leave optional arguments unset
+    return functools.partial(_to_optional, converter)
+
+
+class CommandSignature:
+    """The arguments a custom command accepts.
+
+    Built once when the command is registered, this converts
+    the string arguments of a :class:`Command` into what the
+    command's annotations ask for. Parameters annotated as
+    ``bool``, ``int``, ``float``, ``list`` or ``dict`` are converted,
+    with lists and dicts given as JSON. Anything else is left as a string.
+
+    An empty string or ``None`` is None for optional parameters,
+    such as ``int | None``. Commands without a signature,
+    such as some builtins, are given their arguments as is.
+    """
+
+    def __init__(
+        self,
+        command_callable: Callable[..., Any],
+        *,
+        provide_docx_instance: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        command_callable: Callable[..., Any]
+            The custom command
+        provide_docx_instance: bool
+            Whether the first parameter is the docx
+            instance rather than an argument.
+        """
+        self.signature: inspect.Signature | None = None
+        self.positional: list[tuple[str, Callable[[str], Any] | None]] = []
+        self.variadic: Callable[[str], Any] | None = None
+        self.keyword: dict[str, Callable[[str], Any]] = {}
+        self._converts_positional: bool = False
+        try:
+            signature = inspect.signature(command_callable)
+        except ValueError:
+            log.debug(
+                "%r has no signature, its arguments won't be converted",
+                command_callable,
+            )
+            return
+
+        parameters = list(signature.parameters.values())
+        if provide_docx_instance:
+            parameters = parameters[1:]
+
+        self.signature = signature.replace(parameters=parameters)
+        hints = _type_hints(command_callable)
+        for parameter in parameters:
+            converter = _argument_converter(
+                hints.get(parameter.name, parameter.annotation)
+            )
+            if parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+                self.variadic = converter
+                continue
+
+            if parameter.kind in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            ):
+                self.positional.append((parameter.name, converter))
+
+            if (
+                parameter.kind is not inspect.Parameter.POSITIONAL_ONLY
+                and converter is not None
+            ):
+                self.keyword[parameter.name] = converter
+
+        self._converts_positional = self.variadic is not None or any(
+            converter is not None for _, converter in self.positional
+        )
+
+    def __repr__(self):
+        return f"CommandSignature({self.signature})"
+
+    def convert(
+        self, arguments: list[str], keyword_arguments: dict[str, str]
+    ) -> tuple[list[Any], dict[str, Any]]:
+        """Convert the arguments of a command into the types it expects.
+
+        Raises
+        ------
+        ValueError
+            An argument could not be converted
+        """
+        converted_arguments: list[Any] = arguments
+        if arguments and self._converts_positional:
+            converted_arguments = []
+            for idx, argument in enumerate(arguments):
+                if idx < len(self.positional):
+                    name, converter = self.positional[idx]
+                else:
+                    name, converter = "*args", self.variadic
+
+                if converter is not None:
+                    try:
+                        argument = converter(argument)
+                    except ValueError as e:
+                        raise ValueError(f"Invalid value for {name}: {e}") from None
+
+                converted_arguments.append(argument)
+
+        if not self.keyword:
+            return converted_arguments, keyword_arguments
+
+        converted_keyword_arguments: dict[str, Any] = {}
+        for key, value in keyword_arguments.items():
+            converter = self.keyword.get(key)
+            if converter is not None:
+                try:
+                    value = converter(value)
+                except ValueError as e:
+                    raise ValueError(f"Invalid value for {key}: {e}") from None
+
+            converted_keyword_arguments[key] = value
+
+        return converted_arguments, converted_keyword_arguments
+
+    def validate(self, arguments: list[str], keyword_arguments: dict[str, str]) -> None:
+        """Check the arguments of a command will be accepted.
+
+        Raises
+        ------
+        ValueError
+            The arguments don't match the signature, or can't be converted
+        """
+        if self.signature is not None:
+            try:
+                self.signature.bind(*arguments, **keyword_arguments)
+            except TypeError as e:
+                raise ValueError(str(e)) from None
+
+        self.convert(arguments, keyword_arguments)
+
+
+def create_checked_command_string(
+    signature: CommandSignature, command_name: str, *args: Any, **kwargs: Any
+) -> str:
+    """Create a command string once the arguments are known to be valid.
+
+    This is what templates call custom commands through, so mistakes are
+    reported when rendering rather than when building the word document.
+
+    Raises
+    ------
+    ValueError
+        The arguments are not valid for the command
+    """
+    # Lists and dicts are sent as JSON so they can be converted back
+    arguments: list[str] = [_argument_to_str(argument) for argument in args]
+    keyword_arguments: dict[str, str] = {
+        key: _argument_to_str(value) for key, value in kwargs.items()
+    }
+    try:
+        signature.validate(arguments, keyword_arguments)
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid arguments for custom command {command_name}: {e}"
+        ) from None
+
+    return create_command_string(command_name, *arguments, **keyword_arguments)
+
+
+def _argument_to_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+
+    return str(value)
+
+
+class CommandRegistry:
+    """Commands created during a single build.
+
+    While in use, see :func:`use_command_registry`, custom commands
+    are stored here and only a short handle such as
+    ``<MARKER REF12>`` is placed within the markdown. This saves
+    encoding and then decoding every argument, and keeps the
+    markdown for large tables small. Identical commands share
+    the same handle.
+    """
+
+    def __init__(self) -> None:
+        self._commands: list[Command] = []
+        self._handles: dict[tuple, str] = {}
+
+    def __repr__(self):
+        return f"CommandRegistry(commands={len(self._commands)})"
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def add(
+        self,
+        command_name: str,
+        arguments: tuple[str, ...],
+        keyword_arguments: dict[str, str],
+    ) -> str:
+        """Store a command, returning the handle which refers to it."""
+        key = (command_name, arguments, tuple(keyword_arguments.items()))
+        handle = self._handles.get(key)
+        if handle is None:
+            handle = f"<{MARKER} REF{len(self._commands)}>"
+            self._commands.append(
+                Command(
+                    command=command_name,
+                    arguments=list(arguments),
+                    keyword_arguments=keyword_arguments,
+                )
+            )
+            self._handles[key] = handle
+
+        return handle
 
+    def get(self, handle: str) -> Command:
+        """Return the command a handle refers to.
 
-class Command(BaseModel):
-    command: str
-    arguments: list[str]
-    keyword_arguments: dict[str, str]
+        Raises
+        ------
+        LookupError
+            The handle was not created by this registry
+        """
+        match = HANDLE_REGEX.fullmatch(handle.strip())
+        if match is None or int(match[1]) >= len(self._commands):
+            raise LookupError(f"Unknown command handle: {repr(handle)}")
+
+        return self._commands[int(match[1])]
+
+    def expand(self, text: str) -> str:
+        """Replace every handle within the text with the full command string.
+
+        Used for anything which outlives the build, such
+        as the markdown output and the build cache.
+        """
+        if f"<{MARKER} REF" not in text:
+            return text
+
+        def inline(match: re.Match) -> str:
+            command = self.get(match[0])
+            return _inline_command_string(
+                command.command, *command.arguments, **command.keyword_arguments
+            )
+
+        return HANDLE_REGEX.sub(inline, text)
+
+
+_command_registry: ContextVar[CommandRegistry | None] = ContextVar(
+    "command_registry", default=None
+)
+
+
+@contextlib.contextmanager
+def use_command_registry(
+    registry: CommandRegistry | None,
+) -> Iterator[CommandRegistry | None]:
+    """Create and resolve commands using the given registry within this context.
+
+    Parameters
+    ----------
+    registry: CommandRegistry | None
+        The registry to use, or None to always
+        create full command strings.
+    """
+    token = _command_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _command_registry.reset(token)
+
+
+def expand_command_handles(text: str) -> str:
+    """Replace handles from the registry in use with full command strings.
+
+    See :meth:`CommandRegistry.expand`
+    """
+    registry = _command_registry.get()
+    return text if registry is None else registry.expand(text)
 
 
 def _b64_encode(content: str) -> str:
@@ -46,6 +433,16 @@ def _b64_decode(content: str) -> str:
 
 def parse_command_string(command: str) -> Command:
     command = command.strip()
+    if HANDLE_REGEX.fullmatch(command):
+        registry = _command_registry.get()
+        if registry is None:
+            raise LookupError(
+                f"Command handles can only be used within the build "
+                f"which created them: {repr(command)}"
+            )
+
+        return registry.get(command)
+
     if (
         not command.startswith(f"<{MARKER}")
         or not command.endswith(">")
@@ -103,11 +500,32 @@ def create_command_string(
     All arguments will be turned into strings, it is expected
     that the command itself turns things back into required data structures.
 
+    When a :class:`CommandRegistry` is in use, the command is stored
+    there and a short handle to it is returned instead.
+
     Returns
     -------
     str
         A formatted command string built using HTML blocks.
     """
+    registry = _command_registry.get()
+    if registry is None:
+        return _inline_command_string(command_name, *args, **kwargs)
+
+    return registry.add(
+        command_name,
+        tuple(
+            argument if isinstance(argument, str) else str(argument)
+            for argument in args
+        ),
+        {
+            key: value if isinstance(value, str) else str(value)
+            for key, value in kwargs.items()
+        },
+    )
+
+
+def _inline_command_string(command_name: str, *args: Any, **kwargs: Any) -> str:
     data = StringIO()
 
     data.write(f"<{MARKER} {command_name} ARGS")
@@ -130,6 +548,10 @@ def create_command_string(
     return data.getvalue()
 
 
+# Tables repeat the same few commands across thousands of cells
+_parse_cached_command_string = functools.lru_cache(maxsize=4096)(parse_command_string)
+
+
 def split_str_into_command_blocks(text: str) -> list[str | Command]:
     """Given text, return commands + raw content
 
@@ -137,20 +559,76 @@ def split_str_into_command_blocks(text: str) -> list[str | Command]:
     ----------
     text: str
         The text which may or may not contain commands
+
+    Notes
+    -----
+    Recently seen command strings are only parsed once, so
+    the same :class:`Command` may be returned more than once
+    and should not be modified.
     """
-    data: list[str | Command] = []
-    for entry in re.split(COMMAND_REGEX, text):
-        if entry == "":
-            continue
+    if MARKER not in text:
+        _split_counts["plain"] += 1
+        return [text] if text else []
 
-        try:
+    _split_counts["with_commands"] += 1
+    data: list[str | Command] = []
+    # Splitting on a capture group puts the commands at odd indexes
+    for idx, entry in enumerate(re.split(COMMAND_REGEX, text)):
+        if idx % 2 == 0:
+            if entry != "":
+                data.append(entry)
+
+        elif HANDLE_REGEX.fullmatch(entry):
+            # Registries are per build so must not be cached
+            _split_counts["handles"] += 1
             data.append(parse_command_string(entry))
-        except ValueError:
-            data.append(entry)
+
+        else:
+            try:
+                data.append(_parse_cached_command_string(entry))
+            except ValueError:
+                data.append(entry)
 
     return data
 
 
+def split_statistics() -> dict[str, int]:
+    """How often :func:`split_str_into_command_blocks` took each path.
+
+    Counts are since the last :func:`reset_split_statistics`,
+    which :meth:`pike.Engine.run` calls at the start of every build.
+
+    Returns
+    -------
+    dict[str, int]
+        Keyed by:
+
+        - ``plain``: Text without commands, returned as is
+        - ``with_commands``: Text which had to be split up
+        - ``handles``: Commands resolved from a :class:`CommandRegistry`
+        - ``parse_cache_hits``: Command strings which had already been parsed
+        - ``parse_cache_misses``: Command strings which had to be parsed
+    """
+    cache_info = _parse_cached_command_string.cache_info()
+    return {
+        "plain": _split_counts["plain"],
+        "with_commands": _split_counts["with_commands"],
+        "handles": _split_counts["handles"],
+        "parse_cache_hits": cache_info.hits,
+        "parse_cache_misses": cache_info.misses,
+    }
+
+
+def reset_split_statistics() -> None:
+    """Start counting :func:`split_statistics` from zero.
+
+    This also empties the cache of parsed command strings,
+    as its hits and misses can't be reset on their own.
+    """
+    _split_counts.clear()
+    _parse_cached_command_string.cache_clear()
+
+
 def insert_page_break(docx: Docx):
     """A custom command to add a page break to the document."""
     docx.template_file.add_page_break()
@@ -172,11 +650,11 @@ def insert_text(
     docx: Docx,
     text: str,
     *,
-    inline: bool = None,
-    bold: bool = None,
-    italic: bool = None,
-    highlight: bool = None,
-    underline: bool = None,
+    inline: bool = False,
+    bold: bool = False,
+    italic: bool = False,
+    highlight: bool = False,
+    underline: bool = False,
     style: str = None,
 ):
     """A custom command to add a text block to the document.
@@ -202,11 +680,7 @@ def insert_text(
 
         Cannot be used in conjunction with inline.
     """
-    bold = commons.value_to_bool(bold)
-    inline = commons.value_to_bool(inline)
-    italic = commons.value_to_bool(italic)
-    highlight = commons.value_to_bool(highlight)
-    underline = commons.value_to_bool(underline)
+    from skelmis.docx.text.run import Run
 
     if style is not None and inline is True:
         raise ValueError("Style and Inline are mutually exclusive.")
@@ -240,6 +714,43 @@ def insert_text(
     )
 
 
+def insert_csv_table(
+    docx: Docx,
+    file: str,
+    *,
+    file_contains_headers: bool = True,
+    columns: list | None = None,
+    row_limit: int | None = None,
+    chunk_size: int = 1000,
+):
+    """A custom command to stream a CSV file into the document as a table.
+
+    Created by ``insert_table_from_csv`` when ``stream=True``.
+
+    Parameters
+    ----------
+    docx: Docx
+        The docx instance
+    file: str
+        The CSV file to read
+    file_contains_headers: bool
+        Does the CSV contain a header row?
+    columns: list | None
+        The columns to include, by header or index
+    row_limit: int | None
+        How many rows to include, not counting the header row
+    chunk_size: int
+        How many rows to read before writing them
+    """
+    docx.insert_csv_table(
+        Path(file),
+        file_contains_headers=file_contains_headers,
+        columns=columns,
+        row_limit=row_limit,
+        chunk_size=chunk_size,
+    )
+
+
 def insert_table_of_contents(
     docx: Docx,
     levels: int = 3,
@@ -278,6 +789,8 @@ def insert_internal_hyperlink(docx: Docx, bookmark_name: str, display_text: str)
     if docx.current_paragraph is None:
         docx.current_paragraph = docx.template_file.add_paragraph()
 
+    from unittest.mock import Mock
+
     hyperlink = docx.current_paragraph.add_internal_hyperlink(bookmark_name)
 
     fake_para = Mock()
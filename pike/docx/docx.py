@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import itertools
 import os
-import re
 import typing as t
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from copy import deepcopy
 from functools import partial
 from pathlib import Path
 from unittest.mock import Mock
 
 from skelmis.docx import Document
+from skelmis.docx.document import Document as DocumentObject
 from skelmis.docx.enum.style import WD_STYLE_TYPE
 from skelmis.docx.enum.table import WD_TABLE_ALIGNMENT
 from skelmis.docx.enum.text import WD_COLOR_INDEX, WD_PARAGRAPH_ALIGNMENT
@@ -22,24 +24,20 @@ from skelmis.docx.text.parfmt import ParagraphFormat
 from skelmis.docx.text.run import Run
 from markdown_it.token import Token
 
-from pike import utils, structs
-from pike.docx import (
-    Variables,
-    List,
-    check_has_next,
-    commands,
-    get_up_to_token,
-    CurrentRun,
-)
+from pike import rendering, structs
+from pike.docx import Variables, commands, walker, CurrentRun
+from pike.docx.walker import html_attribute_pattern  # noqa: F401
 
 if t.TYPE_CHECKING:
     from pike import Engine
 
     from skelmis.docx.document import Document
 
-html_attribute_pattern: re.Pattern = re.compile(
-    r"(\S+)=[\"']?((?:.(?![\"']?\s+\S+=|\s*/?[>\"']))+.)[\"']?"
-)
+_table_alignments: dict[structs.TextAlignment, WD_TABLE_ALIGNMENT] = {
+    structs.TextAlignment.LEFT: WD_TABLE_ALIGNMENT.LEFT,
+    structs.TextAlignment.CENTER: WD_TABLE_ALIGNMENT.CENTER,
+    structs.TextAlignment.RIGHT: WD_TABLE_ALIGNMENT.RIGHT,
+}
 
 
 class Docx:
@@ -59,6 +57,11 @@ class Docx:
             # which need an out to avoid displaying None
             "NOP": lambda: None,
         }
+        self.command_signatures: dict[str, commands.CommandSignature] = {}
+        self.token_handlers: dict[str, walker.TokenHandler] = {
+            **walker.DEFAULT_TOKEN_HANDLERS,
+            **engine._token_handlers,
+        }
 
         # These can be used by external things
         # Check they are None first, but they do exist
@@ -97,27 +100,81 @@ class Docx:
         -------
         Docx
             The current instance to allow for method chaining.
+
+        Notes
+        -----
+        Arguments are converted to the types the command is annotated
+        with, see :class:`~pike.docx.commands.CommandSignature`.
         """
+        self.command_signatures[command_name] = commands.CommandSignature(
+            command_callable, provide_docx_instance=provide_docx_instance
+        )
         if provide_docx_instance:
             command_callable = partial(command_callable, self)
 
         self.commands[command_name] = command_callable
         return self
 
+    def register_token_handler(
+        self, token_type: str, handler: walker.TokenHandler
+    ) -> t.Self:
+        """Handle a markdown-it token type when walking the AST.
+
+        Replaces any existing handler for the token type,
+        the previous one remains available as ``docx.token_handlers[token_type]``
+        if you need to fetch it beforehand in order to wrap it.
+
+        Parameters
+        ----------
+        token_type: str
+            The token type to handle, such as ``math_block``
+        handler: walker.TokenHandler
+            Called with the Docx instance, the token and the
+            :class:`~pike.docx.walker.WalkState`. Returns how many
+            tokens it consumed, where None means just the one.
+
+        Returns
+        -------
+        Docx
+            The current instance to allow for method chaining.
+        """
+        self.token_handlers[token_type] = handler
+        return self
+
+    def run_command(self, command: commands.Command) -> t.Any:
+        """Call the custom command a command string refers to.
+
+        Raises
+        ------
+        ValueError
+            The command is not loaded or its arguments are invalid
+        """
+        command_callable = self.commands.get(command.command)
+        if command_callable is None:
+            raise ValueError(
+                f"Attempted to use an unknown custom command: {command.command}"
+            )
+
+        arguments, keyword_arguments = command.arguments, command.keyword_arguments
+        signature = self.command_signatures.get(command.command)
+        if signature is not None:
+            try:
+                arguments, keyword_arguments = signature.convert(
+                    arguments, keyword_arguments
+                )
+            except ValueError as e:
+                raise ValueError(
+                    f"Invalid arguments for custom command {command.command}: {e}"
+                ) from None
+
+        with self.engine.trace_span(command.command, category="command"):
+            return command_callable(*arguments, **keyword_arguments)
+
     def insert_cell(self, cell: structs.Cell) -> None:
         for entry in cell.content:
             for item in commands.split_str_into_command_blocks(entry.text):
                 if isinstance(item, commands.Command):
-                    command_callable = self.commands.get(item.command)
-                    if command_callable is None:
-                        raise ValueError(
-                            f"Attempted to use an unknown custom command: {item.command}"
-                        )
-
-                    command_callable(
-                        *item.arguments,
-                        **item.keyword_arguments,
-                    )
+                    self.run_command(item)
                 else:
                     self.add_text(
                         item,
@@ -126,10 +183,204 @@ class Docx:
                         paragraph=self.current_paragraph,
                     )
 
+    def insert_table(self, table: structs.Table) -> None:
+        """Add a table to the end of the document
+
+        Tables are written straight to the underlying XML where
+        possible, as going through python-docx for every cell
+        is slow for tables with thousands of rows.
+        """
+        columns: int = len(table.rows[0].cells)
+        if isinstance(self.template_file, DocumentObject) and all(
+            len(row.cells) == columns for row in table.rows
+        ):
+            self._insert_table_xml(
+                table.rows, columns=columns, text_alignment=table.text_alignment
+            )
+            return
+
+        docx_table = self.template_file.add_table(
+            rows=len(table.rows),
+            cols=columns,
+            style=self.engine.config["styles"]["table"],
+        )
+        for row_idx, row in enumerate(docx_table.rows):
+            for cell_idx, cell in enumerate(row.cells):
+                cell = t.cast(_Cell, cell)
+                current_cell_paragraph = cell.paragraphs[0]
+
+                alignment = _table_alignments.get(table.text_alignment[cell_idx])
+                if alignment is not None:
+                    current_cell_paragraph.paragraph_format.alignment = alignment
+
+                cell_model: structs.Cell = table.rows[row_idx].cells[cell_idx]
+                for entry in cell_model.content:
+                    self._insert_table_entry(current_cell_paragraph, entry)
+
+    def _insert_table_xml(
+        self,
+        rows: Iterable[structs.Row],
+        *,
+        columns: int,
+        text_alignment: list[structs.TextAlignment] | None = None,
+    ) -> None:
+        """Build the rows of a table as XML in a single pass.
+
+        Entries containing links or custom commands still go through
+        python-docx as they need the relevant proxy objects.
+
+        Parameters
+        ----------
+        rows: Iterable[structs.Row]
+            The rows to write, which are only iterated once
+        columns: int
+            How many cells each row has
+        text_alignment: list[structs.TextAlignment] | None
+            How to align each column, defaults to letting docx decide
+        """
+        docx_table = self.template_file.add_table(
+            rows=1,
+            cols=columns,
+            style=self.engine.config["styles"]["table"],
+        )
+        tbl = docx_table._tbl  # noqa
+        template_row = tbl.tr_lst[0]
+        tbl.remove(template_row)
+
+        alignments = [
+            _table_alignments.get(alignment)
+            for alignment in text_alignment or [structs.TextAlignment.NONE] * columns
+        ]
+        # Runs are copied from a template per style rather than
+        # being built up element by element through python-docx
+        runs: dict[tuple, t.Any] = {}
+        for row in rows:
+            tr = deepcopy(template_row)
+            for tc, cell_model, alignment in zip(tr.tc_lst, row.cells, alignments):
+                p = tc.p_lst[0]
+                if alignment is not None:
+                    p.get_or_add_pPr().jc_val = alignment
+
+                paragraph: Paragraph | None = None
+                for entry in cell_model.content:
+                    if entry.link is not None or commands.MARKER in entry.text:
+                        if paragraph is None:
+                            paragraph = _Cell(tc, docx_table).paragraphs[0]
+
+                        self._insert_table_entry(paragraph, entry)
+                        continue
+
+                    if entry.text == "":
+                        continue
+
+                    style = entry.style
+                    text = entry.text
+                    key = (
+                        style.bold,
+                        style.italic,
+                        style.underline,
+                        style.highlighted,
+                        # Whether xml:space="preserve" is needed
+                        len(text.strip()) < len(text),
+                    )
+                    if key not in runs:
+                        runs[key] = self._create_run(style, preserve_space=key[-1])
+
+                    r = deepcopy(runs[key])
+                    r[-1].text = text
+                    p.append(r)
+
+            tbl.append(tr)
+
+    def insert_csv_table(
+        self,
+        file: Path,
+        *,
+        file_contains_headers: bool = True,
+        columns: list[str | int] | None = None,
+        row_limit: int | None = None,
+        chunk_size: int = 1000,
+    ) -> None:
+        """Add a table to the end of the document straight from a CSV file.
+
+        Rows are read and written in chunks, so only ``chunk_size``
+        rows are ever held in memory rather than the whole file.
+
+        Parameters
+        ----------
+        file: Path
+            The CSV file to read
+        file_contains_headers: bool
+            Whether the first row of the CSV is a header row
+        columns: list[str | int] | None
+            Only include these columns, either by header or index
+        row_limit: int | None
+            Only include this many rows, not counting the header row
+        chunk_size: int
+            How many rows to read before writing them to the document
+        """
+        if self.template_file is None or not isinstance(
+            self.template_file, DocumentObject
+        ):
+            raise ValueError("CSV tables can only be streamed into a real document")
+
+        csv_rows = structs.Table.read_csv(
+            file,
+            file_contains_headers=file_contains_headers,
+            columns=columns,
+            row_limit=row_limit,
+        )
+        first_row = next(csv_rows, None)
+        if first_row is None:
+            return
+
+        def chunked_rows() -> t.Iterator[structs.Row]:
+            rows = itertools.chain([first_row], csv_rows)
+            while chunk := list(itertools.islice(rows, chunk_size)):
+                yield from [
+                    structs.Row(
+                        cells=[structs.Table.text_to_cell(cell) for cell in row]
+                    )
+                    for row in chunk
+                ]
+
+        self._insert_table_xml(chunked_rows(), columns=len(first_row))
+
+    def _insert_table_entry(self, paragraph: Paragraph, entry: structs.Entry) -> None:
+        if entry.link is not None:
+            if entry.link.is_external_hyperlink:
+                paragraph.add_external_hyperlink(entry.link.href, entry.link.text)
+                return
+
+            else:
+                raise ValueError(f"Unsure how to handle {entry.link}")
+
+        for item in commands.split_str_into_command_blocks(entry.text):
+            if isinstance(item, commands.Command):
+                old_pg = self.current_paragraph
+                self.current_paragraph = paragraph.add_run()
+                self.run_command(item)
+                self.current_paragraph = old_pg
+            else:
+                self.add_text(
+                    item,
+                    current_run=entry.style,
+                    document=self.template_file,
+                    paragraph=paragraph.add_run(),
+                )
+
+    @classmethod
+    def _create_run(cls, current_run: CurrentRun, *, preserve_space: bool):
+        """A ``w:r`` element styled as per :meth:`add_text` with an empty ``w:t``"""
+        run = Run(OxmlElement("w:r"), None)
+        cls._style_run(run, current_run)
+        run._r.add_t(" " if preserve_space else "")  # noqa
+        return run._r  # noqa
+
     def create_document(
         self,
         *,
-        content: str,
+        content: str | Iterable[str],
         filename: str,
     ) -> Path:
         """Given the combined markdown file, go turn it into a docx file.
@@ -138,16 +389,27 @@ class Docx:
         ----------
         filename: str
             Where to create the docx file.
-        content: str
-            The content to convert into a docx file.
+        content: str | Iterable[str]
+            The content to convert into a docx file,
+            or the chunks of it such as those from a streamed render.
 
         Returns
         -------
         Path
             The resultant docx file
         """
-        markdown = utils.create_markdown_it()
-        ast = markdown.parse(content)
+        if isinstance(content, list):
+            content = "".join(content)
+        elif not isinstance(content, str):
+            buffer = rendering.ChunkBuffer()
+            for chunk in content:
+                buffer.write(chunk)
+
+            content = buffer.getvalue()
+
+        with self.engine.profile_stage("markdown_parse"):
+            ast = self.engine.markdown_parser.parse(content)
+
         self.template_file = (
             Document(self.engine.config["docx_template"])
             if self.engine.config["docx_template"] != ""
@@ -179,8 +441,12 @@ class Docx:
                 self.insert_cell(as_formatting)
                 self.current_paragraph.add_run("\t")
 
-        self.walk_ast(template_file=self.template_file, ast=ast)
-        self.template_file.save(filename)
+        with self.engine.profile_stage("walk_ast"):
+            self.walk_ast(template_file=self.template_file, ast=ast)
+
+        with self.engine.profile_stage("save_docx"):
+            self.template_file.save(filename)
+
         return Path(filename).absolute()
 
     @classmethod
@@ -222,7 +488,11 @@ class Docx:
         else:
             run: Run = paragraph.add_run(content)
 
-        # Add the styles
+        cls._style_run(run, current_run)
+        return run
+
+    @classmethod
+    def _style_run(cls, run: Run, current_run: CurrentRun) -> None:
         run.bold = current_run.bold
         run.italic = current_run.italic
         run.underline = current_run.underline
@@ -231,8 +501,6 @@ class Docx:
         if current_run.highlighted:
             run.font.highlight_color = WD_COLOR_INDEX.YELLOW
 
-        return run
-
     def _configure_for_inline_code(self):
         style_name: str = "_Pike_Inline_Code"
         self.engine.config["styles"]["inline_code"] = style_name
@@ -302,6 +570,10 @@ class Docx:
     ) -> None:
         """Given an AST, go put the content into a Word document
 
+        Each token is passed to the handler registered for its type,
+        see :meth:`register_token_handler`. Nested tokens are walked
+        using an explicit stack rather than recursion.
+
         Parameters
         ----------
         template_file: Document
@@ -319,351 +591,28 @@ class Docx:
             # I.E. Low level usage
             self.template_file = template_file
 
-        # The following tags can be safely ignored
-        # as they get handled within other cases
-        ignorable_tags: set[str] = {
-            "link_close",
-        }
-
-        list_order_requires_restart: bool = False
-
-        current_token_index: int = 0
         if variables is None:
             variables = Variables()
 
-        while check_has_next(ast, current_token_index):
-            current_token: Token = ast[current_token_index]
-
-            match current_token.type:
-                case "inline":
-                    # Inline items content things
-                    # such as nested text etc
-                    self.walk_ast(
-                        template_file,
-                        current_token.children,
-                        variables=variables,
-                    )
-                case "strong_open":
-                    variables.current_run.bold = True
-                case "strong_close":
-                    variables.current_run.bold = None
-                case "em_open":
-                    variables.current_run.italic = True
-                case "em_close":
-                    variables.current_run.italic = None
-                case "paragraph_open":
-                    # Creates a new paragraph within text
-                    # This also handles the relevant styling
-                    # for usage with bullet points n such
-                    current_list: List | None = variables.get_current_list()
-                    if current_list is None:
-                        self.current_paragraph = template_file.add_paragraph()
-
-                    else:
-                        # We need to deal with list nesting's
-                        nesting_level = current_list.nesting.value
-                        if current_list.list_type == "bullet":
-                            style: str = self.engine.config["styles"]["bullet_lists"][
-                                f"level_{nesting_level}"  # noqa
-                            ]
-                        elif self.enable_ordered_lists:
-                            style: str = "List Number"
-                            if nesting_level != 1:
-                                style += f" {nesting_level}"
-                        else:
-                            style: str = self.engine.config["styles"]["ordered_lists"][
-                                f"level_{nesting_level}"  # noqa
-                            ]
-
-                        self.current_paragraph = template_file.add_paragraph(
-                            style=style
-                        )
-                        if (
-                            list_order_requires_restart
-                            and current_list.list_type != "bullet"
-                        ):
-                            # It's a new ordered list so requires restart
-                            self.current_paragraph.restart_numbering()
-                            list_order_requires_restart = False
-                case "paragraph_close":
-                    # Reset the current paragraph to null
-                    self.current_paragraph = None
-                case "heading_close":
-                    self.current_paragraph = None
-                case "softbreak":
-                    # This represents a newline
-                    if self.current_paragraph is None:
-                        # Unsure why this is None here...
-                        self.current_paragraph = self.current_paragraph = (
-                            template_file.add_paragraph()
-                        )
-                    else:
-                        # Else otherwise it'd be two newlines
-                        self.current_paragraph.add_run().add_break()
-                case "text":
-                    # Add text to document with current styles
-                    for item in commands.split_str_into_command_blocks(
-                        current_token.content
-                    ):
-                        if isinstance(item, commands.Command):
-                            command_callable = self.commands.get(item.command)
-                            if command_callable is None:
-                                raise ValueError(
-                                    f"Attempted to use an unknown custom command: {item.command}"
-                                )
-
-                            command_callable(
-                                *item.arguments,
-                                **item.keyword_arguments,
-                            )
-                        else:
-                            self.add_text(
-                                item,
-                                paragraph=self.current_paragraph,
-                                document=template_file,
-                                current_run=variables.current_run,
-                            )
-                case "table_open":
-                    # This denotes a Markdown table
-                    table_ast = get_up_to_token(
-                        ast,
-                        end_token_type="table_close",
-                        current_idx=current_token_index,
-                    )
-                    current_token_index += len(table_ast)
-                    table_model = structs.Table.from_ast(table_ast)
-                    docx_table = template_file.add_table(
-                        rows=len(table_model.rows),
-                        cols=len(table_model.rows[0].cells),
-                        style=self.engine.config["styles"]["table"],
-                    )
-                    for row_idx, row in enumerate(docx_table.rows):
-                        for cell_idx, cell in enumerate(row.cells):
-                            cell = t.cast(_Cell, cell)
-                            current_cell_paragraph = cell.paragraphs[0]
-
-                            if (
-                                table_model.text_alignment[cell_idx]
-                                != structs.TextAlignment.NONE
-                            ):
-                                match table_model.text_alignment[cell_idx]:
-                                    case structs.TextAlignment.LEFT:
-                                        current_cell_paragraph.paragraph_format.alignment = (
-                                            WD_TABLE_ALIGNMENT.LEFT
-                                        )
-                                    case structs.TextAlignment.CENTER:
-                                        current_cell_paragraph.paragraph_format.alignment = (
-                                            WD_TABLE_ALIGNMENT.CENTER
-                                        )
-                                    case structs.TextAlignment.RIGHT:
-                                        current_cell_paragraph.paragraph_format.alignment = (
-                                            WD_TABLE_ALIGNMENT.RIGHT
-                                        )
-
-                            cell_model: structs.Cell = table_model.rows[row_idx].cells[
-                                cell_idx
-                            ]
-                            for entry in cell_model.content:
-                                if entry.link is not None:
-                                    if entry.link.is_external_hyperlink:
-                                        current_cell_paragraph.add_external_hyperlink(
-                                            entry.link.href, entry.link.text
-                                        )
-                                        continue
-
-                                    else:
-                                        raise ValueError(
-                                            f"Unsure how to handle {entry.link}"
-                                        )
-
-                                for item in commands.split_str_into_command_blocks(
-                                    entry.text
-                                ):
-                                    if isinstance(item, commands.Command):
-                                        command_callable = self.commands.get(
-                                            item.command
-                                        )
-                                        if command_callable is None:
-                                            raise ValueError(
-                                                f"Attempted to use an unknown custom command: {item.command}"
-                                            )
-
-                                        old_pg = self.current_paragraph
-                                        self.current_paragraph = (
-                                            current_cell_paragraph.add_run()
-                                        )
-                                        command_callable(
-                                            *item.arguments,
-                                            **item.keyword_arguments,
-                                        )
-                                        self.current_paragraph = old_pg
-                                    else:
-                                        self.add_text(
-                                            item,
-                                            current_run=entry.style,
-                                            document=template_file,
-                                            paragraph=current_cell_paragraph.add_run(),
-                                        )
-
-                    # We add a paragraph here to ensure that subsequent tables don't
-                    # end up joined to this one as per #23
-                    if (
-                        current_token_index < len(ast)
-                        and ast[current_token_index].type == "table_open"
-                    ):
-                        if self.current_paragraph is None:
-                            self.current_paragraph = self.template_file.add_paragraph()
-                        else:
-                            self.current_paragraph.add_run().add_break()
-
-                    # Continue here since we have mutated
-                    # the current index already
-                    continue
-
-                case "bullet_list_open":
-                    # Handle a new bulleted list
-                    # In theory every 'new' list should be at
-                    # a higher level of nesting
-                    variables.add_nesting()
-                    variables.add_list("bullet")
-                case "bullet_list_close":
-                    variables.remove_nesting()
-                    variables.remove_current_list()
-                case "ordered_list_open":
-                    if not variables.current_lists:
-                        # If we are opening a new top level
-                        # ordered list we need to reset the ordering
-                        # such that it works as it should for numbers
-                        list_order_requires_restart = True
-
-                    variables.add_nesting()
-                    variables.add_list("ordered")
-                case "ordered_list_close":
-                    variables.remove_nesting()
-                    variables.remove_current_list()
-                case "heading_open":
-                    level = int(current_token.tag[-1])
-                    self.current_paragraph = template_file.add_heading(level=level)
-
-                case "html_block" | "html_inline":
-                    # Figure out the type of HTML we have
-                    # This is kind of jank.
-                    #
-                    # Ref: https://spec.commonmark.org/0.25/#html-blocks
-                    if current_token.content.startswith("<img"):
-                        # Lets regex for an image
-                        matches = html_attribute_pattern.findall(current_token.content)
-                        src = None
-                        width = None
-                        height = None
-                        alt = None
-                        title = None
-                        for title, value in matches:
-                            match title:
-                                case "src":
-                                    src = value
-                                case "width":
-                                    width = float(
-                                        value.removeprefix("'").removeprefix('"')
-                                    )
-                                case "height":
-                                    height = float(
-                                        value.removeprefix("'").removeprefix('"')
-                                    )
-                                case "alt":
-                                    alt = value
-                                case "title":
-                                    title = value
-
-                        if src is None:
-                            raise ValueError("Image 'src' is required.")
-
-                        self.add_image(
-                            src,
-                            template_file=template_file,
-                            width=Cm(width),
-                            height=Cm(height),
-                            title=title,
-                            alt_text=alt,
-                        )
-                        current_token_index += 1
-                        continue
-
-                    for item in commands.split_str_into_command_blocks(
-                        current_token.content
-                    ):
-                        if isinstance(item, commands.Command):
-                            command_callable = self.commands.get(item.command)
-                            if command_callable is None:
-                                raise ValueError(
-                                    f"Attempted to use an unknown custom command: {item.command}"
-                                )
-
-                            command_callable(
-                                *item.arguments,
-                                **item.keyword_arguments,
-                            )
-                        else:
-                            if item.startswith("\n#"):
-                                # Likely a botched heading
-                                item = item.lstrip()
-                                level, text = item.split(" ", maxsplit=1)
-                                self.current_paragraph = template_file.add_heading(
-                                    level=len(level)
-                                )
-                                as_formatting: structs.Cell = (
-                                    structs.Table.text_to_cell(text)
-                                )
-                                self.insert_cell(as_formatting)
-                                # In theory this will be reset before next insert
-                                # so this being None means no duplicate gaps
-                                self.current_paragraph = None
-                            else:
-                                self.add_text(
-                                    item,
-                                    paragraph=self.current_paragraph,
-                                    document=template_file,
-                                    current_run=variables.current_run,
-                                )
-
-                case "image":
-                    # Insert an image
-                    alt_text = current_token.content
-                    img_src = current_token.attrs["src"]
-                    caption = current_token.attrs.get("title", None)
-                    self.add_image(
-                        img_src,
-                        template_file=template_file,
-                        title=caption,
-                        alt_text=alt_text,
-                    )
-
-                case "code_inline":
-                    run = self.current_paragraph.add_run(
-                        style=self.engine.config["styles"]["inline_code"]
-                    )
-                    self.add_text(
-                        current_token.content,
-                        paragraph=run,
-                        document=template_file,
-                        current_run=variables.current_run,
-                    )
-
-                case "fence":
-                    self.insert_codeblock(current_token.content.rstrip())
-                case "link_open":
-                    # Insert a link
-                    # Once I know how to make word like this, use it
-                    # title = current_token.attrs.get("title")
-                    href = current_token.attrs["href"]
-                    text = ast[current_token_index + 1].content
-                    self.current_paragraph.add_external_hyperlink(href, text)
-                    # Skip the 'text' and 'link_close' block
-                    current_token_index += 2
+        state = walker.WalkState(template_file, ast, variables)
+        get_handler = self.token_handlers.get
+        stack = state.stack
+        while stack:
+            tokens, index = stack.pop()
+            depth = len(stack)
+            length = len(tokens)
+            state.tokens = tokens
+            while index < length:
+                token = tokens[index]
+                handler = get_handler(token.type)
+                if handler is None:
+                    index += 1
                     continue
-                case "hr":
-                    # Insert a horizontal line
-                    template_file.add_paragraph().draw_paragraph_border(top=True)
 
-            # Next token time!
-            current_token_index += 1
+                state.index = index
+                index += handler(self, token, state) or 1
+                if len(stack) != depth:
+                    # The handler pushed tokens which need walking
+                    # first, so resume this list once they are done
+                    stack.insert(depth, (tokens, index))
+                    break
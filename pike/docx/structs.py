@@ -3,8 +3,6 @@ from __future__ import annotations
 from enum import Enum
 from typing import Literal
 
-from markdown_it.token import Token
-
 
 class EnumBase(Enum):
     def get_next(self) -> EnumBase:
@@ -17,6 +15,8 @@ class EnumBase(Enum):
 class CurrentRun:
     """Defines various presentation metadata for runs"""
 
+    __slots__ = ("bold", "italic", "underline", "highlighted")
+
     def __init__(
         self,
         *,
@@ -33,7 +33,13 @@ class CurrentRun:
         self.highlighted: bool | None = highlight
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+        return (
+            isinstance(other, self.__class__)
+            and self.bold == other.bold
+            and self.italic == other.italic
+            and self.underline == other.underline
+            and self.highlighted == other.highlighted
+        )
 
     def __repr__(self):
         return f"CurrentRun({self.bold=},{self.italic=},{self.underline=},{self.highlighted=})"
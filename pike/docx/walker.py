@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import re
+import typing as t
+from collections.abc import Callable
+
+from markdown_it.token import Token
+from skelmis.docx.shared import Cm
+
+from pike import structs
+from pike.docx import Variables, List, commands, get_up_to_token
+
+if t.TYPE_CHECKING:
+    from skelmis.docx.document import Document
+
+    from pike.docx import Docx
+
+html_attribute_pattern: re.Pattern = re.compile(
+    r"(\S+)=[\"']?((?:.(?![\"']?\s+\S+=|\s*/?[>\"']))+.)[\"']?"
+)
+TokenHandler = Callable[["Docx", Token, "WalkState"], int | None]
+"""Called with the Docx instance, the token and the walk state.
+
+Returns how many tokens were consumed, where None means just the one.
+"""
+
+
+class WalkState:
+    """Where a walk over an AST is up to"""
+
+    def __init__(
+        self, template_file: Document, ast: list[Token], variables: Variables
+    ) -> None:
+        self.template_file: Document = template_file
+        self.variables: Variables = variables
+        self.list_order_requires_restart: bool = False
+        # The token list currently being walked and the
+        # index of the token being handled within it
+        self.tokens: list[Token] = ast
+        self.index: int = 0
+        # Token lists left to walk alongside where to resume them,
+        # with the last entry being walked next
+        self.stack: list[tuple[list[Token], int]] = [(ast, 0)]
+
+    def __repr__(self) -> str:
+        return f"WalkState(index={self.index}, depth={len(self.stack)})"
+
+    def push(self, tokens: list[Token]) -> None:
+        """Walk the given tokens before the rest of the current list."""
+        self.stack.append((tokens, 0))
+
+    def peek(self, offset: int = 1) -> Token | None:
+        """The token ``offset`` places after the current one, if any."""
+        index = self.index + offset
+        if index >= len(self.tokens):
+            return None
+
+        return self.tokens[index]
+
+
+def _strong_open(docx: Docx, token: Token, state: WalkState) -> None:
+    state.variables.current_run.bold = True
+
+
+def _strong_close(docx: Docx, token: Token, state: WalkState) -> None:
+    state.variables.current_run.bold = None
+
+
+def _em_open(docx: Docx, token: Token, state: WalkState) -> None:
+    state.variables.current_run.italic = True
+
+
+def _em_close(docx: Docx, token: Token, state: WalkState) -> None:
+    state.variables.current_run.italic = None
+
+
+def _inline(docx: Docx, token: Token, state: WalkState) -> None:
+    # Inline items content things
+    # such as nested text etc
+    state.push(token.children or [])
+
+
+def _paragraph_open(docx: Docx, token: Token, state: WalkState) -> None:
+    # Creates a new paragraph within text
+    # This also handles the relevant styling
+    # for usage with bullet points n such
+    current_list: List | None = state.variables.get_current_list()
+    if current_list is None:
+        docx.current_paragraph = state.template_file.add_paragraph()
+        return
+
+    # We need to deal with list nesting's
+    nesting_level = current_list.nesting.value
+    if current_list.list_type == "bullet":
+        style: str = docx.engine.config["styles"]["bullet_lists"][
+            f"level_{nesting_level}"  # noqa
+        ]
+    elif docx.enable_ordered_lists:
+        style: str = "List Number"
+        if nesting_level != 1:
+            style += f" {nesting_level}"
+    else:
+        style: str = docx.engine.config["styles"]["ordered_lists"][
+            f"level_{nesting_level}"  # noqa
+        ]
+
+    docx.current_paragraph = state.template_file.add_paragraph(style=style)
+    if state.list_order_requires_restart and current_list.list_type != "bullet":
+        # It's a new ordered list so requires restart
+        docx.current_paragraph.restart_numbering()
+        state.list_order_requires_restart = False
+
+
+def _close_paragraph(docx: Docx, token: Token, state: WalkState) -> None:
+    # Reset the current paragraph to null
+    docx.current_paragraph = None
+
+
+def _softbreak(docx: Docx, token: Token, state: WalkState) -> None:
+    # This represents a newline
+    if docx.current_paragraph is None:
+        # Unsure why this is None here...
+        docx.current_paragraph = state.template_file.add_paragraph()
+    else:
+        # Else otherwise it'd be two newlines
+        docx.current_paragraph.add_run().add_break()
+
+
+def _text(docx: Docx, token: Token, state: WalkState) -> None:
+    # Add text to document with current styles
+    for item in commands.split_str_into_command_blocks(token.content):
+        if isinstance(item, commands.Command):
+            docx.run_command(item)
+        else:
+            docx.add_text(
+                item,
+                paragraph=docx.current_paragraph,
+                document=state.template_file,
+                current_run=state.variables.current_run,
+            )
+
+
+def _table_open(docx: Docx, token: Token, state: WalkState) -> int:
+    # This denotes a Markdown table
+    table_ast = get_up_to_token(
+        state.tokens, end_token_type="table_close", current_idx=state.index
+    )
+    docx.insert_table(structs.Table.from_ast(table_ast))
+
+    # We add a paragraph here to ensure that subsequent tables don't
+    # end up joined to this one as per #23
+    next_token = state.peek(len(table_ast))
+    if next_token is not None and next_token.type == "table_open":
+        if docx.current_paragraph is None:
+            docx.current_paragraph = docx.template_file.add_paragraph()
+        else:
+            docx.current_paragraph.add_run().add_break()
+
+    return len(table_ast)
+
+
+def _bullet_list_open(docx: Docx, token: Token, state: WalkState) -> None:
+    # Handle a new bulleted list
+    # In theory every 'new' list should be at
+    # a higher level of nesting
+    state.variables.add_nesting()
+    state.variables.add_list("bullet")
+
+
+def _ordered_list_open(docx: Docx, token: Token, state: WalkState) -> None:
+    if not state.variables.current_lists:
+        # If we are opening a new top level
+        # ordered list we need to reset the ordering
+        # such that it works as it should for numbers
+        state.list_order_requires_restart = True
+
+    state.variables.add_nesting()
+    state.variables.add_list("ordered")
+
+
+def _list_close(docx: Docx, token: Token, state: WalkState) -> None:
+    state.variables.remove_nesting()
+    state.variables.remove_current_list()
+
+
+def _heading_open(docx: Docx, token: Token, state: WalkState) -> None:
+    level = int(token.tag[-1])
+    docx.current_paragraph = state.template_file.add_heading(level=level)
+
+
+def _html_image(docx: Docx, token: Token, state: WalkState) -> None:
+    # Lets regex for an image
+    src = None
+    width = None
+    height = None
+    alt = None
+    title = None
+    for title, value in html_attribute_pattern.findall(token.content):
+        match title:
+            case "src":
+                src = value
+            case "width":
+                width = float(value.removeprefix("'").removeprefix('"'))
+            case "height":
+                height = float(value.removeprefix("'").removeprefix('"'))
+            case "alt":
+                alt = value
+            case "title":
+                title = value
+
+    if src is None:
+        raise ValueError("Image 'src' is required.")
+
+    docx.add_image(
+        src,
+        template_file=state.template_file,
+        width=Cm(width),
+        height=Cm(height),
+        title=title,
+        alt_text=alt,
+    )
+
+
+def _html(docx: Docx, token: Token, state: WalkState) -> None:
+    # Figure out the type of HTML we have
+    # This is kind of jank.
+    #
+    # Ref: https://spec.commonmark.org/0.25/#html-blocks
+    if token.content.startswith("<img"):
+        _html_image(docx, token, state)
+        return
+
+    for item in commands.split_str_into_command_blocks(token.content):
+        if isinstance(item, commands.Command):
+            docx.run_command(item)
+        elif item.startswith("\n#"):
+            # Likely a botched heading
+            item = item.lstrip()
+            level, text = item.split(" ", maxsplit=1)
+            docx.current_paragraph = state.template_file.add_heading(level=len(level))
+            docx.insert_cell(structs.Table.text_to_cell(text))
+            # In theory this will be reset before next insert
+            # so this being None means no duplicate gaps
+            docx.current_paragraph = None
+        else:
+            docx.add_text(
+                item,
+                paragraph=docx.current_paragraph,
+                document=state.template_file,
+                current_run=state.variables.current_run,
+            )
+
+
+def _image(docx: Docx, token: Token, state: WalkState) -> None:
+    docx.add_image(
+        token.attrs["src"],
+        template_file=state.template_file,
+        title=token.attrs.get("title", None),
+        alt_text=token.content,
+    )
+
+
+def _code_inline(docx: Docx, token: Token, state: WalkState) -> None:
+    run = docx.current_paragraph.add_run(
+        style=docx.engine.config["styles"]["inline_code"]
+    )
+    docx.add_text(
+        token.content,
+        paragraph=run,
+        document=state.template_file,
+        current_run=state.variables.current_run,
+    )
+
+
+def _fence(docx: Docx, token: Token, state: WalkState) -> None:
+    docx.insert_codeblock(token.content.rstrip())
+
+
+def _link_open(docx: Docx, token: Token, state: WalkState) -> int:
+    # Once I know how to make word like this, use it
+    # title = token.attrs.get("title")
+    href = token.attrs["href"]
+    text = state.peek().content
+    docx.current_paragraph.add_external_hyperlink(href, text)
+    # Skip the 'text' and 'link_close' tokens
+    return 3
+
+
+def _hr(docx: Docx, token: Token, state: WalkState) -> None:
+    # Insert a horizontal line
+    state.template_file.add_paragraph().draw_paragraph_border(top=True)
+
+
+# Token types without a handler, such as link_close, are skipped
+DEFAULT_TOKEN_HANDLERS: t.Final[dict[str, TokenHandler]] = {
+    "inline": _inline,
+    "strong_open": _strong_open,
+    "strong_close": _strong_close,
+    "em_open": _em_open,
+    "em_close": _em_close,
+    "paragraph_open": _paragraph_open,
+    "paragraph_close": _close_paragraph,
+    "heading_close": _close_paragraph,
+    "softbreak": _softbreak,
+    "text": _text,
+    "table_open": _table_open,
+    "bullet_list_open": _bullet_list_open,
+    "bullet_list_close": _list_close,
+    "ordered_list_open": _ordered_list_open,
+    "ordered_list_close": _list_close,
+    "heading_open": _heading_open,
+    "html_block": _html,
+    "html_inline": _html,
+    "image": _image,
+    "code_inline": _code_inline,
+    "fence": _fence,
+    "link_open": _link_open,
+    "hr": _hr,
+}
@@ -1,21 +1,36 @@
 from __future__ import annotations
 
+import contextlib
 import logging
 import shutil
-from collections import defaultdict
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Iterator, Mapping
 
-import jinja2
-from skelmis.docx import utility
 from jinja2 import Environment
 from jinja2.sandbox import SandboxedEnvironment
 
-from pike import File, checks, utils, structs, injections
-from pike.docx import Docx, commands
+from pike import (
+    File,
+    caching,
+    checks,
+    indexes,
+    profiling,
+    rendering,
+    tracing,
+    utils,
+    structs,
+    injections,
+)
+from pike.dependencies import DependencyGraph, DependencyRecorder, TrackedDict
+from pike.docx import commands
 from pike import jinja_globals as jg
 
+if TYPE_CHECKING:
+    from markdown_it import MarkdownIt
+
 log = logging.getLogger(__name__)
 
 
@@ -30,12 +45,19 @@ class Engine:
         load_default_custom_commands: bool = True,
         global_variables: dict[str, Any] = None,
         excluded_paths: list[str] = None,
+        jobs: int = 1,
+        render_jobs: int = 1,
+        template_cache_size: int | None = None,
+        profile: bool = False,
+        trace: bool = False,
     ) -> None:
         self.base_directory: Path = base_directory
         self.config_directory: Path = base_directory / "configuration"
         self.config: structs.ConfigT = configuration
         self.global_variables = global_variables
         self.excluded_paths: list[str] = excluded_paths or []
+        self.jobs: int = max(jobs, 1)
+        self.render_jobs: int = max(render_jobs, 1)
 
         self.files: list[File] = []
         self._layout_file: File | None = None
@@ -44,23 +66,60 @@ class Engine:
             str, Callable[[File], Any] | Callable[[File, ...], Any]
         ] = {}
         self._jinja_custom_commands: dict[str, Callable[[...], ...]] = {}
+        self._template_globals: ChainMap[str, Callable[[...], ...]] = ChainMap(
+            {
+                "get_folder": partial(jg.get_folder, self),
+                "query_files": partial(jg.query_files, self),
+                "get_references": partial(jg.get_references, self),
+                "get_referenced_by": partial(jg.get_referenced_by, self),
+            },
+            self._jinja_custom_commands,
+        )
+        if template_cache_size is None:
+            template_cache_size = self.config.get("template_cache_size", 128)
+        self.template_cache: caching.TemplateCache = caching.TemplateCache(
+            template_cache_size
+        )
         self._custom_commands_to_add: list[tuple[str, Callable[[...], ...], bool]] = []
-        self._file_variables: dict[str, dict[str, Any]] = {}
-        self._folder_variables: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        self._token_handlers: dict[str, Callable[[...], int | None]] = {}
+        self._markdown_plugins: list[tuple[Callable[..., None], dict[str, Any]]] = []
+        self._markdown_parser: MarkdownIt | None = None
+        self.dependency_recorder: DependencyRecorder = DependencyRecorder()
+        self._file_variables: dict[str, dict[str, Any]] = TrackedDict(
+            self.dependency_recorder, "files"
+        )
+        self._folder_variables: dict[str, dict[str, dict[str, Any]]] = TrackedDict(
+            self.dependency_recorder, "folders", default_factory=dict
+        )
+        self.folder_index: indexes.FolderIndex = indexes.FolderIndex(
+            self._folder_variables
+        )
+        self.frontmatter_index: indexes.FrontmatterIndex = indexes.FrontmatterIndex(
+            self._folder_variables
+        )
+        self.reference_graph: indexes.ReferenceGraph = indexes.ReferenceGraph(
+            self.dependency_recorder, key=self.references_key
+        )
+        self._files_by_id: dict[str, File] = {}
+        self.build_cache: caching.BuildCache | None = None
+        self.profiler: profiling.Profiler | None = (
+            profiling.Profiler() if profile else None
+        )
+        self.tracer: tracing.Tracer | None = tracing.Tracer() if trace else None
 
         self.docx_header: str | None = None
         self.docx_footer: str | None = None
 
-        if self.config["use_sandbox"]:
-            self.jinja_env: SandboxedEnvironment | Environment = SandboxedEnvironment(
-                lstrip_blocks=True,
-                undefined=jinja2.StrictUndefined,
-            )
-        else:
-            self.jinja_env: Environment = Environment(
-                lstrip_blocks=True,
-                undefined=jinja2.StrictUndefined,
+        self.jinja_env: SandboxedEnvironment | Environment = (
+            rendering.create_environment(
+                use_sandbox=self.config["use_sandbox"],
+                bytecode_directory=(
+                    self.cache_directory / "bytecode"
+                    if self.config.get("use_bytecode_cache", False)
+                    else None
+                ),
             )
+        )
 
         if load_default_plugins:
             self.load_default_injections()
@@ -80,6 +139,10 @@ class Engine:
         This method will load a custom command into the Docx AST
         as well as exposing the command via Jinja to templates.
 
+        Arguments are converted to the types the command is annotated
+        with, see :class:`~pike.docx.commands.CommandSignature`, and
+        templates providing invalid arguments fail when rendering.
+
         Parameters
         ----------
         command_name: str
@@ -99,11 +162,78 @@ class Engine:
             (command_name, command_callable, provide_docx_instance)
         )
         self._jinja_custom_commands[command_name] = partial(
-            commands.create_command_string,
+            commands.create_checked_command_string,
+            commands.CommandSignature(
+                command_callable, provide_docx_instance=provide_docx_instance
+            ),
             command_name,
         )
         return self
 
+    def add_token_handler(
+        self,
+        token_type: str,
+        handler: Callable[..., int | None],
+    ) -> Engine:
+        """Handle a markdown-it token type when creating the word document.
+
+        See :meth:`pike.docx.Docx.register_token_handler`
+        for how handlers are called.
+
+        Parameters
+        ----------
+        token_type: str
+            The token type to handle, such as ``math_block``
+        handler
+            The relevant function to call.
+
+        Returns
+        -------
+        Engine
+            The current Engine instance for method chaining.
+        """
+        self._token_handlers[token_type] = handler
+        return self
+
+    def add_markdown_plugin(self, plugin: Callable[..., None], **options) -> Engine:
+        """Use a markdown-it plugin when parsing the word document.
+
+        Tokens the plugin creates can then be handled
+        with :meth:`add_token_handler`.
+
+        Parameters
+        ----------
+        plugin: Callable[..., None]
+            The plugin, called with the parser and any options
+        options
+            Passed to the plugin
+
+        Returns
+        -------
+        Engine
+            The current Engine instance for method chaining.
+        """
+        self._markdown_plugins.append((plugin, options))
+        self._markdown_parser = None
+        return self
+
+    @property
+    def markdown_parser(self) -> MarkdownIt:
+        """The parser used to create the word document.
+
+        This is the shared parser unless markdown-it
+        plugins have been added with :meth:`add_markdown_plugin`.
+        """
+        if not self._markdown_plugins:
+            return utils.get_markdown_it()
+
+        if self._markdown_parser is None:
+            self._markdown_parser = utils.create_markdown_it()
+            for plugin, options in self._markdown_plugins:
+                self._markdown_parser.use(plugin, **options)
+
+        return self._markdown_parser
+
     @classmethod
     def load_from_directory(
         cls,
@@ -111,6 +241,10 @@ class Engine:
         *,
         load_default_plugins: bool = True,
         excluded_paths: list[str] = None,
+        jobs: int = 1,
+        render_jobs: int = 1,
+        profile: bool = False,
+        trace: bool = False,
     ) -> Engine:
         """Given a report on disk, load the engine.
 
@@ -121,10 +255,24 @@ class Engine:
         load_default_plugins : bool
             Whether to load the default plugins.
         excluded_paths : list[str]
-            A list of strings to ignore if found in
-            the directory path of a given markdown file.
-
-            Good examples are `excluded_paths=['.venv']`
+            A list of glob / gitignore style patterns to ignore
+            when searching for markdown files. Matching directories
+            are skipped entirely rather than searched.
+
+            Good examples are `excluded_paths=['.venv', 'drafts/']`
+        jobs : int
+            How many worker threads to use when reading
+            files from disk. Defaults to 1, I.E. serially.
+        render_jobs : int
+            How many worker processes to render files with.
+            Defaults to 1, I.E. within the current process.
+        profile : bool
+            Whether to record how long each stage of :meth:`run`
+            takes and write it next to the outputs as JSON.
+        trace : bool
+            Whether to record spans for plugins, file plugins and
+            custom commands, written next to the outputs as a
+            Chrome trace.
         """
         checks.ensure_config_exists(Path(base_directory))
         config: structs.ConfigT = utils.read_file_as_json(
@@ -142,6 +290,10 @@ class Engine:
             global_variables=global_variables,
             configuration=config,
             excluded_paths=excluded_paths,
+            jobs=jobs,
+            render_jobs=render_jobs,
+            profile=profile,
+            trace=trace,
         )
 
     def load_default_injections(self) -> None:
@@ -159,6 +311,7 @@ class Engine:
         - insert_table_of_contents
         - insert_bookmark
         - insert_internal_hyperlink
+        - insert_csv_table
         """
         self.add_custom_command(
             "add_page_break",
@@ -190,6 +343,11 @@ class Engine:
             commands.insert_internal_hyperlink,
             provide_docx_instance=True,
         )
+        self.add_custom_command(
+            "insert_csv_table",
+            commands.insert_csv_table,
+            provide_docx_instance=True,
+        )
 
     def register_plugin(self, plugin: Callable[[Engine], None]) -> Engine:
         """Register a given callable as a plugin.
@@ -254,96 +412,521 @@ class Engine:
         self._file_plugins[name] = func
         return self
 
-    def inject_variables(self, content: str, variables: dict[str, Any]) -> str:
-        global_vars = {
-            **self._jinja_custom_commands,
-            "get_folder": partial(jg.get_folder, self),
-        }
-        template = self.jinja_env.from_string(
+    @property
+    def references_key(self) -> str:
+        """The frontmatter variable files list their references in"""
+        return self.config.get("references_key", "references")
+
+    def get_references(self, file: File | str) -> list[File]:
+        """Return the files a file references, in the order it lists them.
+
+        Parameters
+        ----------
+        file: File | str
+            The file, or its id
+
+        Returns
+        -------
+        list[File]
+            The referenced files, ignoring ids which don't exist
+        """
+        file_id = file if isinstance(file, str) else file.id
+        return [
+            self._files_by_id[reference]
+            for reference in self.reference_graph.references(file_id)
+            if reference in self._files_by_id
+        ]
+
+    def get_referenced_by(self, file: File | str) -> list[File]:
+        """Return the files which reference a file, sorted by id.
+
+        Parameters
+        ----------
+        file: File | str
+            The file, or its id
+
+        Returns
+        -------
+        list[File]
+            The other files listing this one in their references
+        """
+        file_id = file if isinstance(file, str) else file.id
+        return [
+            self._files_by_id[referrer]
+            for referrer in self.reference_graph.referrers(file_id)
+            if referrer in self._files_by_id
+        ]
+
+    @property
+    def cache_directory(self) -> Path:
+        """Where Pike stores data to speed up subsequent runs"""
+        return self.base_directory / self.config.get("cache_directory", ".pike_cache")
+
+    def load_build_cache(self) -> caching.BuildCache:
+        """Load the build cache for this report from disk.
+
+        The cache is invalidated whenever the registered
+        plugins, file plugins or custom commands change.
+        """
+        fingerprint = caching.callable_fingerprint(
+            [
+                *self._plugins,
+                *self._file_plugins.values(),
+                *(command[1] for command in self._custom_commands_to_add),
+            ]
+        )
+        return caching.BuildCache.load(
+            self.cache_directory / "build.json", fingerprint=fingerprint
+        )
+
+    def inject_variables(self, content: str, variables: Mapping[str, Any]) -> str:
+        """Render the given content as a Jinja template.
+
+        Parameters
+        ----------
+        content: str
+            The template to render
+        variables: Mapping[str, Any]
+            The variables available to the template.
+
+            This is used as is rather than copied, so layered
+            mappings such as a ChainMap are cheap to provide.
+
+        Returns
+        -------
+        str
+            The rendered content
+        """
+        return rendering.render_template(
+            self.jinja_env,
+            self.template_cache,
+            self._template_globals,
+            content,
+            variables,
+        )
+
+    def generate_variables(
+        self, content: str, variables: Mapping[str, Any]
+    ) -> Iterator[str]:
+        """Render the given content as a Jinja template,
+        yielding the output as it is produced.
+
+        See :meth:`inject_variables`
+        """
+        return rendering.generate_template(
+            self.jinja_env,
+            self.template_cache,
+            self._template_globals,
             content,
-            globals=global_vars,
+            variables,
         )
-        return template.render(**variables)
 
     def run(self):
-        self.locate_all_files()
-        self.update_global_variables()
+        """Build the report, writing every configured output to disk.
 
-        for file in self.files:
-            file.inject_variables()
+        When profiling, the cost of each stage is also written
+        next to the outputs as ``<output_document_name>.profile.json``.
+        When tracing, spans are written to ``<output_document_name>.trace.json``.
+        """
+        commands.reset_split_statistics()
+        registry: commands.CommandRegistry | None = (
+            commands.CommandRegistry()
+            if self.config.get("use_command_registry", False)
+            else None
+        )
+        if self.profiler is None and self.tracer is None:
+            with commands.use_command_registry(registry):
+                self._build()
+
+            return
+
+        if self.profiler is not None:
+            self.profiler.start()
+
+        try:
+            with (
+                commands.use_command_registry(registry),
+                self.profile_stage("total"),
+            ):
+                output_stem = self._build()
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+
+        if self.profiler is not None:
+            self.profiler.save(output_stem.parent / f"{output_stem.name}.profile.json")
+
+        if self.tracer is not None:
+            self.tracer.save(output_stem.parent / f"{output_stem.name}.trace.json")
+
+    def _build(self) -> Path:
+        """Returns the output path without a file extension"""
+        with self.profile_stage("load_files"):
+            self.locate_all_files()
+            if self.config.get("use_build_cache", False):
+                self.build_cache = self.load_build_cache()
+
+            self.update_global_variables()
+
+        with self.profile_stage("render_files"):
+            self.render_files()
+
+        if self.build_cache is not None:
+            self.build_cache.save()
+            log.debug(
+                "Build cache: %s hits, %s misses",
+                self.build_cache.hits,
+                self.build_cache.misses,
+            )
 
-        self.update_global_variables()
+        with self.profile_stage("plugins"):
+            for plugin in self._plugins:
+                with self.profile_stage(
+                    f"plugin:{getattr(plugin, '__name__', repr(plugin))}"
+                ):
+                    plugin(self)
 
-        for plugin in self._plugins:
-            plugin(self)
+        stream_layout: bool = self.config.get("stream_layout", False)
+        if not stream_layout:
+            with self.profile_stage("render_layout"):
+                self._layout_file.inject_variables(use_build_cache=False)
 
-        self._layout_file.inject_variables()
+            jg.log_comments(self._layout_file)
 
         output_directory = self.base_directory / self.config["output_directory"]
         output_directory.mkdir(exist_ok=True)
         output_document_name = self.inject_variables(
             self.config["output_document_name"], self.global_variables
         )
+        wants_docx: bool = (
+            self.config["output_files"]["docx"] or self.config["output_files"]["pdf"]
+        )
+
+        if stream_layout:
+            with self.profile_stage("stream_layout"):
+                content = self._stream_layout(
+                    output_directory / f"{output_document_name}.md", keep=wants_docx
+                )
 
-        if self.config["output_files"]["markdown"]:
-            with open(
-                output_directory / f"{output_document_name}.md",
-                "w",
-            ) as f:
-                f.write(self._layout_file.content)
+            jg.log_comments(self._layout_file)
+        else:
+            content = self._layout_file.content
+            if self.config["output_files"]["markdown"]:
+                with (
+                    self.profile_stage("write_markdown"),
+                    open(
+                        output_directory / f"{output_document_name}.md",
+                        "w",
+                    ) as f,
+                ):
+                    f.write(commands.expand_command_handles(content))
+
+        log.debug(
+            "Template cache: %s hits, %s misses",
+            self.template_cache.hits,
+            self.template_cache.misses,
+        )
 
-        if self.config["output_files"]["docx"] or self.config["output_files"]["pdf"]:
-            docx = Docx(self)
-            docx.import_commands_from_engine()
+        if wants_docx:
+            # Imported here so markdown only builds skip python-docx entirely
+            from pike.docx import Docx
 
-            docx_file = docx.create_document(
-                content=self._layout_file.content,
-                filename=f"{output_document_name}.docx",
+            with self.profile_stage("docx"):
+                docx = Docx(self)
+                docx.import_commands_from_engine()
+
+                docx_file = docx.create_document(
+                    content=content,
+                    filename=f"{output_document_name}.docx",
+                )
+                shutil.move(
+                    docx_file, output_directory / f"{output_document_name}.docx"
+                )
+
+            log.debug(
+                "Command blocks: %(plain)s without commands, "
+                "%(with_commands)s with commands, %(handles)s handles, "
+                "%(parse_cache_hits)s parse cache hits, "
+                "%(parse_cache_misses)s parse cache misses",
+                commands.split_statistics(),
             )
-            shutil.move(docx_file, output_directory / f"{output_document_name}.docx")
 
             docx_file = output_directory / f"{output_document_name}.docx"
 
             if self.config["output_files"]["pdf"]:
-                utility.update_toc(docx_file)
-                utility.document_to_pdf(docx_file)
-                shutil.move(
-                    f"{output_document_name}.pdf",
-                    output_directory / f"{output_document_name}.pdf",
-                )
+                from skelmis.docx import utility
+
+                with self.profile_stage("update_toc"):
+                    utility.update_toc(docx_file)
+
+                with self.profile_stage("pdf"):
+                    utility.document_to_pdf(docx_file)
+                    shutil.move(
+                        f"{output_document_name}.pdf",
+                        output_directory / f"{output_document_name}.pdf",
+                    )
 
             if not self.config["output_files"]["docx"]:
                 docx_file.unlink()
 
+        return output_directory / output_document_name
+
+    @contextlib.contextmanager
+    def profile_stage(self, name: str) -> Iterator[None]:
+        """Record the block as a stage of the build when profiling or tracing.
+
+        Plugins may use this to have their own work show up
+        within the profile.
+
+        Parameters
+        ----------
+        name: str
+            What to call the stage
+        """
+        with contextlib.ExitStack() as stack:
+            if self.profiler is not None:
+                stack.enter_context(self.profiler.stage(name))
+
+            if self.tracer is not None:
+                stack.enter_context(self.tracer.span(name, category="stage"))
+
+            yield
+
+    def trace_span(
+        self, name: str, *, category: str, **arguments: Any
+    ) -> ContextManager[None]:
+        """Record the block as a span when tracing.
+
+        Parameters
+        ----------
+        name: str
+            What to call the span
+        category: str
+            The kind of span, such as ``command`` or ``plugin``
+        arguments
+            Extra details to show alongside the span
+        """
+        if self.tracer is None:
+            return contextlib.nullcontext()
+
+        return self.tracer.span(name, category=category, **arguments)
+
+    @contextlib.contextmanager
+    def _profile_file(self, file: File) -> Iterator[None]:
+        with contextlib.ExitStack() as stack:
+            if self.profiler is not None:
+                stack.enter_context(self.profiler.file(file.id))
+
+            if self.tracer is not None:
+                stack.enter_context(
+                    self.tracer.span(file.id, category="file", path=file.file)
+                )
+
+            yield
+
+    def _stream_layout(self, markdown_file: Path, *, keep: bool) -> str:
+        """Render the layout file in a single pass, writing
+        it to the markdown output as it is produced.
+
+        Parameters
+        ----------
+        markdown_file: Path
+            Where to write the markdown output, if enabled
+        keep: bool
+            Whether the rendered content is needed afterwards
+
+        Returns
+        -------
+        str
+            The rendered content, or an empty string if ``keep`` is
+            False and the content was written to the markdown output.
+        """
+        # Chunks are joined as they arrive so the document is never
+        # held as both every chunk and the string joined from them
+        buffer = rendering.ChunkBuffer()
+        generator = rendering.strip_trailing_newlines(
+            self._layout_file.generate_variables()
+        )
+        if not self.config["output_files"]["markdown"]:
+            for chunk in generator:
+                buffer.write(chunk)
+
+            return buffer.getvalue()
+
+        with open(markdown_file, "w") as f:
+            for chunk in generator:
+                f.write(commands.expand_command_handles(chunk))
+                if keep:
+                    buffer.write(chunk)
+
+        return buffer.getvalue()
+
     def locate_all_files(self) -> None:
         layout_file = None
-        for md_file in Path(self.base_directory).rglob("*.md"):
+        md_files: list[Path] = []
+        for md_file in utils.find_files(
+            self.base_directory,
+            excluded_patterns=self.excluded_paths,
+            excluded_directories=[
+                self.base_directory / self.config["output_directory"],
+                self.cache_directory,
+            ],
+        ):
             if (
                 md_file.name == self.config["layout_file"]
                 and md_file.parent == self.config_directory
             ):
                 layout_file = File(md_file, engine=self, ignore_id_check=True)
-            elif md_file.parent.name == self.config["output_directory"]:
-                # Skip output doc if exists
-                continue
-            elif any(
-                excluded_path in str(md_file) for excluded_path in self.excluded_paths
-            ):
-                # Path is ignored, exclude from search
-                continue
             else:
-                self.files.append(File(md_file, engine=self))
+                md_files.append(md_file)
+
+        self.files.extend(self.load_files(md_files))
 
         if layout_file is None:
             raise ValueError("Missing layout.md")
 
         self._layout_file = layout_file
 
+    def load_files(self, paths: list[Path]) -> list[File]:
+        """Read and parse the given markdown files.
+
+        When the engine was created with more than one job
+        this is done concurrently, however the returned files
+        are always in the same order as the provided paths.
+
+        Parameters
+        ----------
+        paths: list[Path]
+            The markdown files to load
+
+        Returns
+        -------
+        list[File]
+            The loaded files, in the order of ``paths``
+        """
+        if self.jobs == 1 or len(paths) < 2:
+            return [File(path, engine=self) for path in paths]
+
+        # Reading files and parsing their frontmatter is mostly
+        # blocking IO, so threads are plenty here and means we
+        # don't need to worry about pickling the engine
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(partial(File, engine=self), paths))
+
+    def render_files(self) -> None:
+        """Render every file, keeping the global variables up to date.
+
+        Files are rendered in order and while doing so we record
+        which other files each one reads. Any file which read another
+        before it had been rendered is then rendered again, with
+        dependencies going before the files which depend on them.
+
+        When the engine has more than one render job, the first
+        pass happens across worker processes with every file seeing
+        the others before they were rendered.
+
+        Comments are logged once every file has been
+        rendered for the last time.
+        """
+        sources: list[str] = [file.content for file in self.files]
+        parallel = self.render_jobs > 1 and len(self.files) > 1
+        if parallel:
+            self._render_files_in_processes()
+        else:
+            for file in self.files:
+                with self._profile_file(file):
+                    file.inject_variables()
+
+                self.update_file_variables(file)
+
+        graph = DependencyGraph(self.files)
+        dirty: set[int] = set()
+        for idx, file in enumerate(self.files):
+            if any(
+                (parallel or dependency > idx)
+                and self.files[dependency].content != sources[dependency]
+                for dependency in graph.dependencies[idx]
+            ):
+                # It saw the raw source of a file rendered after it
+                dirty.add(idx)
+
+        if dirty:
+            for idx in graph.topological_order():
+                if idx not in dirty:
+                    continue
+
+                file = self.files[idx]
+                previous = file.content
+                file.content = sources[idx]
+                with self._profile_file(file):
+                    file.inject_variables()
+
+                self.update_file_variables(file)
+                if file.content != previous:
+                    dirty.update(graph.dependents[idx])
+
+        for file in self.files:
+            jg.log_comments(file)
+
+    def _render_files_in_processes(self) -> None:
+        to_render: list[File] = [
+            file for file in self.files if not file.load_cached_render()
+        ]
+        results = rendering.render_in_processes(self, to_render)
+        in_process: int = 0
+        for file, result in zip(to_render, results):
+            if result is None:
+                # Needs things which can't be sent to other processes
+                in_process += 1
+                with self._profile_file(file):
+                    file._render()  # noqa
+            else:
+                content, sources, dependencies, comments, seconds = result
+                file.apply_render(content, sources, dependencies)
+                file.comments = comments
+                if self.profiler is not None:
+                    self.profiler.add_file_time(file.id, seconds)
+
+        log.debug(
+            "Rendered %s files in worker processes and %s in the main process",
+            len(to_render) - in_process,
+            in_process,
+        )
+
+        for file in self.files:
+            self.update_file_variables(file)
+
+    def update_file_variables(self, file: File) -> None:
+        """Update the global variables for a single file."""
+        self._file_variables[file.id] = file.layout_variables
+        self._folder_variables[file.folder.name][file.id] = file.layout_variables
+        self.folder_index.invalidate(file.folder.name)
+        changed_references = self.reference_graph.update(file.id, file.variables)
+        if self.build_cache is not None:
+            self.build_cache.forget_digests(
+                "files",
+                f"files:{file.id}",
+                "folders",
+                f"folders:{file.folder.name}",
+                *(f"backlinks:{file_id}" for file_id in changed_references),
+            )
+            if changed_references:
+                self.build_cache.forget_digests("backlinks")
+
     def update_global_variables(self):
         # Reset before we do this so that
         # we don't end up with duplicates
-        self._file_variables: dict[str, dict[str, Any]] = {}
-        self._folder_variables: dict[str, dict[str, dict[str, Any]]] = defaultdict(dict)
+        self._file_variables: dict[str, dict[str, Any]] = TrackedDict(
+            self.dependency_recorder, "files"
+        )
+        self._folder_variables: dict[str, dict[str, dict[str, Any]]] = TrackedDict(
+            self.dependency_recorder, "folders", default_factory=dict
+        )
+
+        self.reference_graph = indexes.ReferenceGraph(
+            self.dependency_recorder, key=self.references_key
+        )
+        self._files_by_id = {}
 
         for file in self.files:
             if file.id in self._file_variables:
@@ -354,7 +937,14 @@ class Engine:
 
             self._file_variables[file.id] = file.layout_variables
             self._folder_variables[file.folder.name][file.id] = file.layout_variables
+            self._files_by_id[file.id] = file
+            self.reference_graph.update(file.id, file.variables)
 
         # Mutate globals for usage
         self.global_variables["files"] = self._file_variables
         self.global_variables["folders"] = self._folder_variables
+        self.global_variables["backlinks"] = self.reference_graph.referenced_by
+        self.folder_index = indexes.FolderIndex(self._folder_variables)
+        self.frontmatter_index = indexes.FrontmatterIndex(self._folder_variables)
+        if self.build_cache is not None:
+            self.build_cache.reset_digests()
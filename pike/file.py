@@ -1,14 +1,31 @@
 from __future__ import annotations
 
 import typing as t
+from collections import ChainMap
 from functools import partial
 from pathlib import Path
 
-from pike import utils
+from pike import rendering, utils
 from pike import jinja_globals as jg
+from pike.docx import commands
 
 if t.TYPE_CHECKING:
     from pike import Engine
+    from pike.dependencies import Dependency
+
+
+def _call_volatile(file: File, name: str, func: t.Callable, *args, **kwargs) -> t.Any:
+    """Call something whose output depends on more than the report sources"""
+    file.engine.dependency_recorder.add("volatile", name)
+    with file.engine.trace_span(name, category="template", file=file.id):
+        return func(*args, **kwargs)
+
+
+def _call_plugin(file: File, name: str, func: t.Callable, *args, **kwargs) -> t.Any:
+    # Plugins can read anything from the engine,
+    # so assume they depend on every file
+    file.engine.dependency_recorder.add("files")
+    return _call_volatile(file, f"plugins.{name}", func, file, *args, **kwargs)
 
 
 class File:
@@ -21,10 +38,20 @@ class File:
             str, t.Callable[[File], t.Any] | t.Callable[[File, ...], t.Any]
         ] = engine._file_plugins  # noqa
         self._injections: dict[str, t.Callable[[File, ...], t.Any]] = {
-            "comment": partial(jg.comment, self),
+            # Comments are logged as a side effect, which a cached render would skip
+            "comment": partial(_call_volatile, self, "comment", jg.comment, self),
             "insert_image": jg.insert_image,
-            "insert_table_from_csv": jg.insert_table_from_csv,
+            "insert_table_from_csv": partial(
+                _call_volatile,
+                self,
+                "insert_table_from_csv",
+                jg.insert_table_from_csv,
+            ),
         }
+        self.dependencies: set[Dependency] = set()
+        """The global variables read during the last render"""
+        self.comments: list[str] = []
+        """The comments raised during the last render"""
 
         # TODO Create a test for this once virtual configurations
         #      are a supported method of File object creation
@@ -63,25 +90,109 @@ class File:
     def layout_variables(self) -> dict[str, t.Any]:
         return {**self.variables, "content": self.content}
 
-    def inject_variables(self):
-        """Inject Jinja tags into the current file."""
+    def inject_variables(self, *, use_build_cache: bool = True):
+        """Inject Jinja tags into the current file.
+
+        Parameters
+        ----------
+        use_build_cache: bool
+            Whether to reuse and store this render in the engines
+            build cache when one is enabled. Defaults to True.
+        """
+        if use_build_cache and self.load_cached_render():
+            return
+
+        self._render(use_build_cache=use_build_cache)
+
+    def _render_variables(self) -> ChainMap[str, t.Any]:
         plugins = {}
         for k, v in self._plugins.items():
-            plugins[k] = partial(v, self)
+            plugins[k] = partial(_call_plugin, self, k, v)
 
         local_variables = {**self.variables, "plugins": plugins, **self._injections}
-        variables = {
-            **local_variables,
-            **self.engine.global_variables,
-            "this": local_variables,
-        }
+        # Layered from highest to lowest precedence, so
+        # nothing from the globals is copied per render
+        return ChainMap(
+            {"this": local_variables},
+            self.engine.global_variables,
+            local_variables,
+        )
+
+    def generate_variables(self) -> t.Iterator[str]:
+        """Render the file in a single pass, yielding output as it is produced.
+
+        Unlike :meth:`inject_variables` output is not rendered again
+        until it stops changing, and the files content is left as is.
+        """
+        self.comments = []
+        return self.engine.generate_variables(self.content, self._render_variables())
+
+    def _render(self, *, use_build_cache: bool = True) -> None:
+        self.comments = []
+        variables = self._render_variables()
+        with self.engine.dependency_recorder.record() as dependencies:
+            content, sources = rendering.render_until_stable(
+                self.content,
+                partial(self.engine.inject_variables, variables=variables),
+            )
+
+        self.apply_render(
+            content, sources, dependencies, use_build_cache=use_build_cache
+        )
+
+    def load_cached_render(self) -> bool:
+        """Replace the content with a previous render from the build cache.
+
+        Returns
+        -------
+        bool
+            Whether a valid render was found
+        """
+        build_cache = self.engine.build_cache
+        if build_cache is None:
+            return False
+
+        cached = build_cache.get(
+            build_cache.source_key(self), self.engine.global_variables
+        )
+        if cached is None:
+            return False
+
+        self.content, self.dependencies = cached
+        return True
+
+    def apply_render(
+        self,
+        content: str,
+        sources: list[str],
+        dependencies: set[Dependency],
+        *,
+        use_build_cache: bool = True,
+    ) -> None:
+        """Replace the content with a render of it.
+
+        Parameters
+        ----------
+        content: str
+            The rendered content
+        sources: list[str]
+            Every template rendered to reach the content
+        dependencies: set[Dependency]
+            The global variables read while rendering
+        use_build_cache: bool
+            Whether to store this render in the build cache
+        """
+        build_cache = self.engine.build_cache if use_build_cache else None
+        if build_cache is not None:
+            build_cache.set(
+                build_cache.source_key(self),
+                sources=sources,
+                # Handles only mean something within this build
+                rendered=commands.expand_command_handles(content),
+                environment=self.engine.jinja_env,
+                global_variables=self.engine.global_variables,
+                dependencies=dependencies,
+            )
 
-        # https://stackoverflow.com/a/34002296/13781503
-        prev = self.content
-        while True:
-            curr = self.engine.inject_variables(prev, variables)
-            if curr != prev:
-                prev = curr
-            else:
-                self.content = curr
-                break
+        self.content = content
+        self.dependencies = dependencies
@@ -0,0 +1,5 @@
+from .folders import FolderIndex, FolderView
+from .frontmatter import FrontmatterIndex
+from .references import ReferenceGraph
+
+__all__ = ("FolderIndex", "FolderView", "FrontmatterIndex", "ReferenceGraph")
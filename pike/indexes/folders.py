@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import numbers
+import typing
+from collections.abc import Mapping
+from types import MappingProxyType
+
+FolderView = tuple[Mapping[str, typing.Any], ...]
+"""A sorted, read only view of the files within a folder"""
+
+
+def _type_order(value: typing.Any) -> str:
+    # Numbers compare with each other whatever their type,
+    # so an int and a float in the same variable sort together
+    if isinstance(value, numbers.Real):
+        return "number"
+
+    return type(value).__name__
+
+
+def sorted_view(
+    files: typing.Iterable[Mapping[str, typing.Any]], sort_by: str, reverse: bool
+) -> FolderView:
+    """Sort files by a variable, placing those without it last.
+
+    Values of different types, such as a number in some files and
+    a string in others, are grouped by type and then sorted within
+    each group. Values which cannot be compared at all, such as
+    mappings, are sorted by their string form instead.
+    """
+    present = []
+    missing = []
+    for file in files:
+        (missing if file.get(sort_by) is None else present).append(file)
+
+    try:
+        present.sort(
+            key=lambda file: (_type_order(file[sort_by]), file[sort_by]),
+            reverse=reverse,
+        )
+    except TypeError:
+        present.sort(
+            key=lambda file: (_type_order(file[sort_by]), str(file[sort_by])),
+            reverse=reverse,
+        )
+
+    return tuple(MappingProxyType(file) for file in present + missing)
+
+
+class FolderIndex:
+    """Sorted views of the files within each folder.
+
+    Views are built the first time they are requested
+    and reused until the folder is invalidated.
+    """
+
+    def __init__(
+        self, folder_variables: Mapping[str, Mapping[str, dict[str, typing.Any]]]
+    ) -> None:
+        """
+        Parameters
+        ----------
+        folder_variables: Mapping[str, Mapping[str, dict[str, typing.Any]]]
+            Folder name to the layout variables of each file within it
+        """
+        self._folder_variables = folder_variables
+        self._views: dict[tuple[str, str, bool], FolderView] = {}
+
+    def __repr__(self) -> str:
+        return f"FolderIndex(cached_views={len(self._views)})"
+
+    def invalidate(self, folder: str | None = None) -> None:
+        """Drop cached views for a folder, or every folder if not provided."""
+        if folder is None:
+            self._views.clear()
+            return
+
+        for key in [key for key in self._views if key[0] == folder]:
+            del self._views[key]
+
+    def get(
+        self, folder: str, *, sort_by: str = "id", reverse: bool = False
+    ) -> FolderView:
+        """Return the files within a folder.
+
+        Parameters
+        ----------
+        folder: str
+            The name of the folder
+        sort_by: str
+            The variable to sort files by, defaults to their id.
+            Files without the variable are placed last.
+        reverse: bool
+            Whether to reverse the sort order
+
+        Returns
+        -------
+        FolderView
+            A tuple of read only mappings
+        """
+        key = (folder, sort_by, reverse)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = sorted_view(
+                self._folder_variables.get(folder, {}).values(), sort_by, reverse
+            )
+
+        return view
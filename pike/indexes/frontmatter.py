@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import typing
+from collections import defaultdict
+from collections.abc import Hashable, Mapping
+
+from pike.indexes.folders import FolderView, sorted_view
+
+FileKey = tuple[str, str]
+"""The folder name and id of a file"""
+
+
+def _key(value: Hashable) -> tuple[type, Hashable]:
+    # Keyed by type as well, as True == 1 but
+    # `flag: true` shouldn't match a query for 1
+    return type(value), value
+
+
+def _equal(actual: typing.Any, expected: typing.Any) -> bool:
+    return type(actual) is type(expected) and actual == expected
+
+
+class FrontmatterIndex:
+    """Inverted indexes over the frontmatter of every file.
+
+    Each frontmatter value maps to the files which have it,
+    with list values indexed under each of their items.
+    Values which cannot be hashed are compared at query time instead.
+    Values only match those of the same type, so ``1`` does not match ``true``.
+
+    Frontmatter does not change while a report renders, so the index
+    is built once per run. Results are looked up in the folder variables
+    when queried, so they always carry the latest rendered content.
+    """
+
+    def __init__(
+        self, folder_variables: Mapping[str, Mapping[str, dict[str, typing.Any]]]
+    ) -> None:
+        """
+        Parameters
+        ----------
+        folder_variables: Mapping[str, Mapping[str, dict[str, typing.Any]]]
+            Folder name to the layout variables of each file within it
+        """
+        self._folder_variables = folder_variables
+        self._index: dict[str, dict[tuple[type, Hashable], set[FileKey]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self._unhashable: dict[str, set[FileKey]] = defaultdict(set)
+        for folder, files in folder_variables.items():
+            for file_id, variables in files.items():
+                for name, value in variables.items():
+                    if name != "content":
+                        self._add((folder, file_id), name, value)
+
+    def __repr__(self) -> str:
+        return f"FrontmatterIndex(keys={len(self._index)})"
+
+    def _add(self, file: FileKey, name: str, value: typing.Any) -> None:
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            try:
+                self._index[name][_key(item)].add(file)
+            except TypeError:
+                self._unhashable[name].add(file)
+
+    def _variables(self, file: FileKey) -> Mapping[str, typing.Any]:
+        folder, file_id = file
+        return self._folder_variables[folder][file_id]
+
+    def _matching(self, name: str, value: typing.Any) -> set[FileKey]:
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        matches: set[FileKey] = set()
+        index = self._index.get(name, {})
+        for item in values:
+            try:
+                matches.update(index.get(_key(item), ()))
+            except TypeError:
+                # Such as a tuple containing a list, which
+                # can only match the unhashable values
+                pass
+
+            for file in self._unhashable.get(name, ()):
+                actual = self._variables(file).get(name)
+                if _equal(actual, item) or (
+                    isinstance(actual, list)
+                    and any(_equal(entry, item) for entry in actual)
+                ):
+                    matches.add(file)
+
+        return matches
+
+    def query(
+        self,
+        folder: str | None = None,
+        *,
+        order_by: str = "id",
+        reverse: bool = False,
+        **filters: typing.Any,
+    ) -> FolderView:
+        """Find the files whose frontmatter matches every filter.
+
+        Parameters
+        ----------
+        folder: str | None
+            Only return files within this folder
+        order_by: str
+            The variable to sort results by, defaults to the file id.
+            Files without it are placed last.
+        reverse: bool
+            Whether to reverse the sort order
+        filters
+            Frontmatter names to the value they must have. Files whose
+            frontmatter is a list match if any item matches. Providing
+            a list, tuple or set matches files with any of its values.
+
+        Returns
+        -------
+        FolderView
+            A tuple of read only mappings
+        """
+        matches: set[FileKey] | None = None
+        if folder is not None:
+            matches = {
+                (folder, file_id) for file_id in self._folder_variables.get(folder, {})
+            }
+
+        for name, value in filters.items():
+            found = self._matching(name, value)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return ()
+
+        if matches is None:
+            matches = {
+                (folder_name, file_id)
+                for folder_name, files in self._folder_variables.items()
+                for file_id in files
+            }
+
+        # Sorting the keys first keeps ties in a stable order
+        return sorted_view(map(self._variables, sorted(matches)), order_by, reverse)
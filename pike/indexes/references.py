@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+import typing
+from collections.abc import Mapping
+
+from pike.dependencies import DependencyRecorder, TrackedDict
+
+log = logging.getLogger(__name__)
+
+
+class ReferenceGraph:
+    """Which files reference which other files.
+
+    References are read from a frontmatter variable, either a single
+    file id or a list of them. Forward references are kept per file,
+    while :attr:`referenced_by` holds the reverse lookup and records
+    reads of it so renders using it can be cached. A file referencing
+    itself is not one of its own referrers.
+    """
+
+    def __init__(self, recorder: DependencyRecorder, *, key: str = "references"):
+        """
+        Parameters
+        ----------
+        recorder: DependencyRecorder
+            Where to report reads of :attr:`referenced_by`
+        key: str
+            The frontmatter variable to read references from
+        """
+        self.key: str = key
+        self._references: dict[str, tuple[str, ...]] = {}
+        self.referenced_by: dict[str, tuple[str, ...]] = TrackedDict(
+            recorder, "backlinks"
+        )
+        """File id to the sorted ids of files referencing it"""
+
+    def __repr__(self) -> str:
+        return f"ReferenceGraph(key={self.key!r}, files={len(self._references)})"
+
+    def _parse(self, file_id: str, value: typing.Any) -> tuple[str, ...]:
+        if value is None:
+            return ()
+
+        if isinstance(value, str):
+            return (value,)
+
+        if isinstance(value, list):
+            return tuple(dict.fromkeys(str(item) for item in value))
+
+        log.warning(
+            "Ignoring references which are neither an id or list of ids\n\t"
+            "File: %s\n\tValue: %r",
+            file_id,
+            value,
+        )
+        return ()
+
+    def update(self, file_id: str, variables: Mapping[str, typing.Any]) -> set[str]:
+        """Update the references made by a file.
+
+        Parameters
+        ----------
+        file_id: str
+            The id of the file
+        variables: Mapping[str, typing.Any]
+            The files frontmatter
+
+        Returns
+        -------
+        set[str]
+            The ids whose :attr:`referenced_by` entry changed
+        """
+        new = self._parse(file_id, variables.get(self.key))
+        old = self._references.get(file_id, ())
+        if new == old:
+            return set()
+
+        self._references[file_id] = new
+        changed: set[str] = set(old).symmetric_difference(new)
+        changed.discard(file_id)
+        for target in changed:
+            referrers = set(dict.get(self.referenced_by, target, ()))
+            if target in new:
+                referrers.add(file_id)
+            else:
+                referrers.discard(file_id)
+
+            if referrers:
+                self.referenced_by[target] = tuple(sorted(referrers))
+            else:
+                self.referenced_by.pop(target, None)
+
+        return changed
+
+    def references(self, file_id: str) -> tuple[str, ...]:
+        """The ids a file references, in the order it lists them."""
+        return self._references.get(file_id, ())
+
+    def referrers(self, file_id: str) -> tuple[str, ...]:
+        """The ids of files referencing a file, sorted."""
+        return self.referenced_by.get(file_id, ())
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
+import json
 import logging
 import typing
 from io import StringIO
 from pathlib import Path
+from types import MappingProxyType
 
-from lxml.html.builder import TABLE
-
+from pike import structs
 from pike.docx import commands
-from pike.structs import Table
+from pike.indexes import FolderView
 
 if typing.TYPE_CHECKING:
     from pike import Engine, File
@@ -16,24 +17,100 @@ if typing.TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
-def get_folder(engine: Engine, section_name: str) -> list[dict[str, typing.Any]]:
-    """Given a folder name, return a list of the content"""
-    data: list[dict[str, typing.Any]] = list(
-        engine._folder_variables[section_name].values()
+def get_folder(
+    engine: Engine,
+    section_name: str,
+    sort_by: str = "id",
+    reverse: bool = False,
+) -> FolderView:
+    """Given a folder name, return the files within it.
+
+    Parameters
+    ----------
+    engine: Engine
+        The current engine
+    section_name: str
+        The name of the folder
+    sort_by: str
+        The frontmatter variable to sort by, defaults to the file id.
+        Files without it are placed last.
+    reverse: bool
+        Whether to reverse the sort order
+
+    Returns
+    -------
+    FolderView
+        A read only view, cached until the folder changes.
+    """
+    engine.dependency_recorder.add("folders", section_name)
+    return engine.folder_index.get(section_name, sort_by=sort_by, reverse=reverse)
+
+
+def query_files(
+    engine: Engine,
+    folder: str | None = None,
+    order_by: str = "id",
+    reverse: bool = False,
+    **filters: typing.Any,
+) -> FolderView:
+    """Return the files whose frontmatter matches the given filters.
+
+    For example ``query_files(folder="findings", severity="high", order_by="cvss")``
+
+    See :meth:`pike.indexes.FrontmatterIndex.query` for the available options.
+    """
+    if folder is None:
+        engine.dependency_recorder.add("files")
+    else:
+        engine.dependency_recorder.add("folders", folder)
+
+    return engine.frontmatter_index.query(
+        folder, order_by=order_by, reverse=reverse, **filters
     )
-    return list(sorted(data, key=lambda file: file.get("id"), reverse=False))
 
 
-def comment(file: File, comment_value: str) -> str:
-    """Raise a comment for review"""
-    log.warning(
-        "Comment: '%s'\n\tFile: %s",
-        comment_value,
-        file.file,
+def _file_views(engine: Engine, file_ids: typing.Iterable[str]) -> FolderView:
+    return tuple(
+        MappingProxyType(engine._file_variables[file_id])
+        for file_id in file_ids
+        if file_id in engine._file_variables
     )
+
+
+def get_references(engine: Engine, file_id: str) -> FolderView:
+    """Return the files the given file references, in the order it lists them."""
+    # These come from the files frontmatter, so rendering
+    # again is needed whenever the file itself changes
+    engine.dependency_recorder.add("files", file_id)
+    return _file_views(engine, engine.reference_graph.references(file_id))
+
+
+def get_referenced_by(engine: Engine, file_id: str) -> FolderView:
+    """Return the files referencing the given file, sorted by id."""
+    return _file_views(engine, engine.reference_graph.referrers(file_id))
+
+
+def comment(file: File, comment_value: str) -> str:
+    """Raise a comment for review.
+
+    Comments are logged by the engine once the file has
+    finished rendering, so a file rendered more than
+    once only logs its comments a single time.
+    """
+    file.comments.append(comment_value)
     return commands.create_command_string("NOP")
 
 
+def log_comments(file: File) -> None:
+    """Log the comments raised during the last render of a file"""
+    for comment_value in file.comments:
+        log.warning(
+            "Comment: '%s'\n\tFile: %s",
+            comment_value,
+            file.file,
+        )
+
+
 def insert_image(
     image_src: str,
     *,
@@ -77,10 +154,51 @@ def insert_table_from_csv(
     file: Path,
     file_contains_headers: bool = True,
     column_widths: list[float] = None,
+    columns: list[str | int] = None,
+    row_limit: int = None,
+    stream: bool = False,
+    chunk_size: int = 1000,
 ) -> str:
-    table = Table.from_csv_file(
+    """Insert a table from a CSV file.
+
+    Parameters
+    ----------
+    file: Path
+        The CSV file to read
+    file_contains_headers: bool
+        Does the CSV contain a header row?
+    column_widths: list[float]
+        A list of table column widths
+    columns: list[str | int]
+        Only include these columns, either by header or index
+    row_limit: int
+        Only include this many rows, not counting the header row
+    stream: bool
+        Rather than turning the CSV into a markdown table, read it
+        while building the word document and write it straight in.
+        This keeps memory usage bounded for very large files,
+        but the table only appears within word documents.
+    chunk_size: int
+        When streaming, how many rows to read before writing them
+    """
+    if stream:
+        if column_widths is not None:
+            raise ValueError("Streamed tables do not support column widths")
+
+        return commands.create_command_string(
+            "insert_csv_table",
+            str(file),
+            file_contains_headers=file_contains_headers,
+            columns=json.dumps(columns) if columns is not None else "",
+            row_limit=row_limit if row_limit is not None else "",
+            chunk_size=chunk_size,
+        )
+
+    table = structs.Table.from_csv_file(
         file,
         file_contains_headers=file_contains_headers,
         column_widths=column_widths,
+        columns=columns,
+        row_limit=row_limit,
     )
     return table.as_markdown()
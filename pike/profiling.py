@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+
+class _Frame:
+    __slots__ = ("name", "wall_start", "cpu_start", "peak_memory")
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.wall_start: float = time.perf_counter()
+        self.cpu_start: float = time.process_time()
+        self.peak_memory: int = 0
+
+
+class Profiler:
+    """Records how long each stage of a build takes.
+
+    Every stage records its wall time, CPU time and the peak
+    memory allocated by Python while it ran. Stages may be nested,
+    in which case the outer stage includes the inner one.
+    """
+
+    def __init__(self, *, trace_memory: bool = True) -> None:
+        """
+        Parameters
+        ----------
+        trace_memory: bool
+            Whether to record peak memory usage using
+            :mod:`tracemalloc`, which slows the build down.
+        """
+        self.trace_memory: bool = trace_memory
+        self.stages: list[dict[str, typing.Any]] = []
+        self.files: dict[str, float] = {}
+        self._stack: list[_Frame] = []
+        self._started_tracing: bool = False
+
+    def __repr__(self) -> str:
+        return f"Profiler(stages={len(self.stages)}, files={len(self.files)})"
+
+    def start(self) -> None:
+        """Begin tracing memory, if enabled."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing memory if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> typing.Iterator[None]:
+        """Record the cost of everything within the block as a stage.
+
+        Parameters
+        ----------
+        name: str
+            What to call the stage within the report
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # tracemalloc has a single peak, so fold it into
+            # the enclosing stage before resetting it for this one
+            if self._stack:
+                self._stack[-1].peak_memory = max(
+                    self._stack[-1].peak_memory, tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+
+        frame = _Frame(name)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            entry: dict[str, typing.Any] = {
+                "name": name,
+                "parent": self._stack[-1].name if self._stack else None,
+                "wall_time": time.perf_counter() - frame.wall_start,
+                "cpu_time": time.process_time() - frame.cpu_start,
+                "peak_memory": None,
+            }
+            if tracing and tracemalloc.is_tracing():
+                peak = max(frame.peak_memory, tracemalloc.get_traced_memory()[1])
+                entry["peak_memory"] = peak
+                if self._stack:
+                    self._stack[-1].peak_memory = max(self._stack[-1].peak_memory, peak)
+
+            self.stages.append(entry)
+
+    @contextlib.contextmanager
+    def file(self, file_id: str) -> typing.Iterator[None]:
+        """Add the wall time of the block to a files render time."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_file_time(file_id, time.perf_counter() - start)
+
+    def add_file_time(self, file_id: str, seconds: float) -> None:
+        """Add to a files render time, such as one timed in another process."""
+        self.files[file_id] = self.files.get(file_id, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        """The recorded timings in a JSON serializable form.
+
+        Stages are listed in the order they finished, so
+        nested stages appear before the stage containing them.
+        Wall and CPU times are in seconds and memory is in bytes.
+        """
+        return {
+            "stages": self.stages,
+            "files": dict(sorted(self.files.items(), key=lambda item: -item[1])),
+        }
+
+    def save(self, path: Path) -> None:
+        """Write the recorded timings to disk as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import time
+import typing
+from collections import ChainMap
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+import jinja2
+from jinja2 import Environment
+from jinja2.sandbox import SandboxedEnvironment
+
+from pike import caching
+from pike import jinja_globals as jg
+from pike.dependencies import Dependency, DependencyRecorder, TrackedDict
+from pike.docx import commands
+from pike.indexes import FolderIndex, FrontmatterIndex, ReferenceGraph
+
+if typing.TYPE_CHECKING:
+    from pike import Engine, File
+
+log = logging.getLogger(__name__)
+
+
+class RequiresParentProcess(Exception):
+    """Raised when a template uses something only the parent process has"""
+
+
+def create_environment(
+    *,
+    use_sandbox: bool,
+    bytecode_directory: Path | None = None,
+) -> Environment:
+    """Create the Jinja environment files are rendered with.
+
+    Parameters
+    ----------
+    use_sandbox: bool
+        Whether to use a sandboxed environment
+    bytecode_directory: Path | None
+        Where to persist compiled templates, if anywhere.
+    """
+    bytecode_cache: jinja2.BytecodeCache | None = None
+    if bytecode_directory is not None:
+        bytecode_directory.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_directory))
+
+    environment_class = SandboxedEnvironment if use_sandbox else Environment
+    return environment_class(
+        lstrip_blocks=True,
+        undefined=jinja2.StrictUndefined,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+def is_static_template(environment: Environment, content: str) -> bool:
+    """Whether rendering the content would be a no-op
+    beyond Jinja's newline handling."""
+    return "\r" not in content and not any(
+        delimiter in content
+        for delimiter in (
+            environment.block_start_string,
+            environment.variable_start_string,
+            environment.comment_start_string,
+        )
+    )
+
+
+def render_template(
+    environment: Environment,
+    template_cache: caching.TemplateCache,
+    template_globals: MutableMapping[str, typing.Any],
+    content: str,
+    variables: Mapping[str, typing.Any],
+) -> str:
+    """Render the given content as a Jinja template.
+
+    See :meth:`pike.Engine.inject_variables`
+    """
+    if is_static_template(environment, content):
+        # Saves compiling the output of every file a second time
+        # just to find out it renders to itself. Jinja drops a
+        # single trailing newline so we must as well.
+        return content.removesuffix("\n")
+
+    template = template_cache.get_template(environment, content, template_globals)
+    # Template.render copies the variables and globals into a
+    # new dict, a shared context looks them up in place instead
+    context = template.new_context(ChainMap(variables, template.globals), shared=True)
+    try:
+        return environment.concat(template.root_render_func(context))
+    except Exception:
+        environment.handle_exception()
+
+
+def generate_template(
+    environment: Environment,
+    template_cache: caching.TemplateCache,
+    template_globals: MutableMapping[str, typing.Any],
+    content: str,
+    variables: Mapping[str, typing.Any],
+) -> Iterator[str]:
+    """Render the given content as a Jinja template,
+    yielding the output piece by piece as it is produced.
+
+    See :func:`render_template`
+    """
+    if is_static_template(environment, content):
+        yield content.removesuffix("\n")
+        return
+
+    template = template_cache.get_template(environment, content, template_globals)
+    context = template.new_context(ChainMap(variables, template.globals), shared=True)
+    try:
+        yield from template.root_render_func(context)
+    except Exception:
+        environment.handle_exception()
+
+
+def strip_trailing_newlines(chunks: Iterable[str]) -> Iterator[str]:
+    """Drop the newlines ending a stream of rendered chunks.
+
+    Each render drops a single trailing newline, so content rendered
+    until stable ends without any. This matches that for a single pass.
+    """
+    pending = ""
+    for chunk in chunks:
+        stripped = chunk.rstrip("\n")
+        if stripped:
+            yield pending + stripped
+            pending = chunk[len(stripped) :]
+        else:
+            pending += chunk
+
+
+class ChunkBuffer:
+    """Collects rendered chunks into a single string.
+
+    Behaves like :class:`io.StringIO` for writing, but small chunks are
+    joined together as they arrive. This avoids keeping thousands of
+    separate strings around, or StringIO's four bytes per character,
+    so the content takes little more than its own size until joined.
+    """
+
+    def __init__(self, *, batch_size: int = 1024) -> None:
+        self.batch_size: int = batch_size
+        self._blocks: list[str] = []
+        self._pending: list[str] = []
+
+    def __repr__(self) -> str:
+        return f"ChunkBuffer(blocks={len(self._blocks)}, pending={len(self._pending)})"
+
+    def write(self, chunk: str) -> None:
+        self._pending.append(chunk)
+        if len(self._pending) >= self.batch_size:
+            self._blocks.append("".join(self._pending))
+            self._pending.clear()
+
+    def getvalue(self) -> str:
+        if self._pending:
+            self._blocks.append("".join(self._pending))
+            self._pending.clear()
+
+        if len(self._blocks) > 1:
+            self._blocks[:] = ["".join(self._blocks)]
+
+        return self._blocks[0] if self._blocks else ""
+
+
+def render_until_stable(
+    content: str, render: Callable[[str], str]
+) -> tuple[str, list[str]]:
+    """Render content until doing so no longer changes it.
+
+    Returns
+    -------
+    tuple[str, list[str]]
+        The final content and every template rendered to get there.
+    """
+    # https://stackoverflow.com/a/34002296/13781503
+    sources: list[str] = []
+    prev = content
+    while True:
+        sources.append(prev)
+        curr = render(prev)
+        if curr == prev:
+            return curr, sources
+
+        prev = curr
+
+
+class _ParentOnly:
+    """Stands in for things which cannot leave the parent process"""
+
+    def __getattr__(self, item):
+        raise RequiresParentProcess(item)
+
+    def __getitem__(self, item):
+        raise RequiresParentProcess(item)
+
+
+RenderResult = tuple[str, list[str], set[Dependency], list[str], float]
+"""The rendered content, the templates rendered, the recorded
+dependencies, the comments raised and the render time in seconds"""
+
+_worker: SimpleNamespace | None = None
+
+
+def _init_worker(
+    use_sandbox: bool,
+    bytecode_directory: Path | None,
+    template_cache_size: int,
+    custom_commands: dict[str, Callable[..., str]],
+    global_variables: dict[str, typing.Any],
+    references_key: str,
+) -> None:
+    global _worker
+    recorder = DependencyRecorder()
+    files = TrackedDict(recorder, "files")
+    files.update(global_variables.get("files", {}))
+    folders = TrackedDict(recorder, "folders", default_factory=dict)
+    folders.update(global_variables.get("folders", {}))
+    reference_graph = ReferenceGraph(recorder, key=references_key)
+    for file_id, variables in files.items():
+        reference_graph.update(file_id, variables)
+
+    global_variables = {
+        **global_variables,
+        "files": files,
+        "folders": folders,
+        "backlinks": reference_graph.referenced_by,
+    }
+
+    # The jinja globals only need these parts of the engine
+    engine_view = SimpleNamespace(
+        folder_index=FolderIndex(folders),
+        frontmatter_index=FrontmatterIndex(folders),
+        reference_graph=reference_graph,
+        _file_variables=files,
+        dependency_recorder=recorder,
+    )
+    _worker = SimpleNamespace(
+        environment=create_environment(
+            use_sandbox=use_sandbox, bytecode_directory=bytecode_directory
+        ),
+        template_cache=caching.TemplateCache(template_cache_size),
+        template_globals=ChainMap(
+            {
+                "get_folder": partial(jg.get_folder, engine_view),
+                "query_files": partial(jg.query_files, engine_view),
+                "get_references": partial(jg.get_references, engine_view),
+                "get_referenced_by": partial(jg.get_referenced_by, engine_view),
+            },
+            custom_commands,
+        ),
+        global_variables=global_variables,
+        recorder=recorder,
+    )
+
+
+def _comment(*args, **kwargs) -> str:
+    _worker.recorder.add("volatile", "comment")
+    return jg.comment(*args, **kwargs)
+
+
+def _insert_table_from_csv(*args, **kwargs) -> str:
+    _worker.recorder.add("volatile", "insert_table_from_csv")
+    return jg.insert_table_from_csv(*args, **kwargs)
+
+
+def _render_in_worker(
+    task: tuple[Path, str, dict[str, typing.Any]],
+) -> RenderResult | None:
+    path, content, file_variables = task
+    # Comments are returned for the parent process to log
+    file = SimpleNamespace(file=path, comments=[])
+    local_variables = {
+        **file_variables,
+        "plugins": _ParentOnly(),
+        "comment": partial(_comment, file),
+        "insert_image": jg.insert_image,
+        "insert_table_from_csv": _insert_table_from_csv,
+    }
+    variables = ChainMap(
+        {"this": local_variables}, _worker.global_variables, local_variables
+    )
+    render = partial(
+        render_template,
+        _worker.environment,
+        _worker.template_cache,
+        _worker.template_globals,
+        variables=variables,
+    )
+    start = time.perf_counter()
+    try:
+        # Forked workers inherit the parents command registry, but
+        # can't add to it, so they create full command strings
+        with (
+            commands.use_command_registry(None),
+            _worker.recorder.record() as dependencies,
+        ):
+            content, sources = render_until_stable(content, render)
+    except RequiresParentProcess:
+        return None
+
+    return (
+        content,
+        sources,
+        dependencies,
+        file.comments,
+        time.perf_counter() - start,
+    )
+
+
+def render_in_processes(engine: Engine, files: list[File]) -> list[RenderResult | None]:
+    """Render files across a pool of worker processes.
+
+    Each worker gets a snapshot of the engines global variables,
+    so every file sees the other files as they were before rendering.
+
+    Parameters
+    ----------
+    engine: Engine
+        The engine the files belong to
+    files: list[File]
+        The files to render
+
+    Returns
+    -------
+    list[RenderResult | None]
+        The result for each file in order. None means the file used
+        something unavailable to workers, such as file plugins,
+        and needs rendering within this process instead.
+    """
+    bytecode_directory = (
+        engine.cache_directory / "bytecode"
+        if engine.config.get("use_bytecode_cache", False)
+        else None
+    )
+    # Accessed through the package so multiprocessing
+    # is only imported when rendering in processes
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=engine.render_jobs,
+        initializer=_init_worker,
+        initargs=(
+            engine.config["use_sandbox"],
+            bytecode_directory,
+            engine.template_cache.maxsize,
+            dict(engine._jinja_custom_commands),
+            dict(engine.global_variables),
+            engine.references_key,
+        ),
+    ) as executor:
+        tasks = [(file.file, file.content, file.variables) for file in files]
+        return list(
+            executor.map(
+                _render_in_worker,
+                tasks,
+                chunksize=max(len(tasks) // (engine.render_jobs * 4), 1),
+            )
+        )
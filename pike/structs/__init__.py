@@ -1,3 +1,9 @@
+from __future__ import annotations
+
+import typing
+
+from pike._lazy import lazy_module
+
 from pike.structs.config import (
     ConfigT,
     StylesT,
@@ -5,7 +11,16 @@ from pike.structs.config import (
     ListT,
     CreationTypesT,
 )
-from pike.structs.table import Table, Cell, Row, Entry, TextAlignment, Link
+
+if typing.TYPE_CHECKING:
+    from pike.structs.table import Table, Cell, Row, Entry, TextAlignment, Link
+
+# Tables need markdown-it,
+# so they are only imported on first use
+_lazy_attributes: dict[str, str] = {
+    name: "pike.structs.table"
+    for name in ("Table", "Cell", "Row", "Entry", "TextAlignment", "Link")
+}
 
 __all__ = (
     "ConfigT",
@@ -20,3 +35,6 @@ __all__ = (
     "CreationTypesT",
     "Link",
 )
+
+
+__getattr__, __dir__ = lazy_module(globals(), _lazy_attributes)
@@ -1,4 +1,4 @@
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 
 class ListT(TypedDict):
@@ -68,3 +68,29 @@ class ConfigT(TypedDict):
     """Whether or not to use a sandboxed Jinja2 environment"""
     docx_create_styles: CreationTypesT
     """Should Pike create default styles?"""
+    use_build_cache: NotRequired[bool]
+    """Whether to reuse the output of unchanged files
+    between runs. Defaults to False."""
+    use_bytecode_cache: NotRequired[bool]
+    """Whether to store compiled Jinja templates
+    on disk between runs. Defaults to False."""
+    template_cache_size: NotRequired[int]
+    """How many compiled templates to keep in memory.
+    Set to 0 to disable the cache. Defaults to 128."""
+    cache_directory: NotRequired[str]
+    """The directory to store caches within.
+    Defaults to ``.pike_cache`` within the report directory.
+    """
+    stream_layout: NotRequired[bool]
+    """Whether to render the layout file in a single pass,
+    writing it to the markdown output as it is produced
+    rather than building it as one string first.
+    Defaults to False."""
+    use_command_registry: NotRequired[bool]
+    """Whether custom commands are kept in memory during
+    the build, with only a short handle to each placed
+    within the markdown. Defaults to False."""
+    references_key: NotRequired[str]
+    """The frontmatter variable files list the ids
+    of files they reference in. Defaults to ``references``.
+    """
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import csv
+import functools
+import itertools
 from enum import Enum
 from imaplib import Literal
 from io import StringIO
 from pathlib import Path
-from typing import cast
+from typing import cast, Iterator
 
 from markdown_it.token import Token
-from pydantic import BaseModel
 
 from pike import utils
 from pike.docx import CurrentRun, TableContext, commands, check_has_next
@@ -23,38 +24,118 @@ class TextAlignment(Enum):
     NONE = 4
 
 
-class Link(BaseModel):
-    text: str
-    href: str
-    is_external_hyperlink: bool
+# Tables can hold hundreds of thousands of these, so they are
+# plain slotted classes rather than validated models to keep
+# building them cheap and each instance small
+class Link:
+    """A hyperlink within a cell"""
 
+    __slots__ = ("text", "href", "is_external_hyperlink")
 
-class Entry(BaseModel):
+    def __init__(self, *, text: str, href: str, is_external_hyperlink: bool):
+        self.text: str = text
+        self.href: str = href
+        self.is_external_hyperlink: bool = is_external_hyperlink
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, self.__class__)
+            and self.text == other.text
+            and self.href == other.href
+            and self.is_external_hyperlink == other.is_external_hyperlink
+        )
+
+    def __repr__(self):
+        return f"Link({self.text=},{self.href=},{self.is_external_hyperlink=})"
+
+
+class Entry:
     """A piece of text within a cell"""
 
-    text: str
-    """The text"""
-    style: CurrentRun
-    """How to style it"""
-    link: Link | None = None
+    __slots__ = ("text", "style", "link")
+
+    def __init__(self, *, text: str, style: CurrentRun, link: Link | None = None):
+        self.text: str = text
+        """The text"""
+        self.style: CurrentRun = style
+        """How to style it"""
+        self.link: Link | None = link
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, self.__class__)
+            and self.text == other.text
+            and self.style == other.style
+            and self.link == other.link
+        )
 
-    class Config:
-        arbitrary_types_allowed = True
+    def __repr__(self):
+        return f"Entry({self.text=},{self.style=},{self.link=})"
 
 
-class Cell(BaseModel):
+class Cell:
     # Stupid nesting to support
     # multiple styles in content
     """A cell, composed of various text pieces"""
-    content: list[Entry]
-    """Said text pieces"""
 
+    __slots__ = ("content",)
 
-class Row(BaseModel):
+    def __init__(self, *, content: list[Entry]):
+        self.content: list[Entry] = content
+        """Said text pieces"""
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.content == other.content
+
+    def __repr__(self):
+        return f"Cell({self.content=})"
+
+
+class Row:
     """The cells within a given row"""
 
-    cells: list[Cell]
-    """Said cells"""
+    __slots__ = ("cells",)
+
+    def __init__(self, *, cells: list[Cell]):
+        self.cells: list[Cell] = cells
+        """Said cells"""
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.cells == other.cells
+
+    def __repr__(self):
+        return f"Row({self.cells=})"
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_cell_text(content: str) -> tuple[tuple[str, bool | None, bool | None], ...]:
+    """Parse text into pieces of text alongside whether they are bold and italic
+
+    Cached separately from the resulting :class:`Cell` as
+    cells are mutable and so can't be shared between tables.
+    """
+    ast = utils.get_markdown_it().parse(content)
+
+    pieces: list[tuple[str, bool | None, bool | None]] = []
+    bold: bool | None = None
+    italic: bool | None = None
+    for token in utils.flatten_ast(ast):
+        match token.type:
+            # TODO Support underline and highlighting
+            case "strong_open":
+                bold = True
+            case "em_open":
+                italic = True
+            case "text":
+                if token.content != "":
+                    # Toss the empties, they shouldn't
+                    # matter to end docx anyway
+                    pieces.append((token.content, bold, italic))
+                    # So they don't clutter each other
+                    bold = None
+                    italic = None
+
+    return tuple(pieces)
 
 
 class Table:
@@ -183,30 +264,19 @@ class Table:
 
     @classmethod
     def text_to_cell(cls, content: str) -> Cell:
-        """Given some text, AST it and return a valid cell"""
-        markdown = utils.create_markdown_it()
-        ast = markdown.parse(content)
-
-        current_run: CurrentRun = CurrentRun()
-        current_row_entries: list[Entry] = []
-        for token in utils.flatten_ast(ast):
-            match token.type:
-                # TODO Support underline and highlighting
-                case "strong_open":
-                    current_run.bold = True
-                case "em_open":
-                    current_run.italic = True
-                case "text":
-                    if token.content != "":
-                        # Toss the empties, they shouldn't
-                        # matter to end docx anyway
-                        current_row_entries.append(
-                            Entry(text=token.content, style=current_run)
-                        )
-                        # So they don't clutter each other
-                        current_run = CurrentRun()
+        """Given some text, AST it and return a valid cell
 
-        return Cell(content=current_row_entries)
+        Notes
+        -----
+        The parsed form of recently seen text is cached, as table
+        columns such as severities tend to repeat the same values.
+        """
+        return Cell(
+            content=[
+                Entry(text=text, style=CurrentRun(bold=bold, italic=italic))
+                for text, bold, italic in _parse_cell_text(content)
+            ]
+        )
 
     @classmethod
     def from_csv_file(
@@ -215,6 +285,8 @@ class Table:
         *,
         file_contains_headers: bool = True,
         column_widths: list[float] = None,
+        columns: list[str | int] = None,
+        row_limit: int = None,
     ) -> Table:
         """Given a CSV file, turn it into a valid table
 
@@ -229,18 +301,25 @@ class Table:
             Pike will handle the relevant markdown shenanigans
         column_widths: list[float]
             A list of table column widths
+        columns: list[str | int]
+            Only include these columns, either by header or index
+        row_limit: int
+            Only include this many rows, not counting the header row
         """
         rows: list[Row] = []
         if not file_contains_headers:
             rows.append(Row(cells=[]))
 
-        with open(file) as f:
-            reader = csv.reader(f)
-            for row in reader:
-                cells: list[Cell] = []
-                for cell in row:
-                    cells.append(cls.text_to_cell(cell))
-                rows.append(Row(cells=cells))
+        for row in cls.read_csv(
+            file,
+            file_contains_headers=file_contains_headers,
+            columns=columns,
+            row_limit=row_limit,
+        ):
+            cells: list[Cell] = []
+            for cell in row:
+                cells.append(cls.text_to_cell(cell))
+            rows.append(Row(cells=cells))
 
         return cls(
             rows,
@@ -248,6 +327,75 @@ class Table:
             column_widths=column_widths,
         )
 
+    @classmethod
+    def read_csv(
+        cls,
+        file: Path,
+        *,
+        file_contains_headers: bool = True,
+        columns: list[str | int] = None,
+        row_limit: int = None,
+    ) -> Iterator[list[str]]:
+        """Lazily read the rows of a CSV file as text.
+
+        Column selection and the row limit are applied as the file
+        is read, so rows which aren't needed are never kept around.
+
+        Parameters
+        ----------
+        file: Path
+            The file to read
+        file_contains_headers: bool
+            Does the CSV contain a header row?
+
+            If so it is always the first row returned
+        columns: list[str | int]
+            Only include these columns, either by header or index
+        row_limit: int
+            Only include this many rows, not counting the header row
+
+        Raises
+        ------
+        ValueError
+            A column doesn't exist or was selected by
+            header when the file doesn't contain headers
+        """
+        with open(file) as f:
+            reader = csv.reader(f)
+            indexes: list[int] | None = None
+            if file_contains_headers:
+                header = next(reader, None)
+                if header is None:
+                    return
+
+                if columns is not None:
+                    indexes = []
+                    for column in columns:
+                        if isinstance(column, int):
+                            indexes.append(column)
+                        elif column in header:
+                            indexes.append(header.index(column))
+                        else:
+                            raise ValueError(
+                                f"The column {column!r} does not exist within {file}"
+                            )
+
+                    header = [header[idx] for idx in indexes]
+
+                yield header
+
+            elif columns is not None:
+                if not all(isinstance(column, int) for column in columns):
+                    raise ValueError(
+                        "Columns can only be selected by header "
+                        "when the file contains headers"
+                    )
+
+                indexes = list(columns)
+
+            for row in itertools.islice(reader, row_limit):
+                yield row if indexes is None else [row[idx] for idx in indexes]
+
     @classmethod
     def from_ast(
         cls,
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+import typing
+from pathlib import Path
+
+
+class Tracer:
+    """Records spans in the Chrome trace event format.
+
+    The output can be opened with ``chrome://tracing``,
+    https://ui.perfetto.dev or https://www.speedscope.app.
+    Spans opened while another is open on the same thread
+    show as nested within it.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, typing.Any]] = []
+        self._pid: int = os.getpid()
+        self._origin: int = time.perf_counter_ns()
+
+    def __repr__(self) -> str:
+        return f"Tracer(events={len(self.events)})"
+
+    def _now(self) -> float:
+        # Trace events are measured in microseconds
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    @contextlib.contextmanager
+    def span(
+        self, name: str, *, category: str, **arguments: typing.Any
+    ) -> typing.Iterator[None]:
+        """Record everything within the block as a span.
+
+        Parameters
+        ----------
+        name: str
+            What to call the span
+        category: str
+            The kind of span, such as ``command`` or ``plugin``
+        arguments
+            Extra details to show alongside the span
+        """
+        start = self._now()
+        try:
+            yield
+        finally:
+            event: dict[str, typing.Any] = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": self._now() - start,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            }
+            if arguments:
+                event["args"] = {key: str(value) for key, value in arguments.items()}
+
+            self.events.append(event)
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        """The recorded spans as a Chrome trace."""
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def save(self, path: Path) -> None:
+        """Write the recorded spans to disk as a Chrome trace."""
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f)
@@ -1,4 +1,30 @@
-from pike.utils.files import read_file_as_json, read_file
-from pike.utils.markdown_it import create_markdown_it, flatten_ast
+from __future__ import annotations
 
-__all__ = ("read_file", "read_file_as_json", "create_markdown_it", "flatten_ast")
+import typing
+
+from pike._lazy import lazy_module
+
+from pike.utils.files import read_file_as_json, read_file, find_files
+
+if typing.TYPE_CHECKING:
+    from pike.utils.markdown_it import create_markdown_it, get_markdown_it, flatten_ast
+
+# markdown-it is only needed once documents are
+# built, so it is imported on first use
+_lazy_attributes: dict[str, str] = {
+    "create_markdown_it": "pike.utils.markdown_it",
+    "get_markdown_it": "pike.utils.markdown_it",
+    "flatten_ast": "pike.utils.markdown_it",
+}
+
+__all__ = (
+    "read_file",
+    "read_file_as_json",
+    "find_files",
+    "create_markdown_it",
+    "get_markdown_it",
+    "flatten_ast",
+)
+
+
+__getattr__, __dir__ = lazy_module(globals(), _lazy_attributes)
@@ -1,5 +1,9 @@
+import fnmatch
 import json
 import logging
+import os
+import re
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
@@ -29,3 +33,110 @@ def read_file(file: Path | str) -> tuple[str, dict[str, Any]]:
         metadata, content = frontmatter.parse(f.read())
 
     return content, metadata
+
+
+def _compile_exclude_pattern(pattern: str) -> tuple[re.Pattern, bool, bool] | None:
+    """Turn a gitignore style pattern into (regex, is_anchored, directory_only)"""
+    pattern = pattern.strip()
+    if not pattern or pattern.startswith("#"):
+        return None
+
+    directory_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    while pattern.startswith("**/"):
+        # Matching at any depth is the default for un-anchored patterns
+        pattern = pattern.removeprefix("**/")
+
+    # Like gitignore, a slash anywhere but the end
+    # means the pattern is relative to the base directory
+    is_anchored = "/" in pattern
+    pattern = pattern.removeprefix("/")
+    return re.compile(fnmatch.translate(pattern)), is_anchored, directory_only
+
+
+def find_files(
+    base_directory: Path | str,
+    *,
+    suffix: str = ".md",
+    excluded_patterns: list[str] = None,
+    excluded_directories: list[Path | str] = None,
+) -> Iterator[Path]:
+    """Walk a directory tree and yield every file with the given suffix.
+
+    Excluded directories are pruned before they are descended
+    into, so things like a virtualenv within the report
+    directory cost a single check rather than a stat per file.
+
+    Parameters
+    ----------
+    base_directory: Path | str
+        The directory to search within
+    suffix: str
+        The file suffix to yield files for. Defaults to ``.md``
+    excluded_patterns: list[str]
+        Glob / gitignore style patterns to exclude.
+
+        Patterns without a slash match a file or directory
+        name at any depth, for example ``.venv`` or ``*.draft.md``.
+        Patterns containing a slash are matched against the path
+        relative to ``base_directory``, for example ``content/old/*``.
+        A trailing slash only matches directories.
+    excluded_directories: list[Path | str]
+        Directories to skip entirely at any depth, such as
+        the output directory or the cache directory.
+
+    Yields
+    ------
+    Path
+        Matching files joined onto ``base_directory``,
+        in a stable sorted order.
+    """
+    base_directory = Path(base_directory)
+    patterns = [
+        compiled
+        for compiled in map(_compile_exclude_pattern, excluded_patterns or [])
+        if compiled is not None
+    ]
+    # Resolved so that a directory is skipped at any depth, however
+    # it and the base directory are spelt, e.g. through a symlink
+    skipped_directories: set[str] = {
+        os.path.realpath(directory) for directory in excluded_directories or []
+    }
+
+    def is_excluded(relative_path: str, name: str, is_dir: bool) -> bool:
+        for regex, is_anchored, directory_only in patterns:
+            if directory_only and not is_dir:
+                continue
+
+            if regex.match(relative_path if is_anchored else name):
+                return True
+
+        return False
+
+    # A stack rather than recursion, (absolute path, path relative to base)
+    # Symlinked directories are not followed, so every
+    # path joined onto the resolved base is also resolved
+    pending: list[tuple[str, str]] = [(os.path.realpath(base_directory), "")]
+    while pending:
+        directory, relative_directory = pending.pop()
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda e: e.name)
+
+        sub_directories: list[tuple[str, str]] = []
+        for entry in entries:
+            relative_path = f"{relative_directory}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                if entry.path in skipped_directories or is_excluded(
+                    relative_path, entry.name, True
+                ):
+                    continue
+
+                sub_directories.append((entry.path, f"{relative_path}/"))
+
+            elif entry.name.endswith(suffix) and not is_excluded(
+                relative_path, entry.name, False
+            ):
+                yield base_directory / relative_path
+
+        # Reversed so the pop order matches the sorted order
+        pending.extend(reversed(sub_directories))
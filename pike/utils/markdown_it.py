@@ -1,3 +1,5 @@
+import functools
+
 from markdown_it import MarkdownIt
 from markdown_it.token import Token
 
@@ -8,6 +10,17 @@ def create_markdown_it() -> MarkdownIt:
     return markdown
 
 
+@functools.cache
+def get_markdown_it() -> MarkdownIt:
+    """A shared parser, configured as per :func:`create_markdown_it`.
+
+    Creating a parser compiles all of its rules, so this
+    should be preferred when parsing lots of small pieces of text.
+    Don't change its configuration, use :func:`create_markdown_it` instead.
+    """
+    return create_markdown_it()
+
+
 def flatten_ast(tokens: list[Token]) -> list[Token]:
     """Given a list of tokens, flatten it"""
     return [
@@ -0,0 +1,123 @@
+import json
+import timeit
+import typing
+import warnings
+from pathlib import Path
+
+import pytest
+
+BASELINE: typing.Final[Path] = Path(__file__).parent / "baseline.json"
+_results: dict[str, float] = {}
+
+
+class BenchmarkRegression(UserWarning):
+    """A benchmark was slower than its baseline"""
+
+
+def _load_baseline() -> dict[str, float]:
+    if not BASELINE.exists():
+        return {}
+
+    return json.loads(BASELINE.read_text())
+
+
+def _best_time(func: typing.Callable[[], typing.Any], *, repeat: int) -> float:
+    """The best time of a call, in seconds.
+
+    Each repeat calls the function enough times to take at least
+    0.2 seconds, and the best repeat is used as it is the timing
+    least affected by whatever else the machine is doing.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def _calibration_loop() -> None:
+    # Plain Python work similar to what the benchmarks do,
+    # building small dicts, strings and lists
+    data: dict[str, list[str]] = {}
+    for idx in range(5_000):
+        data[str(idx)] = f"value {idx} of the table".split(" ")
+
+    sorted(data, key=lambda key: data[key][1])
+
+
+@pytest.fixture(scope="session")
+def calibration() -> float:
+    """How long the calibration loop takes on this machine, in seconds."""
+    return _best_time(_calibration_loop, repeat=5)
+
+
+@pytest.fixture
+def measure(request, calibration):
+    """Time a callable and compare it against the stored baseline.
+
+    Timings are stored relative to a calibration loop timed in the same
+    session, so the baseline carries over between machines. A timing more
+    than ``--benchmark-threshold`` slower than the baseline warns, or fails
+    when running with ``--benchmark-strict``.
+    """
+    config = request.config
+    threshold: float = config.getoption("--benchmark-threshold")
+    updating: bool = config.getoption("--update-benchmark-baseline")
+    strict: bool = config.getoption("--benchmark-strict")
+    baseline = _load_baseline()
+
+    def measure(
+        func: typing.Callable[[], typing.Any],
+        *,
+        name: str | None = None,
+        repeat: int = 5,
+    ) -> float:
+        name = name or request.node.name
+        seconds = _best_time(func, repeat=repeat)
+        relative = seconds / calibration
+        _results[name] = relative
+        request.node.user_properties.append(("ms", round(seconds * 1000, 3)))
+
+        expected = baseline.get(name)
+        if expected is None or updating:
+            return seconds
+
+        change = relative / expected - 1
+        request.node.user_properties.append(("vs_baseline", f"{change:+.1%}"))
+        if change > threshold:
+            message = (
+                f"{name} took {seconds * 1000:.3f}ms which is {change:.0%} "
+                f"slower than the baseline, more than the {threshold:.0%} allowed"
+            )
+            if strict:
+                pytest.fail(message)
+
+            warnings.warn(message, BenchmarkRegression)
+
+        return seconds
+
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter):
+    lines: list[str] = []
+    for report in terminalreporter.stats.get("passed", []):
+        if report.when == "call" and "benchmark" in report.keywords:
+            if report.user_properties:
+                properties = ", ".join(
+                    f"{key}={value}" for key, value in report.user_properties
+                )
+                lines.append(f"{report.nodeid.split('::')[-1]}: {properties}")
+
+    if lines:
+        terminalreporter.write_sep("-", "benchmarks")
+        for line in lines:
+            terminalreporter.write_line(line)
+
+
+def pytest_sessionfinish(session):
+    if not _results or not session.config.getoption("--update-benchmark-baseline"):
+        return
+
+    # Merge so that running a subset of benchmarks keeps the rest
+    baseline = _load_baseline()
+    baseline.update({name: float(f"{value:.4g}") for name, value in _results.items()})
+    BASELINE.write_text(json.dumps(dict(sorted(baseline.items())), indent=2) + "\n")
@@ -0,0 +1,278 @@
+"""Benchmarks for the helpers which run once per token or per cell.
+
+Timings are compared against ``baseline.json``, run with
+``--update-benchmark-baseline`` to store new timings after
+an intentional change.
+"""
+
+import copy
+import csv
+import random
+import tracemalloc
+
+import pytest
+from skelmis.docx import Document
+
+from pike import jinja_globals, utils
+from pike.docx import Docx, commands
+from pike.docx.ast_util import get_up_to_token
+from pike.structs import Row, Table
+from pike.structs.table import _parse_cell_text
+
+WORDS = ("report", "finding", "table", "value", "server", "impact", "**high**")
+# Rows by columns, the largest being 50k cells
+TABLE_SIZES = {"50_cells": (10, 5), "5k_cells": (1_000, 5), "50k_cells": (10_000, 5)}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _markdown_table(rows: int, columns: int) -> str:
+    rng = random.Random(0)
+    lines = [
+        "| " + " | ".join(f"Column {idx}" for idx in range(columns)) + " |",
+        "| " + " | ".join("---" for _ in range(columns)) + " |",
+    ]
+    for _ in range(rows):
+        lines.append(
+            "| " + " | ".join(_sentence(rng, 3) for _ in range(columns)) + " |"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def _paragraphs(count: int, *, commands_per_paragraph: int = 2) -> str:
+    rng = random.Random(0)
+    paragraphs = []
+    for _ in range(count):
+        parts = [_sentence(rng, 20)]
+        for _ in range(commands_per_paragraph):
+            parts.append(
+                commands.create_command_string(
+                    "insert_text", _sentence(rng, 2), bold=True, italic=""
+                )
+            )
+        paragraphs.append(" ".join(parts))
+
+    return "\n\n".join(paragraphs) + "\n"
+
+
+def _walk(engine, ast) -> None:
+    docx = Docx(engine)
+    docx.import_commands_from_engine()
+    docx.walk_ast(Document(), ast)
+
+
+@pytest.fixture(scope="module")
+def markdown():
+    return utils.create_markdown_it()
+
+
+@pytest.fixture(scope="module", params=list(TABLE_SIZES))
+def table_ast(request, markdown):
+    return markdown.parse(_markdown_table(*TABLE_SIZES[request.param]))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("paragraphs", [1, 100])
+def test_split_str_into_command_blocks(measure, paragraphs):
+    text = _paragraphs(paragraphs)
+    measure(lambda: commands.split_str_into_command_blocks(text))
+
+
+@pytest.mark.benchmark
+def test_split_str_without_commands(measure):
+    text = _paragraphs(100, commands_per_paragraph=0)
+    measure(lambda: commands.split_str_into_command_blocks(text))
+
+
+@pytest.mark.benchmark
+def test_parse_command_string(measure):
+    command = commands.create_command_string(
+        "insert_text", "Some text", bold=True, italic=True, underline="", highlight=""
+    )
+    measure(lambda: commands.parse_command_string(command))
+
+
+@pytest.mark.benchmark
+def test_create_command_string(measure):
+    measure(
+        lambda: commands.create_command_string(
+            "insert_text",
+            "Some text",
+            bold=True,
+            italic=True,
+            underline="",
+            highlight="",
+        ),
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("text", ["high", "**Bold** but *italic*"])
+def test_text_to_cell(measure, text):
+    measure(lambda: Table.text_to_cell(text))
+
+
+@pytest.mark.benchmark
+def test_table_from_ast(measure, table_ast):
+    measure(lambda: Table.from_ast(table_ast))
+
+
+@pytest.mark.benchmark
+def test_flatten_ast(measure, table_ast):
+    measure(lambda: utils.flatten_ast(table_ast))
+
+
+@pytest.mark.benchmark
+def test_get_up_to_token(measure, table_ast):
+    measure(lambda: get_up_to_token(table_ast, end_token_type="table_close"))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("paragraphs", [1, 100])
+def test_walk_ast_paragraphs(measure, engine, markdown, paragraphs):
+    ast = markdown.parse(_paragraphs(paragraphs))
+    measure(lambda: _walk(engine, ast))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("size", ["50_cells", "5k_cells"])
+def test_walk_ast_table(measure, engine, markdown, size):
+    ast = markdown.parse(_markdown_table(*TABLE_SIZES[size]))
+    measure(lambda: _walk(engine, ast))
+
+
+@pytest.mark.benchmark
+def test_walk_ast_dispatch(measure, engine, markdown):
+    # A single paragraph, so nearly all the time is spent walking
+    ast = markdown.parse("**bold** and *italic* text " * 20_000)
+
+    def walk():
+        docx = Docx(engine)
+        docx.register_token_handler("text", lambda *_: None)
+        docx.walk_ast(Document(), ast)
+
+    measure(walk)
+
+
+@pytest.mark.benchmark
+def test_text_to_cell_uncached(measure):
+    def text_to_cell():
+        _parse_cell_text.cache_clear()
+        Table.text_to_cell("**Bold** but *italic*")
+
+    measure(text_to_cell)
+
+
+@pytest.mark.benchmark
+def test_table_from_csv_file(measure, tmp_path):
+    # 10k cells where most columns repeat a handful of values
+    rng = random.Random(0)
+    file = tmp_path / "table.csv"
+    with open(file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Host", "Severity", "Status", "Notes", "Owner"])
+        for row in range(2_000):
+            writer.writerow(
+                [
+                    f"10.0.0.{row}",
+                    rng.choice(["**Critical**", "**High**", "Medium", "Low"]),
+                    rng.choice(["Open", "Closed", "*Accepted*"]),
+                    _sentence(rng, 3),
+                    rng.choice(["Ops", "Dev", "Security"]),
+                ]
+            )
+
+    def from_csv_file():
+        _parse_cell_text.cache_clear()
+        Table.from_csv_file(file)
+
+    measure(from_csv_file)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("writer", ["xml", "python_docx"])
+def test_insert_table(measure, engine, markdown, monkeypatch, writer):
+    from pike.docx import docx as docx_module
+
+    if writer == "python_docx":
+        # Not being a real document forces the cell by cell path
+        monkeypatch.setattr(docx_module, "DocumentObject", type(None))
+
+    table = Table.from_ast(markdown.parse(_markdown_table(*TABLE_SIZES["5k_cells"])))
+
+    def insert_table():
+        docx = Docx(engine)
+        docx.template_file = Document()
+        docx.insert_table(table)
+
+    measure(insert_table)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("stream", [True, False], ids=["streamed", "markdown"])
+def test_csv_table_into_document(
+    measure, record_property, engine, markdown, tmp_path, stream
+):
+    rng = random.Random(0)
+    file = tmp_path / "table.csv"
+    with open(file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Host", "Severity", "Notes"])
+        for row in range(2_000):
+            writer.writerow(
+                [f"10.0.0.{row}", rng.choice(["High", "Low"]), _sentence(rng, 3)]
+            )
+
+    def build():
+        content = jinja_globals.insert_table_from_csv(file, stream=stream)
+        _walk(engine, markdown.parse(f"{content}\n"))
+
+    tracemalloc.start()
+    build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    record_property("peak_memory_mib", round(peak / 1024 / 1024, 1))
+    measure(build)
+
+
+@pytest.mark.benchmark
+def test_build_table_rows(measure, record_property):
+    # 100k cells drawn from a handful of values, so nearly all
+    # the time is spent creating the rows, cells and entries
+    texts = [f"value {idx % 50}" for idx in range(100_000)]
+
+    def build():
+        return [
+            Row(cells=[Table.text_to_cell(text) for text in texts[idx : idx + 5]])
+            for idx in range(0, len(texts), 5)
+        ]
+
+    build()
+    tracemalloc.start()
+    rows = build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    record_property("peak_memory_mib", round(peak / 1024 / 1024, 1))
+    measure(build, repeat=3)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("use_registry", [False, True], ids=["inline", "registry"])
+def test_command_transport(measure, record_property, engine, markdown, use_registry):
+    table = Table.from_ast(markdown.parse(_markdown_table(*TABLE_SIZES["5k_cells"])))
+
+    def build():
+        with commands.use_command_registry(
+            commands.CommandRegistry() if use_registry else None
+        ):
+            content = copy.deepcopy(table).as_markdown()
+            _walk(engine, markdown.parse(content))
+
+        return content
+
+    record_property("markdown_kib", round(len(build()) / 1024))
+    measure(build, repeat=3)
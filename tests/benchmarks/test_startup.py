@@ -0,0 +1,61 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from tests.test_imports import HEAVY_MODULES
+
+# Importing these up front mimics pike before
+# the docx machinery was imported lazily
+EAGER_IMPORTS = "import skelmis.docx, markdown_it, pike.docx.docx; "
+
+
+def _time_run(
+    report: Path, *, prefix: str = "", runs: int = 5
+) -> tuple[float, list[str]]:
+    """The median time of a run, and the heavy modules it imported"""
+    timings: list[float] = []
+    imported: list[str] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"{prefix}import json, runpy, sys\n"
+                f"sys.argv = ['pike', 'run', {str(report)!r}]\n"
+                "try:\n"
+                "    runpy.run_module('pike', run_name='__main__')\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                f"modules = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+                "print(json.dumps(modules))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent.parent.parent,
+        )
+        timings.append(time.perf_counter() - start)
+        imported = json.loads(result.stdout.strip().splitlines()[-1])
+
+    return statistics.median(timings), imported
+
+
+@pytest.mark.benchmark
+def test_markdown_only_startup(markdown_only_report: Path, record_property):
+    lazy, lazy_imports = _time_run(markdown_only_report)
+    eager, eager_imports = _time_run(markdown_only_report, prefix=EAGER_IMPORTS)
+    record_property("lazy_s", round(lazy, 3))
+    record_property("eager_s", round(eager, 3))
+    record_property("saving_s", round(eager - lazy, 3))
+
+    # Timings are too noisy to compare, but skipping the
+    # imports is what saves the time
+    assert lazy_imports == []
+    assert eager_imports == list(HEAVY_MODULES)
+    assert (markdown_only_report / "documents" / "Report.md").exists()
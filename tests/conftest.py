@@ -1,4 +1,6 @@
+import json
 from pathlib import Path
+from typing import Any, Callable
 
 import pytest
 
@@ -40,3 +42,101 @@ def set_test_directory_to_example_report(monkeypatch, example_report_dir):
 @pytest.fixture
 def engine(set_test_directory_to_example_report, example_report_dir):
     return Engine.load_from_directory(example_report_dir)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks within tests/benchmarks",
+    )
+    parser.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.25,
+        help="How much slower than the baseline a benchmark may be "
+        "before warning, as a fraction. Defaults to 0.25",
+    )
+    parser.addoption(
+        "--update-benchmark-baseline",
+        action="store_true",
+        default=False,
+        help="Store the benchmark timings as the new baseline",
+    )
+    parser.addoption(
+        "--benchmark-strict",
+        action="store_true",
+        default=False,
+        help="Fail benchmarks slower than the baseline rather than warning",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: a slow performance benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+
+    skip = pytest.mark.skip(reason="Needs --run-benchmarks to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def make_report(tmp_path: Path) -> Callable[..., Path]:
+    """Create a report within a temporary directory.
+
+    The report uses the default configuration, only outputs
+    markdown and has a ``title`` global variable of ``Report``.
+    """
+
+    def make_report(
+        layout: str = "",
+        files: dict[str, str] | None = None,
+        *,
+        config: dict[str, Any] | None = None,
+    ) -> Path:
+        """
+        Parameters
+        ----------
+        layout: str
+            The content of the layout file
+        files: dict[str, str] | None
+            Paths relative to the report, to the content to write to them
+        config: dict[str, Any] | None
+            Changes to the default configuration
+        """
+        pike_path = Path(__file__).parent.parent / "pike"
+        config_dir = tmp_path / "configuration"
+        config_dir.mkdir()
+        configuration = json.loads(
+            (pike_path / "default_files" / "config.json").read_text()
+        )
+        configuration["output_files"] = {"markdown": True, "docx": False, "pdf": False}
+        configuration.update(config or {})
+        (config_dir / "config.json").write_text(json.dumps(configuration))
+        (config_dir / "variables.json").write_text(json.dumps({"title": "Report"}))
+        (config_dir / "layout.md").write_text(layout)
+        for path, content in (files or {}).items():
+            (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / path).write_text(content)
+
+        return tmp_path
+
+    return make_report
+
+
+@pytest.fixture
+def markdown_only_report(make_report) -> Path:
+    """A small report which only outputs markdown"""
+    return make_report(
+        "{% for file in get_folder('content') %}{{ file.content }}\n{% endfor %}",
+        {
+            f"content/{idx}.md": f"---\nid: file_{idx}\n---\n# {{{{ title }}}} {idx}"
+            for idx in range(10)
+        },
+    )
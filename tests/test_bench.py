@@ -0,0 +1,61 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from pike.__main__ import app
+from pike.bench import SyntheticReport, run_benchmark
+
+
+def test_synthetic_report(tmp_path: Path):
+    report = SyntheticReport(files=3, tables=2, rows=4, commands=1).generate(
+        tmp_path / "report"
+    )
+    content = sorted((report / "content").iterdir())
+    assert [path.name for path in content] == ["0.md", "1.md", "2.md"]
+    assert content[0].read_text().count("| --- |") == 2
+    assert (report / "images" / "image.png").exists()
+
+    # Generation is reproducible
+    first = content[1].read_text()
+    shutil.rmtree(report)
+    SyntheticReport(files=3, tables=2, rows=4, commands=1).generate(report)
+    assert content[1].read_text() == first
+
+
+def test_synthetic_report_refuses_existing_directory(tmp_path: Path):
+    existing = tmp_path / "report"
+    existing.mkdir()
+    (existing / "keep.md").write_text("Mine")
+    with pytest.raises(FileExistsError):
+        SyntheticReport(files=1).generate(existing)
+
+    assert (existing / "keep.md").read_text() == "Mine"
+    assert not (existing / "content").exists()
+
+    # Empty directories are fine to use
+    (tmp_path / "empty").mkdir()
+    SyntheticReport(files=1).generate(tmp_path / "empty")
+
+
+def test_run_benchmark(tmp_path: Path):
+    report = SyntheticReport(files=2, rows=2).generate(tmp_path / "report")
+    for output in ("markdown", "docx"):
+        result = run_benchmark(report, output=output)
+        assert result["files"] == 2
+        assert result["tokens"] > 0
+        assert "render_files" in result["stages"]
+
+    assert "walk_ast" in result["stages"]
+    assert (report / "documents" / "Benchmark.docx").exists()
+
+
+def test_bench_rejects_unknown_output(tmp_path: Path):
+    result = CliRunner().invoke(
+        app, ["bench", "--output", "html", "--directory", str(tmp_path / "report")]
+    )
+    assert result.exit_code == 2
+    assert "html" in result.output
+    # Rejected before the report is generated
+    assert not (tmp_path / "report").exists()
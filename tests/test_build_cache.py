@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pike import Engine
+from pike.docx import commands
+
+
+@pytest.fixture
+def report_dir(make_report) -> Path:
+    return make_report(
+        "{% for file in get_folder('content') %}{{ file.content }}\n{% endfor %}",
+        {
+            "content/one.md": "---\nid: one\n---\n{{ title }}",
+            "content/two.md": "---\nid: two\n---\nTwo {{ this.id }}",
+        },
+        config={"use_build_cache": True},
+    )
+
+
+def _run(report_dir: Path) -> Engine:
+    engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+    engine.run()
+    return engine
+
+
+def test_build_cache_reuses_unchanged_files(report_dir):
+    first = _run(report_dir)
+    assert first.build_cache.hits == 0
+    assert (report_dir / ".pike_cache" / "build.json").exists()
+
+    second = _run(report_dir)
+    assert second.build_cache.hits == 2
+    assert second.build_cache.misses == 0
+    assert [f.content for f in second.files] == [f.content for f in first.files]
+
+
+def test_build_cache_invalidated_by_read_globals(report_dir):
+    _run(report_dir)
+    (report_dir / "configuration" / "variables.json").write_text(
+        json.dumps({"title": "Changed"})
+    )
+
+    engine = _run(report_dir)
+    # Only 'one' reads the title
+    assert engine.build_cache.hits == 1
+    assert engine.build_cache.misses == 1
+    assert engine.files[0].content == "Changed"
+
+
+def test_build_cache_invalidated_by_source(report_dir):
+    _run(report_dir)
+    (report_dir / "content" / "two.md").write_text("---\nid: two\n---\nNew")
+
+    engine = _run(report_dir)
+    assert engine.build_cache.hits == 1
+    assert engine.files[1].content == "New"
+
+
+def test_build_cache_invalidated_by_plugins(report_dir):
+    _run(report_dir)
+    engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+    engine.register_file_plugin("example", lambda file: file.id)
+    engine.run()
+    assert engine.build_cache.hits == 0
+
+
+def test_build_cache_logs_comments_every_run(report_dir, caplog):
+    (report_dir / "content" / "two.md").write_text(
+        "---\nid: two\n---\n{{ comment('Check this') }}Two"
+    )
+    for run in range(2):
+        caplog.clear()
+        engine = _run(report_dir)
+        # Only 'one' is reused, as 'two' has to log its comment again
+        assert engine.build_cache.hits == run
+        assert "Comment: 'Check this'" in caplog.text
+
+
+def test_build_cache_tracks_file_reads(report_dir):
+    (report_dir / "three.md").write_text("---\nid: three\n---\n{{ files.two.content }}")
+    _run(report_dir)
+    assert _run(report_dir).build_cache.misses == 0
+
+    (report_dir / "content" / "two.md").write_text("---\nid: two\n---\nNew")
+    engine = _run(report_dir)
+    # Only 'two' and 'three', which reads it, are rendered again
+    assert engine.build_cache.hits == 1
+    assert engine.files[0].content == "New"
+
+
+def test_build_cache_stores_full_command_strings(report_dir):
+    config_path = report_dir / "configuration" / "config.json"
+    config = json.loads(config_path.read_text())
+    config["use_command_registry"] = True
+    config_path.write_text(json.dumps(config))
+    (report_dir / "content" / "one.md").write_text(
+        "---\nid: one\n---\n{{ insert_text(title, bold=True) }}"
+    )
+
+    command = commands.create_command_string("insert_text", "Report", bold=True)
+    first = _run(report_dir)
+    assert first.files[0].content == f"<{commands.MARKER} REF0>"
+    assert command in (report_dir / ".pike_cache" / "build.json").read_text()
+    assert command in (report_dir / "documents" / "Report.md").read_text()
+
+    second = _run(report_dir)
+    assert second.build_cache.hits == 2
+    assert second.files[0].content == command
+
+
+def test_build_cache_tracks_forward_references(report_dir):
+    content_dir = report_dir / "content"
+    (content_dir / "x.md").write_text("---\nid: x\nreferences: [one]\n---\nX")
+    (content_dir / "reader.md").write_text(
+        "---\nid: reader\n---\n"
+        "{% for file in get_references('x') %}{{ file.id }}{% endfor %}"
+    )
+    engine = _run(report_dir)
+    assert {f.id: f.content for f in engine.files}["reader"] == "one"
+
+    (content_dir / "x.md").write_text("---\nid: x\nreferences: [two]\n---\nX")
+    engine = _run(report_dir)
+    assert {f.id: f.content for f in engine.files}["reader"] == "two"
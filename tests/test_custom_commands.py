@@ -1,3 +1,6 @@
+import pytest
+
+from pike import Engine
 from pike.docx import commands
 
 
@@ -60,3 +63,160 @@ def test_split_str_into_command_blocks():
     assert isinstance(r_3[4], commands.Command)
     assert isinstance(r_3[5], str)
     assert isinstance(r_3[6], commands.Command)
+
+
+def test_command_registry():
+    registry = commands.CommandRegistry()
+    with commands.use_command_registry(registry):
+        handle = commands.create_command_string("test", "arg", bold=True)
+        assert handle == f"<{commands.MARKER} REF0>"
+        assert commands.create_command_string("test", "arg", bold="True") == handle
+        assert commands.create_command_string("test", "other") != handle
+        assert len(registry) == 2
+
+        assert commands.split_str_into_command_blocks(f"Hi {handle}") == [
+            "Hi ",
+            commands.Command(
+                command="test", arguments=["arg"], keyword_arguments={"bold": "True"}
+            ),
+        ]
+        assert commands.expand_command_handles(f"Hi {handle}") == (
+            "Hi " + registry.expand(handle)
+        )
+
+    assert registry.expand(handle) == commands.create_command_string(
+        "test", "arg", bold=True
+    )
+    with pytest.raises(LookupError):
+        commands.parse_command_string(handle)
+
+    with pytest.raises(LookupError):
+        registry.get(f"<{commands.MARKER} REF5>")
+
+
+def test_split_str_into_command_blocks_paths():
+    command = commands.create_command_string("test", "arg")
+    malformed = f"<{commands.MARKER} test>"
+    commands.split_str_into_command_blocks(command)
+    commands.reset_split_statistics()
+    assert commands.split_str_into_command_blocks("") == []
+    assert commands.split_str_into_command_blocks("Plain text") == ["Plain text"]
+    first = commands.split_str_into_command_blocks(f"A {command} {malformed}")
+    second = commands.split_str_into_command_blocks(command)
+    assert first == ["A ", second[0], " ", malformed]
+    assert commands.split_statistics() == {
+        "plain": 2,
+        "with_commands": 2,
+        "handles": 0,
+        "parse_cache_hits": 1,
+        "parse_cache_misses": 2,
+    }
+
+
+def test_engine_run_resets_split_statistics(markdown_only_report):
+    commands.split_str_into_command_blocks("Plain text")
+    Engine.load_from_directory(markdown_only_report).run()
+    assert commands.split_statistics()["plain"] == 0
+
+
+def _typed_command(
+    docx,
+    count: int,
+    *,
+    ratio: float = 1.0,
+    enabled: bool = False,
+    items: list | None = None,
+    options: dict = None,
+    name: str = "",
+):
+    return count, ratio, enabled, items, options, name
+
+
+def test_command_signature_converts_arguments():
+    signature = commands.CommandSignature(_typed_command, provide_docx_instance=True)
+    assert signature.convert(
+        ["3"],
+        {
+            "ratio": "0.5",
+            "enabled": "True",
+            "items": '["a", 1]',
+            "options": '{"a": 1}',
+            "name": "1",
+        },
+    ) == (
+        [3],
+        {
+            "ratio": 0.5,
+            "enabled": True,
+            "items": ["a", 1],
+            "options": {"a": 1},
+            "name": "1",
+        },
+    )
+    assert signature.convert(["3"], {"enabled": "", "items": ""}) == (
+        [3],
+        {"enabled": False, "items": None},
+    )
+
+    with pytest.raises(ValueError):
+        signature.convert(["three"], {})
+
+    with pytest.raises(ValueError):
+        signature.convert(["3"], {"items": '{"a": 1}'})
+
+
+def _string_annotated_command(
+    docx: "Docx",  # noqa: F821
+    count: "int",
+    limit: "int | None" = None,
+    flag: "bool" = False,
+):
+    return count, limit, flag
+
+
+def test_command_signature_resolves_string_annotations():
+    # Docx can't be resolved here, which leaves the others unaffected
+    signature = commands.CommandSignature(
+        _string_annotated_command, provide_docx_instance=True
+    )
+    assert signature.convert(["3", "None"], {"flag": "yes"}) == (
+        [3, None],
+        {"flag": True},
+    )
+    assert signature.convert(["3"], {"limit": "4"}) == ([3], {"limit": 4})
+
+    signature = commands.CommandSignature(_typed_command, provide_docx_instance=True)
+    assert signature.convert(["3"], {"items": "None"}) == ([3], {"items": None})
+
+
+def test_command_signature_without_signature():
+    # Builtins such as dict have no signature to inspect
+    signature = commands.CommandSignature(dict)
+    assert signature.signature is None
+    signature.validate(["a"], {"b": "1"})
+    assert signature.convert(["a"], {"b": "1"}) == (["a"], {"b": "1"})
+
+
+def test_create_checked_command_string():
+    signature = commands.CommandSignature(_typed_command, provide_docx_instance=True)
+    assert commands.create_checked_command_string(
+        signature, "typed", 3, items=["a"], enabled=True
+    ) == commands.create_command_string("typed", "3", items='["a"]', enabled="True")
+
+    with pytest.raises(ValueError, match="typed"):
+        commands.create_checked_command_string(signature, "typed", "three")
+
+    with pytest.raises(ValueError, match="typed"):
+        commands.create_checked_command_string(signature, "typed", 3, missing=True)
+
+    with pytest.raises(ValueError, match="typed"):
+        commands.create_checked_command_string(signature, "typed")
+
+    assert commands.create_checked_command_string(
+        signature, "typed", 3, items=None
+    ) == commands.create_command_string("typed", "3", items="None")
+
+
+def test_invalid_command_arguments_fail_when_rendering(engine):
+    with pytest.raises(ValueError, match="insert_text"):
+        engine.inject_variables('{{ insert_text("Hi", bold="maybe") }}', {})
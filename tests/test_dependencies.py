@@ -0,0 +1,183 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pike import Engine
+from pike.dependencies import DependencyGraph, DependencyRecorder, TrackedDict
+
+
+@pytest.fixture
+def report_dir(make_report) -> Path:
+    return make_report()
+
+
+def _file(file_id: str, folder: str, *dependencies):
+    file = Mock()
+    file.id = file_id
+    file.folder.name = folder
+    file.dependencies = set(dependencies)
+    return file
+
+
+def test_tracked_dict_records_reads():
+    recorder = DependencyRecorder()
+    data = TrackedDict(recorder, "files")
+    data["one"] = 1
+    data["two"] = 2
+
+    # Nothing is recorded outside of a recording
+    assert data["one"] == 1
+
+    with recorder.record() as dependencies:
+        assert data["one"] == 1
+        assert data.get("missing") is None
+        assert "two" in data
+
+    assert dependencies == {("files", "one"), ("files", "missing"), ("files", "two")}
+
+    with recorder.record() as dependencies:
+        assert list(data.values()) == [1, 2]
+
+    assert dependencies == {("files", None)}
+
+
+def test_tracked_dict_default_factory():
+    data = TrackedDict(DependencyRecorder(), "folders", default_factory=dict)
+    assert data["missing"] == {}
+    assert "missing" in data
+
+    with pytest.raises(KeyError):
+        TrackedDict(DependencyRecorder(), "files")["missing"]
+
+
+def test_dependency_graph_order():
+    files = [
+        _file("one", "content", ("files", "three")),
+        _file("two", "content"),
+        _file("three", "other", ("folders", "content")),
+    ]
+    graph = DependencyGraph(files)
+    assert graph.dependencies == [{2}, set(), {0, 1}]
+    assert graph.dependents == [{2}, {2}, {0}]
+    # one and three form a cycle, which is released in order
+    assert graph.topological_order() == [1, 0, 2]
+
+    files[2].dependencies = {("files", "two")}
+    assert DependencyGraph(files).topological_order() == [1, 2, 0]
+
+
+def test_files_see_rendered_dependencies(report_dir):
+    (report_dir / "a.md").write_text("---\nid: a\n---\nA reads {{ files.b.content }}")
+    (report_dir / "b.md").write_text("---\nid: b\n---\nB is {{ this.id }}")
+    (report_dir / "c.md").write_text("---\nid: c\n---\nC is {{ title }}")
+
+    engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+    engine.locate_all_files()
+    engine.update_global_variables()
+    engine.render_files()
+
+    a, b, c = engine.files
+    assert a.content == "A reads B is b"
+    assert a.dependencies == {("files", "b")}
+    assert c.dependencies == set()
+    assert engine.global_variables["files"]["a"]["content"] == "A reads B is b"
+
+
+@pytest.mark.parametrize("render_jobs", [1, 2])
+def test_rendered_again_logs_comments_once(report_dir, caplog, render_jobs):
+    (report_dir / "a.md").write_text(
+        "---\nid: a\n---\n{{ comment('Check ' ~ files.b.content) }}"
+    )
+    (report_dir / "b.md").write_text("---\nid: b\n---\nB is {{ this.id }}")
+
+    engine = Engine.load_from_directory(
+        report_dir, load_default_plugins=False, render_jobs=render_jobs
+    )
+    engine.locate_all_files()
+    engine.update_global_variables()
+    engine.render_files()
+
+    # 'a' is rendered twice, only the final render is logged
+    assert caplog.text.count("Comment:") == 1
+    assert "Comment: 'Check B is b'" in caplog.text
+
+
+def test_get_folder_sees_rendered_files(report_dir):
+    (report_dir / "a.md").write_text(
+        "---\nid: a\n---\n"
+        "{% for file in get_folder('content', reverse=True) %}"
+        "{{ file.content }};{% endfor %}"
+    )
+    content_dir = report_dir / "content"
+    content_dir.mkdir()
+    (content_dir / "b.md").write_text("---\nid: b\n---\nB is {{ title }}")
+    (content_dir / "c.md").write_text("---\nid: c\n---\nC is {{ this.id }}")
+
+    engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+    engine.locate_all_files()
+    engine.update_global_variables()
+    engine.render_files()
+
+    a = engine.files[0]
+    assert a.content == "C is c;B is Report;"
+    assert a.dependencies == {("folders", "content")}
+
+
+def test_query_files(report_dir):
+    (report_dir / "a.md").write_text(
+        "---\nid: a\n---\n"
+        "{% for file in query_files(folder='findings', severity='high') %}"
+        "{{ file.content }};{% endfor %}"
+    )
+    findings_dir = report_dir / "findings"
+    findings_dir.mkdir()
+    for file_id, severity in (("x", "high"), ("y", "low"), ("z", "high")):
+        (findings_dir / f"{file_id}.md").write_text(
+            f"---\nid: {file_id}\nseverity: {severity}\n---\n{{{{ this.id }}}}"
+        )
+
+    engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+    engine.locate_all_files()
+    engine.update_global_variables()
+    engine.render_files()
+
+    a = engine.files[0]
+    assert a.content == "x;z;"
+    assert a.dependencies == {("folders", "findings")}
+
+
+def test_references(report_dir):
+    (report_dir / "a.md").write_text(
+        "---\nid: a\nreferences: [c, b, missing]\n---\n"
+        "{% for file in get_references(this.id) %}{{ file.id }};{% endfor %}"
+    )
+    (report_dir / "b.md").write_text(
+        "---\nid: b\n---\n"
+        "{% for file in get_referenced_by('b') %}{{ file.id }};{% endfor %}"
+    )
+    (report_dir / "c.md").write_text("---\nid: c\nreferences: b\n---\nC")
+
+    engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+    engine.locate_all_files()
+    engine.update_global_variables()
+    engine.render_files()
+
+    a, b, c = engine.files
+    assert a.content == "c;b;"
+    assert b.content == "a;c;"
+    assert engine.get_references(a) == [c, b]
+    assert engine.get_referenced_by("b") == [a, c]
+    assert ("backlinks", "b") in b.dependencies
+
+    c.variables["references"] = []
+    engine.update_file_variables(c)
+    assert engine.get_referenced_by(b) == [a]
+
+    # Files referencing themselves aren't their own referrers
+    b.variables["references"] = ["b", "c"]
+    engine.update_file_variables(b)
+    assert engine.get_referenced_by(b) == [a]
+    assert engine.get_referenced_by(c) == [a, b]
+    assert engine.get_references(b) == [b, c]
+    assert "b" not in engine.global_variables["backlinks"]["b"]
@@ -10,3 +10,18 @@ def test_find_all_files(set_test_directory_to_example_report, example_report_dir
 
     assert len(engine.files) == 3
     assert engine._layout_file is not None
+
+
+def test_find_all_files_concurrently(
+    set_test_directory_to_example_report, example_report_dir
+):
+    serial = Engine.load_from_directory(example_report_dir)
+    serial.locate_all_files()
+
+    concurrent = Engine.load_from_directory(example_report_dir, jobs=4)
+    concurrent.locate_all_files()
+
+    assert [f.file for f in concurrent.files] == [f.file for f in serial.files]
+    assert [f.variables for f in concurrent.files] == [
+        f.variables for f in serial.files
+    ]
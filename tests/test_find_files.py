@@ -0,0 +1,86 @@
+from pathlib import Path
+
+from pike import utils
+
+
+def _touch(base: Path, *paths: str) -> None:
+    for path in paths:
+        (base / path).parent.mkdir(parents=True, exist_ok=True)
+        (base / path).touch()
+
+
+def _found(base: Path, **kwargs) -> list[str]:
+    return [
+        path.relative_to(base).as_posix() for path in utils.find_files(base, **kwargs)
+    ]
+
+
+def test_find_files_is_sorted(tmp_path):
+    _touch(tmp_path, "b.md", "a.md", "z/c.md", "c/d.md", "notes.txt")
+    assert _found(tmp_path) == ["a.md", "b.md", "c/d.md", "z/c.md"]
+
+
+def test_find_files_name_patterns(tmp_path):
+    _touch(
+        tmp_path,
+        "README.md",
+        "one.md",
+        ".venv/lib/site/README.md",
+        "content/README.md",
+        "content/two.draft.md",
+        "content/two.md",
+    )
+    assert _found(tmp_path, excluded_patterns=[".venv", "README.md", "*.draft.md"]) == [
+        "one.md",
+        "content/two.md",
+    ]
+
+
+def test_find_files_anchored_patterns(tmp_path):
+    _touch(tmp_path, "old/one.md", "content/old/two.md", "content/three.md")
+    assert _found(tmp_path, excluded_patterns=["/old"]) == [
+        "content/three.md",
+        "content/old/two.md",
+    ]
+    assert _found(tmp_path, excluded_patterns=["content/old/*"]) == [
+        "content/three.md",
+        "old/one.md",
+    ]
+
+
+def test_find_files_directory_only_patterns(tmp_path):
+    _touch(tmp_path, "drafts.md", "drafts/one.md", "two.md")
+    assert _found(tmp_path, excluded_patterns=["drafts*/"]) == ["drafts.md", "two.md"]
+
+
+def test_find_files_excluded_directories(tmp_path):
+    _touch(tmp_path, "documents/Report.md", "content/documents/one.md")
+    assert _found(tmp_path, excluded_directories=[tmp_path / "documents"]) == [
+        "content/documents/one.md"
+    ]
+
+
+def test_find_files_nested_excluded_directories(tmp_path):
+    _touch(
+        tmp_path,
+        "one.md",
+        "build/documents/Report.md",
+        "build/notes.md",
+        "content/.pike_cache/cached.md",
+        "content/two.md",
+    )
+    excluded = [tmp_path / "build" / "documents", tmp_path / "content/.pike_cache/"]
+    assert _found(tmp_path, excluded_directories=excluded) == [
+        "one.md",
+        "build/notes.md",
+        "content/two.md",
+    ]
+
+    # The same directories reached through a symlinked report directory
+    link = tmp_path.parent / f"{tmp_path.name}-link"
+    link.symlink_to(tmp_path, target_is_directory=True)
+    assert _found(link, excluded_directories=excluded) == [
+        "one.md",
+        "build/notes.md",
+        "content/two.md",
+    ]
@@ -0,0 +1,61 @@
+import pytest
+
+from pike.indexes import FolderIndex
+
+
+@pytest.fixture
+def folders() -> dict:
+    return {
+        "content": {
+            "b": {"id": "b", "order": 1},
+            "a": {"id": "a", "order": 2},
+            "c": {"id": "c"},
+        }
+    }
+
+
+def test_sorts_by_id(folders):
+    index = FolderIndex(folders)
+    assert [file["id"] for file in index.get("content")] == ["a", "b", "c"]
+    assert [file["id"] for file in index.get("content", reverse=True)] == [
+        "c",
+        "b",
+        "a",
+    ]
+
+
+def test_sort_by_places_missing_last(folders):
+    index = FolderIndex(folders)
+    assert [file["id"] for file in index.get("content", sort_by="order")] == [
+        "b",
+        "a",
+        "c",
+    ]
+    assert [
+        file["id"] for file in index.get("content", sort_by="order", reverse=True)
+    ] == ["a", "b", "c"]
+
+
+def test_views_are_cached_and_read_only(folders):
+    index = FolderIndex(folders)
+    view = index.get("content")
+    assert index.get("content") is view
+    assert index.get("missing") == ()
+
+    with pytest.raises(TypeError):
+        view[0]["id"] = "z"  # type: ignore
+
+
+def test_invalidate(folders):
+    index = FolderIndex(folders)
+    view = index.get("content")
+    folders["content"]["d"] = {"id": "d"}
+
+    # Stale until told otherwise
+    assert index.get("content") is view
+
+    index.invalidate("content")
+    assert [file["id"] for file in index.get("content")] == ["a", "b", "c", "d"]
+
+    index.invalidate()
+    assert index.get("content") is not view
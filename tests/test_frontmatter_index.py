@@ -0,0 +1,100 @@
+import pytest
+
+from pike.indexes import FrontmatterIndex
+
+
+@pytest.fixture
+def index() -> FrontmatterIndex:
+    return FrontmatterIndex(
+        {
+            "findings": {
+                "sqli": {"id": "sqli", "severity": "high", "cvss": 8.1},
+                "xss": {"id": "xss", "severity": "high", "cvss": 6.1, "tags": ["web"]},
+                "tls": {"id": "tls", "severity": "low", "cvss": 3.7},
+            },
+            "appendix": {
+                "scope": {"id": "scope", "tags": ["web", "api"], "meta": {"a": 1}},
+            },
+        }
+    )
+
+
+def _ids(files) -> list[str]:
+    return [file["id"] for file in files]
+
+
+def test_query_filters(index: FrontmatterIndex):
+    assert _ids(index.query("findings", severity="high")) == ["sqli", "xss"]
+    assert _ids(index.query(severity="low")) == ["tls"]
+    assert _ids(index.query(severity=["low", "high"], order_by="cvss")) == [
+        "tls",
+        "xss",
+        "sqli",
+    ]
+    assert index.query(severity="medium") == ()
+    assert index.query("appendix", severity="high") == ()
+
+
+def test_query_ordering(index: FrontmatterIndex):
+    assert _ids(index.query("findings", order_by="cvss", reverse=True)) == [
+        "sqli",
+        "xss",
+        "tls",
+    ]
+    # Files without the variable are placed last
+    assert _ids(index.query(order_by="severity")) == ["sqli", "xss", "tls", "scope"]
+
+
+def test_query_list_and_unhashable_values(index: FrontmatterIndex):
+    assert _ids(index.query(tags="web")) == ["scope", "xss"]
+    assert _ids(index.query(tags="api")) == ["scope"]
+    assert _ids(index.query(meta={"a": 1})) == ["scope"]
+
+
+def test_query_sees_latest_content():
+    folders = {"content": {"one": {"id": "one", "content": "{{ raw }}"}}}
+    index = FrontmatterIndex(folders)
+    folders["content"]["one"] = {"id": "one", "content": "Rendered"}
+    assert index.query("content", id="one")[0]["content"] == "Rendered"
+
+
+def test_query_ordering_mixed_types():
+    index = FrontmatterIndex(
+        {
+            "findings": {
+                "a": {"id": "a", "cvss": "n/a", "meta": {"b": 1}},
+                "b": {"id": "b", "cvss": 8, "meta": {"a": 1}},
+                "c": {"id": "c", "cvss": 6.1, "meta": "none"},
+                "d": {"id": "d", "meta": {"a": 2}},
+                "e": {"id": "e", "cvss": "high"},
+            }
+        }
+    )
+    # Numbers sort together, then strings, with missing values last
+    assert _ids(index.query(order_by="cvss")) == ["c", "b", "e", "a", "d"]
+    assert _ids(index.query(order_by="cvss", reverse=True)) == [
+        "a",
+        "e",
+        "b",
+        "c",
+        "d",
+    ]
+    # Mappings cannot be compared so fall back to their string form
+    assert _ids(index.query(order_by="meta")) == ["b", "d", "a", "c", "e"]
+
+
+def test_query_matches_types():
+    index = FrontmatterIndex(
+        {
+            "content": {
+                "a": {"id": "a", "flag": True, "pair": [1, [2]]},
+                "b": {"id": "b", "flag": 1, "pair": (1, 2)},
+            }
+        }
+    )
+    assert _ids(index.query(flag=1)) == ["b"]
+    assert _ids(index.query(flag=True)) == ["a"]
+    # Tuples are hashable, unless they contain something which isn't
+    assert _ids(index.query(pair=[(1, [2])])) == []
+    assert _ids(index.query(pair=[[2]])) == ["a"]
+    assert _ids(index.query(pair=[(1, 2)])) == ["b"]
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("skelmis.docx", "lxml", "markdown_it")
+
+
+def test_markdown_only_run_skips_docx_imports(markdown_only_report: Path):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from pike.__main__ import app\n"
+            f"app(['run', {str(markdown_only_report)!r}], standalone_mode=False)\n"
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+    assert (markdown_only_report / "documents" / "Report.md").exists()
+
+
+def test_lazy_attributes_are_listed():
+    import pike.docx
+    import pike.utils
+
+    # Both lazily imported and already imported attributes
+    assert {"Docx", "commands", "check_has_next", "lazy_module"} <= set(dir(pike.docx))
+    assert "read_file" in dir(pike.utils)
+    assert pike.docx.commands.__name__ == "pike.docx.commands"
+    assert pike.utils.flatten_ast.__module__ == "pike.utils.markdown_it"
@@ -24,3 +24,35 @@ def test_insert_image(engine: Engine):
         r_3
         == "<img src='cat.jpg' alt='Alt Text' width='100' height='100' title='Caption'>"
     )
+
+
+class _NoCopyDict(dict):
+    def __iter__(self):
+        raise AssertionError("Variables should not be copied")
+
+    def keys(self):
+        raise AssertionError("Variables should not be copied")
+
+
+def test_inject_variables_does_not_copy(engine: Engine):
+    variables = _NoCopyDict(name="Skelmis")
+    assert engine.inject_variables("{{ name }}", variables) == "Skelmis"
+
+    with pytest.raises(
+        jinja2.exceptions.UndefinedError, match="'missing' is undefined"
+    ):
+        engine.inject_variables("{{ missing }}", {"name": "Skelmis"})
+
+
+def test_file_variable_precedence(engine: Engine, example_report_dir):
+    engine.global_variables["value"] = "global"
+    file = File(example_report_dir / "content" / "one.md", engine=engine)
+    file.content = "{{ value }} {{ this.value }} {{ this.id }}"
+    file.inject_variables()
+    assert file.content == "global two one"
+
+    file.content = "{{ this.missing }}"
+    with pytest.raises(
+        jinja2.exceptions.UndefinedError, match="'dict object' has no attribute"
+    ):
+        file.inject_variables()
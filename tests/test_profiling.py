@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pike import Engine
+from pike.profiling import Profiler
+
+
+def test_nested_stages():
+    profiler = Profiler()
+    profiler.start()
+    try:
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                data = [0] * 100_000
+
+            del data
+    finally:
+        profiler.stop()
+
+    inner, outer = profiler.stages
+    assert (inner["name"], inner["parent"]) == ("inner", "outer")
+    assert (outer["name"], outer["parent"]) == ("outer", None)
+    assert outer["wall_time"] >= inner["wall_time"]
+    # The outer stage includes the peak of the inner one
+    assert inner["peak_memory"] > 100_000
+    assert outer["peak_memory"] >= inner["peak_memory"]
+
+
+def test_file_times_accumulate():
+    profiler = Profiler(trace_memory=False)
+    for _ in range(2):
+        with profiler.file("one"):
+            pass
+
+    with profiler.stage("untraced"):
+        pass
+
+    assert list(profiler.as_dict()["files"]) == ["one"]
+    assert profiler.stages[0]["peak_memory"] is None
+
+
+@pytest.mark.parametrize("render_jobs", [1, 2])
+def test_engine_writes_profile(markdown_only_report: Path, render_jobs: int):
+    engine = Engine.load_from_directory(
+        markdown_only_report, profile=True, render_jobs=render_jobs
+    )
+    engine.run()
+
+    profile = json.loads(
+        (markdown_only_report / "documents" / "Report.profile.json").read_text()
+    )
+    names = [stage["name"] for stage in profile["stages"]]
+    for name in ("load_files", "render_files", "plugins", "render_layout", "total"):
+        assert name in names
+
+    assert names[-1] == "total"
+    assert len(profile["files"]) == 10
@@ -0,0 +1,37 @@
+from pike.dependencies import DependencyRecorder
+from pike.indexes import ReferenceGraph
+
+
+def test_reference_graph_updates():
+    graph = ReferenceGraph(DependencyRecorder())
+    assert graph.update("one", {"references": ["two", "three"]}) == {"two", "three"}
+    assert graph.update("four", {"references": "two"}) == {"two"}
+    assert graph.update("five", {}) == set()
+
+    assert graph.references("one") == ("two", "three")
+    assert graph.referrers("two") == ("four", "one")
+    assert graph.referrers("three") == ("one",)
+    assert graph.referrers("one") == ()
+
+    # Only references which changed are reported
+    assert graph.update("one", {"references": ["two"]}) == {"three"}
+    assert graph.update("one", {"references": ["two"]}) == set()
+    assert graph.referrers("three") == ()
+    assert "three" not in graph.referenced_by
+
+
+def test_reference_graph_custom_key():
+    graph = ReferenceGraph(DependencyRecorder(), key="see_also")
+    graph.update("one", {"see_also": "two", "references": "three"})
+    assert graph.referrers("two") == ("one",)
+    assert graph.referrers("three") == ()
+
+
+def test_reference_graph_records_reverse_lookups():
+    recorder = DependencyRecorder()
+    graph = ReferenceGraph(recorder)
+    graph.update("one", {"references": "two"})
+    with recorder.record() as dependencies:
+        graph.referrers("two")
+
+    assert dependencies == {("backlinks", "two")}
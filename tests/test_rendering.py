@@ -0,0 +1,128 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from pike import Engine, rendering
+
+
+@pytest.fixture
+def report_dir(make_report) -> Path:
+    return make_report(
+        files={
+            "content/a.md": "---\nid: a\n---\n"
+            "{{ files.b.content }} {{ add_page_break() }}",
+            "content/b.md": "---\nid: b\n---\n{{ this.id }} {{ title }}",
+            "content/c.md": "---\nid: c\n---\n"
+            "{% for file in get_folder('content') %}{{ file.id }}{% endfor %}",
+            "content/d.md": "---\nid: d\n---\n{{ plugins.shout() }}",
+        }
+    )
+
+
+def _render(report_dir: Path, render_jobs: int) -> list[str]:
+    engine = Engine.load_from_directory(
+        report_dir, load_default_plugins=False, render_jobs=render_jobs
+    )
+    engine.register_file_plugin("shout", lambda file: file.id.upper())
+    engine.locate_all_files()
+    engine.update_global_variables()
+    engine.render_files()
+    return [file.content for file in engine.files]
+
+
+def test_render_in_processes_matches_serial(report_dir):
+    serial = _render(report_dir, 1)
+    assert serial[1] == "b Report"
+    assert serial[3] == "D"
+    assert _render(report_dir, 2) == serial
+
+
+def test_render_in_processes_falls_back_for_plugins(report_dir):
+    engine = Engine.load_from_directory(
+        report_dir, load_default_plugins=False, render_jobs=2
+    )
+    engine.locate_all_files()
+    engine.update_global_variables()
+    results = rendering.render_in_processes(engine, engine.files)
+    assert results[3] is None
+    content, sources, dependencies, comments, seconds = results[0]
+    assert dependencies == {("files", "b")}
+    assert comments == []
+    assert seconds > 0
+    # Workers see the unrendered content of other files,
+    # Engine.render_files then renders 'a' again afterwards
+    assert content.startswith("a Report")
+
+
+def test_render_until_stable():
+    calls: list[str] = []
+
+    def render(content: str) -> str:
+        calls.append(content)
+        return content[:-1] if content.endswith("!") else content
+
+    assert rendering.render_until_stable("a!!", render) == ("a", ["a!!", "a!", "a"])
+
+
+def test_generate_template_matches_render(engine: Engine):
+    content = "{% for i in range(3) %}Line {{ i }}\n{% endfor %}\n"
+    variables = {}
+    chunks = list(engine.generate_variables(content, variables))
+    assert len(chunks) > 1
+    assert "".join(chunks) == engine.inject_variables(content, variables)
+    assert list(engine.generate_variables("Static\n", variables)) == ["Static"]
+
+
+def test_stream_layout(report_dir: Path):
+    config_path = report_dir / "configuration" / "config.json"
+    config = json.loads(config_path.read_text())
+    config["stream_layout"] = True
+    config_path.write_text(json.dumps(config))
+    (report_dir / "configuration" / "layout.md").write_text(
+        "# {{ title }}\n{% for file in get_folder('content') %}{{ file.content }}\n{% endfor %}"
+    )
+
+    def run() -> str:
+        engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+        engine.register_file_plugin("shout", lambda file: file.id.upper())
+        engine.run()
+        return (report_dir / "documents" / "Report.md").read_text()
+
+    output = run()
+    config["stream_layout"] = False
+    config_path.write_text(json.dumps(config))
+    assert run() == output
+    assert output.startswith("# Report\n")
+
+
+def test_stream_layout_memory(report_dir: Path):
+    # Many small chunks, as a layout joining lots of files produces
+    (report_dir / "configuration" / "layout.md").write_text(
+        "{% for idx in range(50000) %}Line {{ idx }} of the report\n{% endfor %}"
+    )
+
+    def peak(stream: bool) -> int:
+        engine = Engine.load_from_directory(report_dir, load_default_plugins=False)
+        engine.register_file_plugin("shout", lambda file: file.id.upper())
+        engine.locate_all_files()
+        engine.update_global_variables()
+        engine.render_files()
+        tracemalloc.start()
+        try:
+            if stream:
+                content = engine._stream_layout(
+                    report_dir.parent / "Report.md", keep=True
+                )
+            else:
+                engine._layout_file.inject_variables(use_build_cache=False)
+                content = engine._layout_file.content
+
+            assert content.count("\n") == 49999
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    peak(True)
+    assert peak(True) <= peak(False)
@@ -3,6 +3,7 @@ from markdown_it import MarkdownIt
 
 from pike.docx import CurrentRun, commands
 from pike.structs import Table, Entry, Cell, TextAlignment
+from pike.structs.table import _parse_cell_text
 
 
 def test_table_from_csv(data_dir):
@@ -22,6 +23,27 @@ def test_table_from_csv(data_dir):
     assert table_2.has_header_row is False
 
 
+def test_read_csv(data_dir):
+    file = data_dir / "table.csv"
+    assert list(Table.read_csv(file, columns=["1,3", "1,1"], row_limit=1)) == [
+        ["1,3", "1,1"],
+        ["2,3", "2,1"],
+    ]
+    assert list(
+        Table.read_csv(file, file_contains_headers=False, columns=[2], row_limit=2)
+    ) == [["1,3"], ["2,3"]]
+
+    with pytest.raises(ValueError):
+        list(Table.read_csv(file, columns=["missing"]))
+
+    with pytest.raises(ValueError):
+        list(Table.read_csv(file, file_contains_headers=False, columns=["1,3"]))
+
+    table: Table = Table.from_csv_file(file, columns=[0, "1,2"], row_limit=1)
+    assert len(table.rows) == 2
+    assert [cell.content[0].text for cell in table.rows[1].cells] == ["2,1", "2,2"]
+
+
 def test_table_from_ast(data_dir):
     markdown = MarkdownIt().enable("table")
     ast = markdown.parse((data_dir / "table.md").read_text())
@@ -42,6 +64,19 @@ def test_table_text_to_cell():
     assert cell.content[2].style == CurrentRun(italic=True)
 
 
+def test_table_text_to_cell_is_cached():
+    _parse_cell_text.cache_clear()
+    first: Cell = Table.text_to_cell("**High**")
+    second: Cell = Table.text_to_cell("**High**")
+    assert _parse_cell_text.cache_info().hits == 1
+    assert first == second
+
+    # Cells are mutable so must not be shared
+    second.content[0].style.italic = True
+    assert first.content[0].style == CurrentRun(bold=True)
+    assert first.content[0] is not second.content[0]
+
+
 def test_table_with_alignment(data_dir):
     markdown = MarkdownIt().enable("table")
     ast = markdown.parse((data_dir / "table_alignment.md").read_text())
@@ -0,0 +1,98 @@
+import jinja2
+from jinja2.sandbox import SandboxedEnvironment
+
+from pike import Engine
+from pike.caching import TemplateCache
+
+
+def test_template_cache_hits_and_misses():
+    env = jinja2.Environment()
+    cache = TemplateCache()
+    template_globals = {}
+
+    first = cache.get_template(env, "{{ 1 }}", template_globals)
+    second = cache.get_template(env, "{{ 1 }}", template_globals)
+    assert first is second
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+    # Different globals means a different template
+    other = cache.get_template(env, "{{ 1 }}", {})
+    assert other is not first
+    assert cache.misses == 2
+
+
+def test_template_cache_evicts_least_recently_used():
+    env = jinja2.Environment()
+    cache = TemplateCache(maxsize=2)
+    cache.get_template(env, "a")
+    cache.get_template(env, "b")
+    cache.get_template(env, "a")
+    cache.get_template(env, "c")
+    assert len(cache) == 2
+
+    cache.get_template(env, "a")
+    assert cache.hits == 2
+    cache.get_template(env, "b")
+    assert cache.misses == 4
+
+
+def test_template_cache_disabled():
+    env = jinja2.Environment()
+    cache = TemplateCache(maxsize=0)
+    cache.get_template(env, "a")
+    cache.get_template(env, "a")
+    assert len(cache) == 0
+    assert cache.hits == 0
+    assert cache.misses == 2
+
+
+def test_template_cache_sees_new_globals(engine: Engine):
+    content = "{{ late_command() }}"
+    engine.template_cache.get_template(
+        engine.jinja_env, content, engine._template_globals
+    )
+    engine.add_custom_command("late_command", lambda: None)
+    assert "late_command" in engine.inject_variables(content, {})
+    assert engine.template_cache.hits == 1
+
+
+def test_static_content_skips_compilation(engine: Engine):
+    assert engine.inject_variables("Plain text\n", {}) == "Plain text"
+    assert engine.template_cache.misses == 0
+
+
+def test_template_cache_uses_bytecode_cache(tmp_path):
+    env = jinja2.Environment(bytecode_cache=jinja2.FileSystemBytecodeCache(tmp_path))
+    template = TemplateCache().get_template(env, "{{ value }}", {})
+    assert template.render(value=1) == "1"
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # A fresh process would have an empty in memory cache
+    template = TemplateCache().get_template(env, "{{ value }}", {})
+    assert template.render(value=2) == "2"
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_bytecode_cache_name_changes():
+    env = jinja2.Environment()
+    sandbox = SandboxedEnvironment()
+    name = TemplateCache.bytecode_cache_name(env, {}, source_hash="a")
+    assert name != TemplateCache.bytecode_cache_name(sandbox, {}, source_hash="a")
+    assert name != TemplateCache.bytecode_cache_name(
+        env, {"command": None}, source_hash="a"
+    )
+    assert name != TemplateCache.bytecode_cache_name(env, {}, source_hash="b")
+
+
+def test_template_cache_size_from_config(engine: Engine):
+    assert engine.template_cache.maxsize == 128
+
+    configuration = {**engine.config, "template_cache_size": 0}
+    engine = Engine(engine.base_directory, configuration=configuration)
+    assert engine.template_cache.maxsize == 0
+
+    engine = Engine(
+        engine.base_directory, configuration=configuration, template_cache_size=4
+    )
+    assert engine.template_cache.maxsize == 4
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from pike import Engine
+from pike.docx import commands
+from pike.tracing import Tracer
+
+
+def test_spans_nest():
+    tracer = Tracer()
+    with tracer.span("outer", category="test", detail=1):
+        with tracer.span("inner", category="test"):
+            pass
+
+    inner, outer = tracer.as_dict()["traceEvents"]
+    assert inner["name"] == "inner" and outer["name"] == "outer"
+    assert outer["args"] == {"detail": "1"}
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+def test_engine_traces_nested_commands(markdown_only_report: Path):
+    config_path = markdown_only_report / "configuration" / "config.json"
+    config = json.loads(config_path.read_text())
+    config["output_files"] = {"markdown": False, "docx": True, "pdf": False}
+    config_path.write_text(json.dumps(config))
+    (markdown_only_report / "configuration" / "layout.md").write_text(
+        "| Heading |\n| --- |\n| {{ outer() }} |\n"
+    )
+
+    def outer(docx):
+        docx.run_command(
+            commands.parse_command_string(commands.create_command_string("inner"))
+        )
+
+    engine = Engine.load_from_directory(markdown_only_report, trace=True)
+    engine.add_custom_command("outer", outer, provide_docx_instance=True)
+    engine.add_custom_command("inner", lambda docx: None, provide_docx_instance=True)
+    engine.run()
+
+    trace = json.loads(
+        (markdown_only_report / "documents" / "Report.trace.json").read_text()
+    )
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert events["inner"]["cat"] == events["outer"]["cat"] == "command"
+    # The command within the table cell runs within walk_ast,
+    # and the command it runs within it
+    for parent, child in (("walk_ast", "outer"), ("outer", "inner")):
+        parent, child = events[parent], events[child]
+        assert parent["ts"] <= child["ts"]
+        assert child["ts"] + child["dur"] <= parent["ts"] + parent["dur"]
+
+    assert events["plugin:raise_on_todo"]["cat"] == "stage"
+    assert events["file_0"]["cat"] == "file"
@@ -6,7 +6,7 @@ from skelmis.docx import Document
 from skelmis.docx.text.run import Run
 
 from pike import Engine, File, utils, jinja_globals
-from pike.docx import Docx
+from pike.docx import Docx, commands
 
 
 def test_nested_blockquote_doesnt_crash(engine: Engine, data_dir) -> None:
@@ -273,3 +273,150 @@ def test_custom_command(engine: Engine, data_dir: Path) -> None:
     document = Mock()
     docx.walk_ast(document, ast)
     assert document.mock_calls == [call.add_page_break()]
+
+
+def test_custom_command_arguments_are_converted(engine: Engine) -> None:
+    seen = []
+
+    def repeat(docx: Docx, text: str, times: int, *, upper: bool = False) -> None:
+        seen.append((text, times, upper))
+
+    docx = Docx(engine)
+    docx.load_custom_command("repeat", repeat, provide_docx_instance=True)
+    markdown = utils.create_markdown_it()
+    ast = markdown.parse(
+        commands.create_command_string("repeat", "Hi", 2, upper=True) + "\n"
+    )
+    docx.walk_ast(Mock(), ast)
+    assert seen == [("Hi", 2, True)]
+
+    ast = markdown.parse(commands.create_command_string("repeat", "Hi", "x") + "\n")
+    with pytest.raises(ValueError, match="repeat"):
+        docx.walk_ast(Mock(), ast)
+
+
+def test_register_token_handler(engine: Engine, data_dir: Path) -> None:
+    seen = []
+
+    def hr(docx, token, state):
+        seen.append(token.type)
+        state.template_file.add_page_break()
+
+    def link_open(docx, token, state):
+        # Consume the link text and closing token too
+        docx.current_paragraph.add_run(
+            f"{state.peek().content} <{token.attrs['href']}>"
+        )
+        return 3
+
+    docx = Docx(engine)
+    assert docx.register_token_handler("hr", hr) is docx
+    docx.register_token_handler("link_open", link_open)
+    markdown = utils.create_markdown_it()
+    ast = markdown.parse(
+        (data_dir / "horizontal_rule.md").read_text()
+        + "\n\n"
+        + (data_dir / "normal_link.md").read_text()
+    )
+    document = Mock()
+    docx.walk_ast(document, ast)
+    assert seen == ["hr", "hr", "hr"]
+    assert document.mock_calls == [
+        call.add_page_break(),
+        call.add_page_break(),
+        call.add_page_break(),
+        call.add_paragraph(),
+        call.add_paragraph().add_run("Google <https://google.com>"),
+    ]
+
+
+def test_engine_token_handlers(engine: Engine) -> None:
+    def hr(docx, token, state):
+        pass
+
+    assert engine.add_token_handler("hr", hr) is engine
+    docx = Docx(engine)
+    assert docx.token_handlers["hr"] is hr
+    assert "paragraph_open" in docx.token_handlers
+
+
+def test_engine_markdown_plugins(engine: Engine, tmp_path: Path) -> None:
+    assert engine.markdown_parser is utils.get_markdown_it()
+
+    def shout_plugin(markdown, suffix: str) -> None:
+        def shout(state):
+            for token in state.tokens:
+                for child in token.children or []:
+                    if child.type == "text" and child.content.isupper():
+                        child.type = "shout"
+                        child.content += suffix
+
+        markdown.core.ruler.push("shout", shout)
+
+    def shout(docx, token, state):
+        docx.current_paragraph.add_run(token.content).bold = True
+
+    assert engine.add_markdown_plugin(shout_plugin, suffix="!") is engine
+    engine.add_token_handler("shout", shout)
+    assert engine.markdown_parser is engine.markdown_parser
+    assert engine.markdown_parser is not utils.get_markdown_it()
+
+    docx = Docx(engine)
+    path = docx.create_document(
+        content="HELLO\n\nquiet\n", filename=str(tmp_path / "shout.docx")
+    )
+    paragraphs = Document(path).paragraphs
+
+    assert [run.text for run in paragraphs[0].runs] == ["HELLO!"]
+    assert paragraphs[0].runs[0].bold
+    # The shared parser is left unchanged
+    assert utils.get_markdown_it().parse("HELLO")[1].children[0].type == "text"
+
+
+@pytest.mark.parametrize(
+    "markdown_table",
+    [
+        "| A | B |\n|:--|--:|\n| **Bold** *italic* | plain |\n| [Link](https://x.y) | `code` |\n",
+        "| Aligned | Middle |\n|:-------:|--------|\n|  spaced  | {command} |\n",
+    ],
+)
+def test_bulk_table_matches_python_docx(
+    engine: Engine, monkeypatch, markdown_table: str
+) -> None:
+    from pike.docx import commands, docx as docx_module
+
+    markdown_table = markdown_table.format(
+        command=commands.create_command_string("insert_text", "cmd", bold=True)
+    )
+    ast = utils.create_markdown_it().parse(markdown_table)
+
+    def table_xml() -> str:
+        docx = Docx(engine)
+        docx.import_commands_from_engine()
+        document = Document()
+        docx.walk_ast(document, ast)
+        return document.tables[0]._tbl.xml
+
+    bulk = table_xml()
+    # Not being a real document forces the cell by cell path
+    monkeypatch.setattr(docx_module, "DocumentObject", Mock)
+    assert table_xml() == bulk
+
+
+def test_streamed_csv_table(engine: Engine, data_dir: Path) -> None:
+    command = jinja_globals.insert_table_from_csv(
+        data_dir / "table.csv", columns=["1,3", "1,1"], stream=True, chunk_size=1
+    )
+    docx = Docx(engine)
+    docx.import_commands_from_engine()
+    document = Document()
+    docx.walk_ast(document, utils.create_markdown_it().parse(f"{command}\n"))
+
+    (table,) = document.tables
+    assert [[cell.text for cell in row.cells] for row in table.rows] == [
+        ["1,3", "1,1"],
+        ["2,3", "2,1"],
+        ["3,3", "3,1"],
+    ]
+    assert table.rows[2].cells[0].paragraphs[0].runs[0].bold is None
+    assert table.rows[2].cells[0].paragraphs[0].runs[1].bold is True